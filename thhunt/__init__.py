@@ -1 +1 @@
-# Threat Hunt Assistant Package
+# Threat Hunt Assistant Package
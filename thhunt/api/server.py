@@ -1,100 +1,175 @@
-from flask import Flask, jsonify, request
-import threading
-from ..config.loader import APIConfig
-from ..storage.db import DatabaseManager
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class APIServer(threading.Thread):
-    def __init__(self, config: APIConfig, db_path: str):
-        super().__init__()
-        self.config = config
-        self.app = Flask(__name__)
-        self.db = DatabaseManager(db_path)
-        self.daemon = True
-        
-        self._register_routes()
-
-    def _register_routes(self):
-        @self.app.route('/status', methods=['GET'])
-        def status():
-            return jsonify({"status": "running"})
-
-        @self.app.route('/alerts', methods=['GET'])
-        def get_alerts():
-            # Fetch all alerts (enriched and unenriched)
-            # This is a simplified fetch. In real world, we'd add filtering.
-            conn = self.db._get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM alerts ORDER BY timestamp DESC LIMIT 50')
-            rows = cursor.fetchall()
-            
-            alerts = []
-            for row in rows:
-                # Fetch enrichment if exists
-                enrichment = {}
-                if row[6]: # is_enriched
-                    cursor.execute('SELECT * FROM enrichments WHERE alert_id = ?', (row[0],))
-                    enrich_row = cursor.fetchone()
-                    if enrich_row:
-                        enrichment = {
-                            "summary": enrich_row[1],
-                            "severity_score": enrich_row[2],
-                            "threat_category": enrich_row[3],
-                            "recommendations": enrich_row[4]
-                        }
-
-                alerts.append({
-                    "id": row[0],
-                    "timestamp": row[1],
-                    "severity": row[2],
-                    "rule_name": row[3],
-                    "description": row[4],
-                    "is_enriched": bool(row[6]),
-                    "enrichment": enrichment
-                })
-            conn.close()
-            return jsonify(alerts)
-
-        @self.app.route('/alerts/<int:alert_id>', methods=['GET'])
-        def get_alert_detail(alert_id):
-            conn = self.db._get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM alerts WHERE id = ?', (alert_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                conn.close()
-                return jsonify({"error": "Alert not found"}), 404
-
-            alert = {
-                "id": row[0],
-                "timestamp": row[1],
-                "severity": row[2],
-                "rule_name": row[3],
-                "description": row[4],
-                "related_events": row[5],
-                "is_enriched": bool(row[6])
-            }
-            
-            if alert['is_enriched']:
-                cursor.execute('SELECT * FROM enrichments WHERE alert_id = ?', (alert_id,))
-                enrich_row = cursor.fetchone()
-                if enrich_row:
-                    alert['enrichment'] = {
-                        "summary": enrich_row[1],
-                        "severity_score": enrich_row[2],
-                        "threat_category": enrich_row[3],
-                        "recommendations": enrich_row[4]
-                    }
-            
-            conn.close()
-            return jsonify(alert)
-
-    def run(self):
-        logger.info(f"Starting API server on {self.config.host}:{self.config.port}")
-        self.app.run(host=self.config.host, port=self.config.port, debug=False, use_reloader=False)
-
-    def stop(self):
-        pass
+from flask import Flask, jsonify, request
+import threading
+from ..config.loader import APIConfig
+from ..rules.profiling import top_rules
+from ..storage.db import DatabaseManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class APIServer(threading.Thread):
+    def __init__(self, config: APIConfig, db_path: str):
+        super().__init__()
+        self.config = config
+        self.app = Flask(__name__)
+        self.db = DatabaseManager(db_path)
+        self.daemon = True
+        self._stats_providers = {}
+        self._rule_stats = None
+        self._retrohunts = None
+        
+        self._register_routes()
+
+    def register_stats(self, name: str, provider):
+        """
+        Adds provider() (a JSON-serialisable dict) to /stats under name.
+        """
+        self._stats_providers[name] = provider
+
+    def register_rule_stats(self, provider):
+        """
+        Serves provider() (RuleEngine.stats() or the merged stats of the
+        detection shards) on /rules/stats.
+        """
+        self._rule_stats = provider
+
+    def register_retrohunt(self, manager):
+        """
+        Serves the jobs of a RetroHuntManager on /retrohunt.
+        """
+        self._retrohunts = manager
+
+    def _register_routes(self):
+        @self.app.route('/status', methods=['GET'])
+        def status():
+            return jsonify({"status": "running"})
+
+        @self.app.route('/stats', methods=['GET'])
+        def stats():
+            return jsonify({name: provider() for name, provider in self._stats_providers.items()})
+
+        @self.app.route('/rules/stats', methods=['GET'])
+        def rule_stats():
+            # ?sort=time|matches|evaluations|p99&limit=N, worst rules first
+            if self._rule_stats is None:
+                return jsonify({"error": "Rule stats not available"}), 404
+            try:
+                return jsonify(top_rules(self._rule_stats(), request.args.get('sort', 'time'),
+                                         request.args.get('limit', 50, type=int)))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        @self.app.route('/retrohunt', methods=['GET'])
+        def list_retrohunts():
+            if self._retrohunts is None:
+                return jsonify({"error": "Retro-hunt not available"}), 404
+            return jsonify(self._retrohunts.list())
+
+        @self.app.route('/retrohunt', methods=['POST'])
+        def start_retrohunt():
+            # {"rules": "/path/to/rule.yml", "start": epoch, "end": epoch}
+            if self._retrohunts is None:
+                return jsonify({"error": "Retro-hunt not available"}), 404
+            body = request.get_json(silent=True) or {}
+            if not body.get("rules"):
+                return jsonify({"error": "rules is required"}), 400
+            try:
+                job = self._retrohunts.start(body["rules"], body.get("start"), body.get("end"))
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(job.status()), 202
+
+        @self.app.route('/retrohunt/<job_id>', methods=['GET'])
+        def get_retrohunt(job_id):
+            job = self._retrohunts.get(job_id) if self._retrohunts is not None else None
+            if job is None:
+                return jsonify({"error": "Retro-hunt not found"}), 404
+            return jsonify(job.status())
+
+        @self.app.route('/retrohunt/<job_id>/cancel', methods=['POST'])
+        def cancel_retrohunt(job_id):
+            if self._retrohunts is None or not self._retrohunts.cancel(job_id):
+                return jsonify({"error": "Retro-hunt not found"}), 404
+            return jsonify(self._retrohunts.get(job_id).status())
+
+        @self.app.route('/alerts', methods=['GET'])
+        def get_alerts():
+            # Fetch all alerts (enriched and unenriched), optionally only
+            # those of one source ("live" or "retrohunt:<id>")
+            # This is a simplified fetch. In real world, we'd add filtering.
+            source = request.args.get('source')
+            with self.db.connections.read() as conn:
+                cursor = conn.cursor()
+                if source:
+                    cursor.execute('SELECT * FROM alerts WHERE source = ? ORDER BY timestamp DESC LIMIT 50', (source,))
+                else:
+                    cursor.execute('SELECT * FROM alerts ORDER BY timestamp DESC LIMIT 50')
+                rows = cursor.fetchall()
+            
+                alerts = []
+                for row in rows:
+                    # Fetch enrichment if exists
+                    enrichment = {}
+                    if row[6]: # is_enriched
+                        cursor.execute('SELECT * FROM enrichments WHERE alert_id = ?', (row[0],))
+                        enrich_row = cursor.fetchone()
+                        if enrich_row:
+                            enrichment = {
+                                "summary": enrich_row[1],
+                                "severity_score": enrich_row[2],
+                                "threat_category": enrich_row[3],
+                                "recommendations": enrich_row[4]
+                            }
+
+                    alerts.append({
+                        "id": row[0],
+                        "timestamp": row[1],
+                        "severity": row[2],
+                        "rule_name": row[3],
+                        "description": row[4],
+                        "is_enriched": bool(row[6]),
+                        "source": row[7],
+                        "enrichment": enrichment
+                    })
+            return jsonify(alerts)
+
+        @self.app.route('/alerts/<int:alert_id>', methods=['GET'])
+        def get_alert_detail(alert_id):
+            with self.db.connections.read() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM alerts WHERE id = ?', (alert_id,))
+                row = cursor.fetchone()
+            
+                if not row:
+                    return jsonify({"error": "Alert not found"}), 404
+
+                alert = {
+                    "id": row[0],
+                    "timestamp": row[1],
+                    "severity": row[2],
+                    "rule_name": row[3],
+                    "description": row[4],
+                    "related_events": row[5],
+                    "is_enriched": bool(row[6]),
+                    "source": row[7]
+                }
+            
+                if alert['is_enriched']:
+                    cursor.execute('SELECT * FROM enrichments WHERE alert_id = ?', (alert_id,))
+                    enrich_row = cursor.fetchone()
+                    if enrich_row:
+                        alert['enrichment'] = {
+                            "summary": enrich_row[1],
+                            "severity_score": enrich_row[2],
+                            "threat_category": enrich_row[3],
+                            "recommendations": enrich_row[4]
+                        }
+
+            return jsonify(alert)
+
+    def run(self):
+        logger.info(f"Starting API server on {self.config.host}:{self.config.port}")
+        self.app.run(host=self.config.host, port=self.config.port, debug=False, use_reloader=False)
+
+    def stop(self):
+        pass
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from ..storage.connection import ConnectionManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Entry fields: [first_seen, last_seen, count, unflushed sightings]
+FIRST_SEEN, LAST_SEEN, COUNT, PENDING = range(4)
+
+# Lookup result for a key known not to be in the table
+_ABSENT = object()
+
+class BaselineCache:
+    """
+    Write-behind cache of one baseline table (key column, first_seen,
+    last_seen, count).
+
+    The most recently seen max_entries keys are loaded at startup and
+    kept in an LRU; lookups of cached keys never touch the database. A key
+    that is not cached is looked up in the table (outside the cache lock),
+    so evicted or never-loaded keys are not mistaken for new ones. Keys
+    the table does not have either are remembered in a second LRU of up
+    to max_entries, until they are touched or the next flush (other
+    shards may have written them by then). Sightings are
+    counted in memory and written every flush_interval seconds in one
+    transaction, as increments, so several caches over the same table
+    (detection shards) add up. The writes run on a flusher thread (see
+    start), never on the detection thread calling touch(). Evicted keys
+    with unwritten sightings are held until the next flush.
+    """
+    def __init__(self, connections: ConnectionManager, table: str, key_column: str,
+                 max_entries: int = 100000, flush_interval: float = 5.0):
+        self.connections = connections
+        self.table = table
+        self.key_column = key_column
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._dirty: Dict[str, List[Any]] = {}
+        self._absent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.flushes = 0
+
+    def load(self):
+        with self.connections.read() as conn:
+            rows = conn.execute(f'SELECT {self.key_column}, first_seen, last_seen, count FROM {self.table} '
+                                f'ORDER BY last_seen DESC LIMIT ?', (self.max_entries,)).fetchall()
+        with self._lock:
+            # Oldest first, so the most recent end up least likely to be evicted
+            for key, first_seen, last_seen, count in reversed(rows):
+                self._entries[key] = [first_seen, last_seen, count, 0]
+        logger.info(f"Loaded {len(rows)} {self.table} entries")
+
+    def start(self):
+        """
+        Starts the daemon thread flushing every flush_interval seconds.
+        """
+        self._flusher = threading.Thread(target=self._flush_loop, name=f"{self.table}-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """
+        Stops the flusher thread and writes what is left.
+        """
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            entry = self._cached(key)
+        if entry is None:
+            entry = self._load(key)
+        return entry is not _ABSENT
+
+    def touch(self, key: str, now: Optional[float] = None):
+        """
+        Records a sighting of key.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._cached(key)
+        if entry is None:
+            entry = self._load(key)
+        with self._lock:
+            if entry is _ABSENT:
+                self._absent.pop(key, None)
+                # Another thread may have created it meanwhile
+                entry = self._entries.get(key) or self._dirty.get(key)
+                if entry is None:
+                    entry = self._entries[key] = [now, now, 0, 0]
+                    self._evict()
+            entry[LAST_SEEN] = now
+            entry[COUNT] += 1
+            entry[PENDING] += 1
+            self._dirty[key] = entry
+
+    def _cached(self, key: str):
+        """
+        The entry of key, _ABSENT if key is known not to exist, or None if
+        the table has to be asked. Called with the lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._dirty.get(key)  # evicted before it was written
+        if entry is not None:
+            self.hits += 1
+            self._entries[key] = entry
+            self._evict()
+            return entry
+        if key in self._absent:
+            self._absent.move_to_end(key)
+            self.hits += 1
+            return _ABSENT
+        self.misses += 1
+        return None
+
+    def _load(self, key: str):
+        """
+        Looks key up in the table and caches the answer.
+        """
+        with self.connections.read() as conn:
+            row = conn.execute(f'SELECT first_seen, last_seen, count FROM {self.table} '
+                               f'WHERE {self.key_column} = ?', (key,)).fetchone()
+        with self._lock:
+            entry = self._entries.get(key) or self._dirty.get(key)
+            if entry is not None:
+                return entry
+            if row is None:
+                self._absent[key] = None
+                while len(self._absent) > self.max_entries:
+                    self._absent.popitem(last=False)
+                return _ABSENT
+            entry = self._entries[key] = [row[0], row[1], row[2], 0]
+            self._evict()
+            return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def flush(self):
+        """
+        Writes the unflushed sightings in one transaction.
+        """
+        with self._lock:
+            self._absent.clear()
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            rows = [(key, entry[FIRST_SEEN], entry[LAST_SEEN], entry[PENDING]) for key, entry in dirty.items()]
+            for entry in dirty.values():
+                entry[PENDING] = 0
+        try:
+            with self.connections.write() as conn:
+                conn.executemany(f'''
+                    INSERT INTO {self.table} ({self.key_column}, first_seen, last_seen, count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT({self.key_column}) DO UPDATE SET
+                        last_seen = max(last_seen, excluded.last_seen),
+                        count = count + excluded.count
+                ''', rows)
+            self.flushes += 1
+        except Exception as e:
+            logger.error(f"Error flushing {self.table}: {e}")
+            with self._lock:
+                # Put the sightings back for the next attempt
+                for (key, _, _, pending), entry in zip(rows, dirty.values()):
+                    entry[PENDING] += pending
+                    self._dirty.setdefault(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "dirty": len(self._dirty),
+                "absent": len(self._absent),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+                "flushes": self.flushes,
+            }
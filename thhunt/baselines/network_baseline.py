@@ -1,76 +1,56 @@
-import sqlite3
-import time
-from typing import Dict, Any
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class NetworkBaseline:
-    def __init__(self, db_path: str):
-        self.db_path = db_path
-        self._init_table()
-
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path, check_same_thread=False)
-
-    def _init_table(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS baseline_network (
-                remote_ip TEXT PRIMARY KEY,
-                first_seen REAL,
-                last_seen REAL,
-                count INTEGER DEFAULT 1
-            )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def update(self, remote_ip: str):
-        """
-        Updates the baseline with a seen remote IP.
-        """
-        if not remote_ip or remote_ip in ['127.0.0.1', '::1', '0.0.0.0']:
-            return
-
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        now = time.time()
-        
-        try:
-            cursor.execute('SELECT count FROM baseline_network WHERE remote_ip = ?', (remote_ip,))
-            row = cursor.fetchone()
-            
-            if row:
-                cursor.execute('''
-                    UPDATE baseline_network 
-                    SET last_seen = ?, count = count + 1 
-                    WHERE remote_ip = ?
-                ''', (now, remote_ip))
-            else:
-                cursor.execute('''
-                    INSERT INTO baseline_network (remote_ip, first_seen, last_seen, count)
-                    VALUES (?, ?, ?, 1)
-                ''', (remote_ip, now, now))
-            
-            conn.commit()
-        except Exception as e:
-            logger.error(f"Error updating network baseline: {e}")
-        finally:
-            conn.close()
-
-    def is_new(self, remote_ip: str) -> bool:
-        """
-        Checks if a remote IP is new.
-        """
-        if not remote_ip:
-            return False
-
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1 FROM baseline_network WHERE remote_ip = ?', (remote_ip,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        return row is None
+from .cache import BaselineCache
+from ..storage.connection import get_connection_manager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Local and unspecified addresses say nothing about what a host talks to
+EXCLUDED_IPS = frozenset({'127.0.0.1', '::1', '0.0.0.0'})
+
+class NetworkBaseline:
+    """
+    Seen remote IPs, answered from an in-memory BaselineCache and written
+    to baseline_network in batches; call flush() before reading the table.
+    """
+    def __init__(self, db_path: str, max_entries: int = 100000, flush_interval: float = 5.0):
+        self.db_path = db_path
+        self.connections = get_connection_manager(db_path)
+        self._init_table()
+        self.cache = BaselineCache(self.connections, "baseline_network", "remote_ip", max_entries, flush_interval)
+        self.cache.load()
+        self.cache.start()
+
+    def _init_table(self):
+        with self.connections.write() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS baseline_network (
+                    remote_ip TEXT PRIMARY KEY,
+                    first_seen REAL,
+                    last_seen REAL,
+                    count INTEGER DEFAULT 1
+                )
+            ''')
+
+    def update(self, remote_ip: str):
+        """
+        Updates the baseline with a seen remote IP.
+        """
+        if not remote_ip or remote_ip in EXCLUDED_IPS:
+            return
+
+        self.cache.touch(remote_ip)
+
+    def flush(self):
+        self.cache.flush()
+
+    def close(self):
+        self.cache.close()
+
+    def is_new(self, remote_ip: str) -> bool:
+        """
+        Checks if a remote IP is new. Addresses update() ignores never are.
+        """
+        if not remote_ip or remote_ip in EXCLUDED_IPS:
+            return False
+
+        return not self.cache.contains(remote_ip)
@@ -1,77 +1,54 @@
-import sqlite3
-import time
-from typing import Dict, Any
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class ProcessBaseline:
-    def __init__(self, db_path: str):
-        self.db_path = db_path
-        self._init_table()
-
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path, check_same_thread=False)
-
-    def _init_table(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS baseline_process (
-                path TEXT PRIMARY KEY,
-                first_seen REAL,
-                last_seen REAL,
-                count INTEGER DEFAULT 1,
-                is_known_good BOOLEAN DEFAULT 0
-            )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def update(self, process_path: str):
-        """
-        Updates the baseline with a seen process path.
-        """
-        if not process_path:
-            return
-
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        now = time.time()
-        
-        try:
-            cursor.execute('SELECT count FROM baseline_process WHERE path = ?', (process_path,))
-            row = cursor.fetchone()
-            
-            if row:
-                cursor.execute('''
-                    UPDATE baseline_process 
-                    SET last_seen = ?, count = count + 1 
-                    WHERE path = ?
-                ''', (now, process_path))
-            else:
-                cursor.execute('''
-                    INSERT INTO baseline_process (path, first_seen, last_seen, count)
-                    VALUES (?, ?, ?, 1)
-                ''', (process_path, now, now))
-            
-            conn.commit()
-        except Exception as e:
-            logger.error(f"Error updating process baseline: {e}")
-        finally:
-            conn.close()
-
-    def is_new(self, process_path: str) -> bool:
-        """
-        Checks if a process path is new (not in baseline).
-        """
-        if not process_path:
-            return False
-
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1 FROM baseline_process WHERE path = ?', (process_path,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        return row is None
+from .cache import BaselineCache
+from ..storage.connection import get_connection_manager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class ProcessBaseline:
+    """
+    Seen process paths, answered from an in-memory BaselineCache and written
+    to baseline_process in batches; call flush() before reading the table.
+    """
+    def __init__(self, db_path: str, max_entries: int = 100000, flush_interval: float = 5.0):
+        self.db_path = db_path
+        self.connections = get_connection_manager(db_path)
+        self._init_table()
+        self.cache = BaselineCache(self.connections, "baseline_process", "path", max_entries, flush_interval)
+        self.cache.load()
+        self.cache.start()
+
+    def _init_table(self):
+        with self.connections.write() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS baseline_process (
+                    path TEXT PRIMARY KEY,
+                    first_seen REAL,
+                    last_seen REAL,
+                    count INTEGER DEFAULT 1,
+                    is_known_good BOOLEAN DEFAULT 0
+                )
+            ''')
+
+    def update(self, process_path: str):
+        """
+        Updates the baseline with a seen process path.
+        """
+        if not process_path:
+            return
+
+        self.cache.touch(process_path)
+
+    def flush(self):
+        self.cache.flush()
+
+    def close(self):
+        self.cache.close()
+
+    def is_new(self, process_path: str) -> bool:
+        """
+        Checks if a process path is new (not in baseline).
+        """
+        if not process_path:
+            return False
+
+        return not self.cache.contains(process_path)
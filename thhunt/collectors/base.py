@@ -1,46 +1,112 @@
-from abc import ABC, abstractmethod
-import threading
-import time
-import queue
-from typing import Dict, Any
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class CollectorBase(ABC, threading.Thread):
-    def __init__(self, event_queue: queue.Queue, interval: int = 5):
-        super().__init__()
-        self.event_queue = event_queue
-        self.interval = interval
-        self.running = True
-        self.daemon = True # Daemon thread to exit when main program exits
-
-    def run(self):
-        logger.info(f"Starting collector: {self.__class__.__name__}")
-        while self.running:
-            try:
-                self.collect()
-            except Exception as e:
-                logger.error(f"Error in {self.__class__.__name__}: {e}")
-            
-            time.sleep(self.interval)
-        logger.info(f"Stopping collector: {self.__class__.__name__}")
-
-    def stop(self):
-        self.running = False
-
-    @abstractmethod
-    def collect(self):
-        """
-        Collect telemetry and put normalized events into self.event_queue
-        """
-        pass
-
-    def publish_event(self, event_type: str, payload: Dict[str, Any]):
-        event = {
-            "timestamp": time.time(),
-            "collector": self.__class__.__name__,
-            "type": event_type,
-            "payload": payload
-        }
-        self.event_queue.put(event)
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import threading
+import time
+import queue
+from typing import Dict, Any, Iterable, Iterator, Tuple, Union
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+@dataclass(frozen=True)
+class EventBatch:
+    """
+    Events of one type published together by one collector sweep. The
+    envelope (timestamp, collector, type, host_id) is shared by every
+    payload, so the batch costs one queue operation instead of one per
+    event.
+    """
+    timestamp: float
+    collector: str
+    type: str
+    host_id: str
+    payloads: Tuple[Dict[str, Any], ...]
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """
+        The batch as individual raw events, as publish_event would have
+        queued them.
+        """
+        for payload in self.payloads:
+            yield {
+                "timestamp": self.timestamp,
+                "collector": self.collector,
+                "type": self.type,
+                "host_id": self.host_id,
+                "payload": payload
+            }
+
+def iter_events(item: Union[EventBatch, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Raw events of an item taken off the event queue.
+    """
+    if isinstance(item, EventBatch):
+        return item.events()
+    return iter((item,))
+
+class CollectorBase(ABC, threading.Thread):
+    """
+    A polling collector. It either runs as its own thread (start(), which
+    calls collect() and sleeps interval seconds in a loop) or, when
+    schedulable, is driven by core.scheduler.CollectorScheduler, which
+    calls collect() every interval seconds from a shared worker pool.
+    Event-driven collectors override run() and set schedulable to False.
+    """
+    schedulable = True
+    # Stamped on every event; set by the service from the config
+    host_id = "unknown"
+
+    def __init__(self, event_queue: queue.Queue, interval: int = 5):
+        super().__init__()
+        self.event_queue = event_queue
+        self.interval = interval
+        self.running = True
+        self.daemon = True # Daemon thread to exit when main program exits
+
+    def run(self):
+        logger.info(f"Starting collector: {self.__class__.__name__}")
+        while self.running:
+            try:
+                self.collect()
+            except Exception as e:
+                logger.error(f"Error in {self.__class__.__name__}: {e}")
+            
+            time.sleep(self.interval)
+        logger.info(f"Stopping collector: {self.__class__.__name__}")
+
+    def stop(self):
+        self.running = False
+
+    @abstractmethod
+    def collect(self):
+        """
+        Collect telemetry and put normalized events into self.event_queue
+        """
+        pass
+
+    def publish_event(self, event_type: str, payload: Dict[str, Any]):
+        """
+        Queues a single event. Meant for low-rate sources; sweeps should use
+        publish_batch.
+        """
+        event = {
+            "timestamp": time.time(),
+            "collector": self.__class__.__name__,
+            "type": event_type,
+            "host_id": self.host_id,
+            "payload": payload
+        }
+        self.event_queue.put(event)
+
+    def publish_batch(self, event_type: str, payloads: Iterable[Dict[str, Any]]):
+        """
+        Queues payloads as one EventBatch. Nothing is queued for an empty
+        sweep.
+        """
+        payloads = tuple(payloads)
+        if not payloads:
+            return
+        self.event_queue.put(EventBatch(time.time(), self.__class__.__name__, event_type, self.host_id, payloads))
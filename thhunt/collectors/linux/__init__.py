@@ -1,2 +1,6 @@
-from .process import LinuxProcessCollector
-from .network import LinuxNetworkCollector
+from .process import LinuxProcessCollector
+from .process_events import LinuxProcEventCollector
+from .network import LinuxNetworkCollector
+from .files import LinuxFileCollector
+from .auth import LinuxAuthCollector
+from .persistence import LinuxPersistenceCollector
@@ -0,0 +1,228 @@
+import glob
+import os
+import queue
+import re
+from typing import Dict, Any, Iterator, List, Optional
+from ..base import CollectorBase
+from ...utils.logger import setup_logger
+from ...utils.state_file import load_json_state, save_json_state
+
+logger = setup_logger(__name__)
+
+DEFAULT_AUTH_LOGS = ["/var/log/auth.log", "/var/log/secure"]
+
+# "Jan  2 03:04:05 host prog[pid]: msg" or RFC 3339 timestamps (rsyslog high precision)
+_LINE_RE = re.compile(
+    r'^(?:[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\S+) \S+ (sshd|sudo|login)(?:\[\d+\])?: (.*)$',
+    re.MULTILINE
+)
+
+_SSHD_PATTERNS = [
+    (re.compile(r'^Accepted (\S+) for (\S+) from (\S+) port \d+'), "success"),
+    (re.compile(r'^Failed (\S+) for (?:invalid user )?(\S+) from (\S+) port \d+'), "failure"),
+]
+_SSHD_INVALID_USER = re.compile(r'^Invalid user (\S*) from (\S+)')
+_SUDO_COMMAND = re.compile(r'^\s*(\S+) : (?:(\d+ incorrect password attempts?|user NOT in sudoers|command not allowed) ; )?.*COMMAND=')
+_PAM_FAILURE = re.compile(r'^pam_unix\((\w+):auth\): authentication failure;.*\brhost=(\S*)\s+user=(\S+)')
+_PAM_SESSION = re.compile(r'^pam_unix\((\w+):session\): session opened for user (\S+?)(?:\(uid=\d+\))?(?: by|$)')
+_LOGIN_FAILED = re.compile(r"^FAILED LOGIN \(\d+\) on '[^']*'(?: FROM '([^']*)')? FOR '([^']*)'")
+_LOGIN_ROOT = re.compile(r"^ROOT LOGIN\s+on '[^']*'(?: FROM '([^']*)')?")
+
+def _auth(service, user, result, message, src_ip=None, method=None) -> Dict[str, Any]:
+    return {"user": user, "src_ip": src_ip or None, "result": result, "method": method,
+            "service": service, "message": message}
+
+def _parse_sshd(message: str) -> Optional[Dict[str, Any]]:
+    for pattern, result in _SSHD_PATTERNS:
+        m = pattern.match(message)
+        if m:
+            return _auth("ssh", m.group(2), result, message, m.group(3), m.group(1))
+    m = _SSHD_INVALID_USER.match(message)
+    if m:
+        return _auth("ssh", m.group(1), "failure", message, m.group(2))
+    return None
+
+def _parse_sudo(message: str) -> Optional[Dict[str, Any]]:
+    m = _SUDO_COMMAND.match(message)
+    if m:
+        return _auth("sudo", m.group(1), "failure" if m.group(2) else "success", message)
+    m = _PAM_FAILURE.match(message)
+    if m:
+        return _auth("sudo", m.group(3), "failure", message, m.group(2), "password")
+    return None
+
+def _parse_login(message: str) -> Optional[Dict[str, Any]]:
+    m = _LOGIN_FAILED.match(message)
+    if m:
+        return _auth("login", m.group(2), "failure", message, m.group(1))
+    m = _LOGIN_ROOT.match(message)
+    if m:
+        return _auth("login", "root", "success", message, m.group(1))
+    m = _PAM_SESSION.match(message)
+    if m and m.group(1) == "login":
+        return _auth("login", m.group(2), "success", message)
+    m = _PAM_FAILURE.match(message)
+    if m:
+        return _auth("login", m.group(3), "failure", message, m.group(2), "password")
+    return None
+
+_PARSERS = {"sshd": _parse_sshd, "sudo": _parse_sudo, "login": _parse_login}
+
+def parse_auth_lines(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields an auth_event payload for every sshd/sudo/login line in text
+    that records an authentication attempt; other lines are skipped.
+    """
+    for m in _LINE_RE.finditer(text):
+        payload = _PARSERS[m.group(1)](m.group(2))
+        if payload is not None:
+            yield payload
+
+
+class LinuxAuthCollector(CollectorBase):
+    """
+    Tails auth logs and publishes auth_event payloads.
+
+    Progress is kept as an (inode, offset) checkpoint per log path, written
+    atomically to checkpoint_path, so a restart resumes where it left off.
+    A changed inode means the log was rotated: the rest of the old file is
+    read first (from the open handle, or after a restart from the rotated
+    copy next to it), then the new file from the start. A file smaller than
+    the checkpoint offset was truncated and is re-read from the start.
+    Logs are read in chunk_size pieces, so a large backlog never has to fit
+    in memory.
+    """
+    CHUNK_SIZE = 1 << 20
+    CHECKPOINT_EVERY_BYTES = 64 << 20  # Also checkpoint mid-backlog
+
+    def __init__(self, event_queue: queue.Queue, interval: int = 2, paths: Optional[List[str]] = None,
+                 checkpoint_path: str = "thhunt.auth_checkpoint.json", chunk_size: int = CHUNK_SIZE):
+        super().__init__(event_queue, interval)
+        self.paths = paths if paths is not None else list(DEFAULT_AUTH_LOGS)
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self._files: Dict[str, Any] = {}  # path -> open binary handle
+        self._checkpoints: Dict[str, Dict[str, int]] = self._load_checkpoints()
+        self._dirty = False
+        self._unsaved_bytes = 0
+
+    def collect(self):
+        for path in self.paths:
+            try:
+                self._follow(path)
+            except Exception as e:
+                logger.error(f"Error tailing {path}: {e}")
+        self._save_checkpoints()
+
+    def stop(self):
+        super().stop()
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def _follow(self, path: str):
+        handle = self._files.get(path)
+        checkpoint = self._checkpoints.get(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            # Rotated away and not recreated yet: keep draining the old file
+            if handle is not None and checkpoint is not None:
+                self._read(path, handle, checkpoint)
+            return
+
+        if handle is not None and os.fstat(handle.fileno()).st_ino != st.st_ino:
+            logger.info(f"{path} was rotated")
+            self._read(path, handle, checkpoint, final=True)
+            handle.close()
+            del self._files[path]
+            handle = None
+            checkpoint = None
+        elif handle is None and checkpoint is not None and checkpoint["inode"] != st.st_ino:
+            rotated = self._find_rotated(path, checkpoint["inode"])
+            if rotated is not None:
+                logger.info(f"{path} was rotated while stopped, finishing {rotated}")
+                with open(rotated, 'rb') as old:
+                    self._read(path, old, checkpoint, final=True)
+            checkpoint = None
+
+        if checkpoint is None or checkpoint["inode"] != st.st_ino:
+            checkpoint = {"inode": st.st_ino, "offset": 0}
+            self._checkpoints[path] = checkpoint
+            self._dirty = True
+        elif st.st_size < checkpoint["offset"]:
+            logger.warning(f"{path} was truncated, reading from the start")
+            checkpoint["offset"] = 0
+            self._dirty = True
+
+        if handle is None:
+            handle = open(path, 'rb')
+            if os.fstat(handle.fileno()).st_ino != checkpoint["inode"]:
+                # Rotated between stat and open; picked up next time
+                handle.close()
+                return
+            self._files[path] = handle
+        if st.st_size > checkpoint["offset"]:
+            self._read(path, handle, checkpoint)
+
+    def _read(self, path: str, handle, checkpoint: Dict[str, int], final: bool = False):
+        """
+        Parses handle from the checkpoint offset to EOF, chunk by chunk. A
+        trailing partial line is left for the next call unless final.
+        """
+        handle.seek(checkpoint["offset"])
+        while True:
+            chunk = handle.read(self.chunk_size)
+            if not chunk:
+                break
+            end = chunk.rfind(b'\n') + 1
+            if end == 0:
+                if len(chunk) < self.chunk_size and not final:
+                    # Incomplete line, wait for the writer to finish it
+                    break
+                # A single line longer than a chunk (or the unterminated tail of a rotated log)
+                end = len(chunk)
+            elif end < len(chunk):
+                handle.seek(checkpoint["offset"] + end)
+
+            payloads = list(parse_auth_lines(chunk[:end].decode('utf-8', 'replace')))
+            for payload in payloads:
+                payload["log_path"] = path
+            self.publish_batch("auth_event", payloads)
+
+            checkpoint["offset"] += end
+            self._dirty = True
+            self._unsaved_bytes += end
+            if self._unsaved_bytes >= self.CHECKPOINT_EVERY_BYTES:
+                self._save_checkpoints()
+
+    def _find_rotated(self, path: str, inode: int) -> Optional[str]:
+        # logrotate's auth.log.1 or dateext's secure-20240101; compressed copies are skipped
+        for candidate in glob.glob(glob.escape(path) + '[.-]*'):
+            if candidate.endswith(('.gz', '.xz', '.bz2', '.zst')):
+                continue
+            try:
+                if os.stat(candidate).st_ino == inode:
+                    return candidate
+            except OSError:
+                continue
+        return None
+
+    def _load_checkpoints(self) -> Dict[str, Dict[str, int]]:
+        try:
+            data = load_json_state(self.checkpoint_path, {})
+            return {path: {"inode": int(cp["inode"]), "offset": int(cp["offset"])} for path, cp in data.items()}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable auth checkpoint {self.checkpoint_path}: {e}")
+            return {}
+
+    def _save_checkpoints(self):
+        if not self._dirty:
+            return
+        try:
+            save_json_state(self.checkpoint_path, self._checkpoints)
+        except OSError as e:
+            logger.error(f"Failed to save auth checkpoint: {e}")
+            return
+        self._dirty = False
+        self._unsaved_bytes = 0
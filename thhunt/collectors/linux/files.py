@@ -0,0 +1,188 @@
+import os
+import queue
+import stat
+import time
+from typing import Dict, Any, List
+from ..base import CollectorBase
+from .inotify import (
+    Inotify, IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE,
+    IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR,
+)
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+class LinuxFileCollector(CollectorBase):
+    """
+    Watches file_watch_paths recursively with inotify and publishes
+    file_change events (action: created, modified or deleted).
+
+    Events for a path are coalesced for coalesce_window seconds after the
+    first one, so a burst of writes becomes a single event, and all due
+    paths are published together. At most max_watches directories are
+    watched. Hashes of executables are attached later on the event path
+    (enrichment.hashing), so nothing is hashed per write.
+    """
+    schedulable = False
+    def __init__(self, event_queue: queue.Queue, paths: List[str], coalesce_window: float = 1.0,
+                 max_watches: int = 8192):
+        super().__init__(event_queue, interval=coalesce_window)
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._root_dirs = {path for path in self.paths if os.path.isdir(path)}
+        self.coalesce_window = coalesce_window
+        self.max_watches = max_watches
+        self._inotify = Inotify()
+        self._watches: Dict[int, str] = {}  # wd -> path
+        self._wds: Dict[str, int] = {}  # path -> wd
+        self._limit_logged = False
+        # path -> [action, is_directory, first seen (monotonic)]
+        self._pending: Dict[str, list] = {}
+
+        for path in self.paths:
+            self._add_tree(path)
+
+    def run(self):
+        logger.info(f"Starting collector: {self.__class__.__name__} ({len(self._watches)} watches)")
+        while self.running:
+            try:
+                self.collect(timeout=min(self.coalesce_window, 1.0))
+            except Exception as e:
+                logger.error(f"Error in {self.__class__.__name__}: {e}")
+        self.flush()
+        self._inotify.close()
+        logger.info(f"Stopping collector: {self.__class__.__name__}")
+
+    def collect(self, timeout: float = 0):
+        """
+        Processes queued inotify events, waiting up to timeout seconds for
+        the first one, then publishes every path whose window elapsed.
+        """
+        for wd, mask, _, name in self._inotify.read_events(timeout):
+            self._handle(wd, mask, name)
+        self.flush(due_only=True)
+
+    def flush(self, due_only: bool = False):
+        now = time.monotonic()
+        due = [path for path, (_, _, first_seen) in self._pending.items()
+               if not due_only or now - first_seen >= self.coalesce_window]
+        payloads = []
+        for path in due:
+            action, is_directory, _ = self._pending.pop(path)
+            payloads.append(self._build_payload(path, action, is_directory))
+        self.publish_batch("file_change", payloads)
+
+    def _add_watch(self, path: str) -> bool:
+        if len(self._watches) >= self.max_watches:
+            if not self._limit_logged:
+                logger.warning(f"File watch limit ({self.max_watches}) reached; {path} and further paths are not watched")
+                self._limit_logged = True
+            return False
+        try:
+            wd = self._inotify.add_watch(path, WATCH_MASK)
+        except OSError as e:
+            logger.error(f"Cannot watch {path}: {e}")
+            return False
+        self._watches[wd] = path
+        self._wds[path] = wd
+        return True
+
+    def _add_tree(self, root: str, report: bool = False):
+        """
+        Watches root and every directory below it. With report, entries
+        found inside are queued as created, since they may have appeared
+        before the watch existed.
+        """
+        if not self._add_watch(root) or not os.path.isdir(root):
+            return
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in dirnames[:]:
+                path = os.path.join(dirpath, name)
+                if report:
+                    self._queue(path, "created", True)
+                if os.path.islink(path) or not self._add_watch(path):
+                    dirnames.remove(name)
+            if report:
+                for name in filenames:
+                    self._queue(os.path.join(dirpath, name), "created", False)
+
+    def _remove_tree(self, root: str):
+        prefix = root + os.sep
+        for path in [p for p in self._wds if p == root or p.startswith(prefix)]:
+            wd = self._wds.pop(path)
+            self._watches.pop(wd, None)
+            self._inotify.rm_watch(wd)
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed; some file events were lost")
+            return
+        watched = self._watches.get(wd)
+        if watched is None:
+            return
+        if mask & IN_IGNORED:
+            # Watch removed by the kernel (path deleted or unmounted)
+            self._watches.pop(wd, None)
+            if self._wds.get(watched) == wd:
+                del self._wds[watched]
+            if watched in self.paths and os.path.exists(watched):
+                # A watched root replaced by rename, as editors save files
+                self._add_tree(watched)
+                self._queue(watched, "created", os.path.isdir(watched))
+            return
+
+        path = os.path.join(watched, name) if name else watched
+        is_directory = bool(mask & IN_ISDIR)
+
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            self._queue(path, "created", is_directory)
+            if is_directory:
+                self._add_tree(path, report=True)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._queue(path, "deleted", is_directory)
+            if is_directory:
+                self._remove_tree(path)
+        elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            # Only reported for the configured roots; children arrive via their parent
+            if path in self.paths:
+                self._queue(path, "deleted", path in self._root_dirs)
+        elif mask & (IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB):
+            self._queue(path, "modified", is_directory)
+
+    def _queue(self, path: str, action: str, is_directory: bool):
+        pending = self._pending.get(path)
+        if pending is None:
+            self._pending[path] = [action, is_directory, time.monotonic()]
+        # Writes to a file created in the same window are part of creating it
+        elif not (action == "modified" and pending[0] == "created"):
+            pending[0] = action
+            pending[1] = is_directory
+
+    def _build_payload(self, path: str, action: str, is_directory: bool) -> Dict[str, Any]:
+        payload = {
+            "path": path,
+            "action": action,
+            "is_directory": is_directory,
+            "hash": None,
+            "size": None,
+            "owner": None,
+            "group": None,
+            "permissions": None,
+        }
+        if action == "deleted":
+            return payload
+        try:
+            st = os.lstat(path)
+        except OSError:
+            # Gone again before we got to it
+            return payload
+        payload.update({
+            "is_directory": stat.S_ISDIR(st.st_mode),
+            "size": st.st_size,
+            "owner": str(st.st_uid),
+            "group": str(st.st_gid),
+            "permissions": oct(stat.S_IMODE(st.st_mode)),
+        })
+        return payload
@@ -0,0 +1,186 @@
+import os
+import socket
+import struct
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+NETLINK_SOCK_DIAG = 4
+NETLINK_CONNECTOR = 11
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 0x2
+NLMSG_DONE = 0x3
+
+TCP_STATES = {
+    "ESTABLISHED": 1, "SYN_SENT": 2, "SYN_RECV": 3, "FIN_WAIT1": 4, "FIN_WAIT2": 5,
+    "TIME_WAIT": 6, "CLOSE": 7, "CLOSE_WAIT": 8, "LAST_ACK": 9, "LISTEN": 10,
+    "CLOSING": 11, "NEW_SYN_RECV": 12,
+}
+ALL_STATES = 0xFFFFFFFF
+
+# cn_proc (linux/cn_proc.h)
+CN_IDX_PROC = 0x1
+CN_VAL_PROC = 0x1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+# struct nlmsghdr
+_NLMSGHDR = struct.Struct('=IHHII')
+# struct inet_diag_req_v2 (family, protocol, ext, pad, states) + struct inet_diag_sockid
+_REQUEST = struct.Struct('=BBBBI HH16s16sI8s')
+# struct nlmsghdr + struct inet_diag_msg, decoded in one unpack. Ports are
+# big-endian on the wire and are byte-swapped after unpacking.
+_DIAG_MSG = struct.Struct('=IHHII BBBB HH16s16sI8s IIIII')
+# struct cn_msg (idx, val, seq, ack, len, flags)
+_CN_MSG = struct.Struct('=IIIIHH')
+# struct proc_event header (what, cpu, timestamp_ns) followed by up to six
+# u32s of event_data, which covers the fork, exec and exit layouts
+_PROC_EVENT = struct.Struct('=IIQ6I')
+_PROC_EVENT_OFFSET = _NLMSGHDR.size + _CN_MSG.size
+
+def states_mask(states: Iterable[str]) -> int:
+    """
+    Converts TCP state names to an idiag_states bitmask; empty means all.
+    """
+    mask = 0
+    for state in states:
+        mask |= 1 << TCP_STATES[state.upper()]
+    return mask or ALL_STATES
+
+class SockDiagClient:
+    """
+    Dumps sockets straight from the kernel over NETLINK_SOCK_DIAG
+    (inet_diag), so state filtering happens kernel-side and replies are
+    fixed-layout binary records instead of text to parse.
+    """
+    RECV_BUFFER = 1 << 20
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG)
+        self._seq = 0
+
+    def close(self):
+        self._sock.close()
+
+    def dump(self, family: int, protocol: int, states: int = ALL_STATES) -> List[Dict[str, Any]]:
+        """
+        Returns one payload per socket, in the same shape the /proc/net
+        parser produces, plus uid.
+        """
+        self._seq += 1
+        request = _REQUEST.pack(family, protocol, 0, 0, states, 0, 0, b'', b'', 0, b'')
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(request), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, self._seq, 0)
+        self._sock.send(header + request)
+
+        protocol_name = "tcp" if protocol == socket.IPPROTO_TCP else "udp"
+        addr_len = 4 if family == socket.AF_INET else 16
+        ntop = socket.inet_ntop
+        ntohs = socket.ntohs
+        msg_size = _DIAG_MSG.size
+        unpack_from = _DIAG_MSG.unpack_from
+
+        sockets = []
+        while True:
+            data = self._sock.recv(self.RECV_BUFFER)
+            offset = 0
+            end = len(data)
+            while offset + _NLMSGHDR.size <= end:
+                length, msg_type = _NLMSGHDR.unpack_from(data, offset)[:2]
+                if msg_type == NLMSG_DONE:
+                    return sockets
+                if msg_type == NLMSG_ERROR:
+                    errno = -struct.unpack_from('=i', data, offset + _NLMSGHDR.size)[0]
+                    raise OSError(errno, os.strerror(errno))
+                if msg_type == SOCK_DIAG_BY_FAMILY and length >= msg_size:
+                    (_, _, _, _, _, msg_family, state, _, _, sport, dport, src, dst, _, _,
+                     _, _, _, uid, inode) = unpack_from(data, offset)
+                    sockets.append({
+                        "local_ip": ntop(msg_family, src[:addr_len]),
+                        "local_port": ntohs(sport),
+                        "remote_ip": ntop(msg_family, dst[:addr_len]),
+                        "remote_port": ntohs(dport),
+                        "protocol": protocol_name,
+                        "state": "%02X" % state,
+                        "pid": None,
+                        "process_name": None,
+                        "inode": str(inode),
+                        "uid": uid,
+                    })
+                # NLMSG_ALIGN
+                offset += (length + 3) & ~3
+                if length == 0:
+                    break
+
+class ProcConnector:
+    """
+    Subscribes to the kernel proc connector (NETLINK_CONNECTOR, cn_proc) for
+    fork/exec/exit notifications. Needs CAP_NET_ADMIN; the constructor
+    raises PermissionError without it.
+    """
+    RECV_BUFFER = 1 << 16
+    SOCKET_BUFFER = 4 << 20
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            # Bursts of short-lived processes overflow the default buffer
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.SOCKET_BUFFER)
+            self._sock.bind((0, CN_IDX_PROC))
+            self._send_op(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self._sock.close()
+            raise
+
+    def _send_op(self, op: int):
+        payload = _CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, 4, 0) + struct.pack('=I', op)
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), NLMSG_DONE, 0, 0, 0)
+        self._sock.send(header + payload)
+
+    def close(self):
+        try:
+            self._send_op(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def receive(self, timeout: Optional[float] = None) -> List[Tuple[int, tuple]]:
+        """
+        Waits up to timeout seconds for one datagram and returns its events
+        as (what, event_data) pairs, where event_data is:
+          fork: (parent_pid, parent_tgid, child_pid, child_tgid, ...)
+          exec: (process_pid, process_tgid, ...)
+          exit: (process_pid, process_tgid, exit_code, exit_signal, ...)
+        Raises socket.timeout when nothing arrived, and OSError(ENOBUFS)
+        when the kernel dropped events because we fell behind.
+        """
+        self._sock.settimeout(timeout)
+        data = self._sock.recv(self.RECV_BUFFER)
+        events = []
+        offset = 0
+        end = len(data)
+        while offset + _NLMSGHDR.size <= end:
+            length, msg_type = _NLMSGHDR.unpack_from(data, offset)[:2]
+            if msg_type == NLMSG_DONE and offset + _PROC_EVENT_OFFSET + _PROC_EVENT.size <= end:
+                idx, val = _CN_MSG.unpack_from(data, offset + _NLMSGHDR.size)[:2]
+                if idx == CN_IDX_PROC and val == CN_VAL_PROC:
+                    fields = _PROC_EVENT.unpack_from(data, offset + _PROC_EVENT_OFFSET)
+                    events.append((fields[0], fields[3:]))
+            if length == 0:
+                break
+            offset += (length + 3) & ~3
+        return events
+
+def open_sock_diag() -> Optional[SockDiagClient]:
+    """
+    Returns a SockDiagClient, or None if this kernel or sandbox does not
+    allow NETLINK_SOCK_DIAG.
+    """
+    try:
+        client = SockDiagClient()
+        client.dump(socket.AF_INET, socket.IPPROTO_TCP, 1 << TCP_STATES["LISTEN"])
+        return client
+    except (OSError, AttributeError):
+        return None
@@ -1,60 +1,134 @@
-import os
-from ..base import CollectorBase
-from ...utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class LinuxNetworkCollector(CollectorBase):
-    def collect(self):
-        """
-        Collects network connection information from /proc/net/tcp.
-        """
-        try:
-            with open('/proc/net/tcp', 'r') as f:
-                lines = f.readlines()
-                
-            # Skip header
-            for line in lines[1:]:
-                parts = line.strip().split()
-                if len(parts) < 10:
-                    continue
-                    
-                # Parse local and remote addresses
-                local_addr_hex, local_port_hex = parts[1].split(':')
-                remote_addr_hex, remote_port_hex = parts[2].split(':')
-                state = parts[3]
-                inode = parts[9]
-                
-                # Convert hex to IP/Port
-                local_ip = self._hex_to_ip(local_addr_hex)
-                local_port = int(local_port_hex, 16)
-                remote_ip = self._hex_to_ip(remote_addr_hex)
-                remote_port = int(remote_port_hex, 16)
-                
-                # Find PID from inode (simplified, would need to walk /proc/[pid]/fd/)
-                pid = self._find_pid_by_inode(inode)
-
-                payload = {
-                    "local_ip": local_ip,
-                    "local_port": local_port,
-                    "remote_ip": remote_ip,
-                    "remote_port": remote_port,
-                    "state": state,
-                    "pid": pid,
-                    "inode": inode
-                }
-                self.publish_event("network_connection", payload)
-
-        except Exception as e:
-            logger.error(f"Error in LinuxNetworkCollector: {e}")
-
-    def _hex_to_ip(self, hex_ip):
-        # Little-endian for Linux
-        try:
-            return ".".join(str(int(hex_ip[i:i+2], 16)) for i in range(6, -2, -2))
-        except:
-            return hex_ip
-
-    def _find_pid_by_inode(self, inode):
-        # Placeholder: Real implementation would walk /proc
-        return None
+import os
+import queue
+import socket
+import struct
+import time
+from ..base import CollectorBase
+from .procfs import SocketInodeIndex
+from .netlink import open_sock_diag, states_mask, TCP_STATES
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# /proc/net table -> protocol reported in the payload
+PROC_NET_TABLES = (("tcp", "tcp"), ("tcp6", "tcp"), ("udp", "udp"), ("udp6", "udp"))
+# (family, protocol) dumped by the netlink backend, same coverage as above
+SOCK_DIAG_TABLES = (
+    (socket.AF_INET, socket.IPPROTO_TCP), (socket.AF_INET6, socket.IPPROTO_TCP),
+    (socket.AF_INET, socket.IPPROTO_UDP), (socket.AF_INET6, socket.IPPROTO_UDP),
+)
+
+class LinuxNetworkCollector(CollectorBase):
+    def __init__(self, event_queue: queue.Queue, interval: int = 10, proc_root: str = '/proc',
+                 full_rescan_interval: int = 60, backend: str = "proc", states: list = None):
+        super().__init__(event_queue, interval)
+        self.proc_root = proc_root
+        # Only sockets in these TCP states are reported (empty: all states).
+        # The netlink backend filters kernel-side, the proc backend after parsing.
+        self.states = [state.upper() for state in (states or [])]
+        self._states_mask = states_mask(self.states)
+        self._state_codes = {"%02X" % TCP_STATES[state] for state in self.states}
+        self.sock_diag = None
+        if backend == "netlink":
+            self.sock_diag = open_sock_diag()
+            if self.sock_diag is None:
+                logger.warning("NETLINK_SOCK_DIAG unavailable, falling back to /proc/net parsing")
+        self.inode_index = SocketInodeIndex(proc_root)
+        # Sockets the incremental index cannot attribute trigger at most one
+        # full /proc/*/fd rescan per this many seconds
+        self.full_rescan_interval = full_rescan_interval
+        self._next_full_rescan = 0.0
+
+    def collect(self):
+        """
+        Collects TCP/UDP sockets (IPv4 and IPv6) from netlink sock_diag or
+        /proc/net and attributes each one to its owning process.
+        """
+        try:
+            self.inode_index.refresh()
+
+            connections = self._read_sockets()
+
+            # Retry misses once against a full rescan, rate limited
+            if any(self._find_pid_by_inode(c["inode"]) is None and c["inode"] != "0" for c in connections):
+                now = time.monotonic()
+                if now >= self._next_full_rescan:
+                    self._next_full_rescan = now + self.full_rescan_interval
+                    self.inode_index.rescan()
+
+            for payload in connections:
+                owner = self.inode_index.lookup(payload["inode"])
+                if owner is not None:
+                    payload["pid"], payload["process_name"] = owner
+            self.publish_batch("network_connection", connections)
+
+        except Exception as e:
+            logger.error(f"Error in LinuxNetworkCollector: {e}")
+
+    def _read_sockets(self) -> list:
+        if self.sock_diag is not None:
+            try:
+                connections = []
+                for family, protocol in SOCK_DIAG_TABLES:
+                    connections.extend(self.sock_diag.dump(family, protocol, self._states_mask))
+                return connections
+            except OSError as e:
+                logger.error(f"sock_diag dump failed, falling back to /proc/net parsing: {e}")
+                self.sock_diag.close()
+                self.sock_diag = None
+
+        connections = []
+        for table, protocol in PROC_NET_TABLES:
+            connections.extend(self._read_table(table, protocol))
+        if self._state_codes:
+            connections = [c for c in connections if c["state"] in self._state_codes]
+        return connections
+
+    def _read_table(self, table: str, protocol: str) -> list:
+        try:
+            with open(os.path.join(self.proc_root, 'net', table), 'r') as f:
+                lines = f.readlines()
+        except (IOError, OSError):
+            # e.g. IPv6 disabled
+            return []
+
+        connections = []
+        # Skip header
+        for line in lines[1:]:
+            parts = line.strip().split()
+            if len(parts) < 10:
+                continue
+
+            # Parse local and remote addresses
+            local_addr_hex, local_port_hex = parts[1].split(':')
+            remote_addr_hex, remote_port_hex = parts[2].split(':')
+            state = parts[3]
+            inode = parts[9]
+
+            connections.append({
+                "local_ip": self._hex_to_ip(local_addr_hex),
+                "local_port": int(local_port_hex, 16),
+                "remote_ip": self._hex_to_ip(remote_addr_hex),
+                "remote_port": int(remote_port_hex, 16),
+                "protocol": protocol,
+                "state": state,
+                "pid": None,
+                "process_name": None,
+                "inode": inode,
+                "uid": int(parts[7])
+            })
+        return connections
+
+    def _hex_to_ip(self, hex_ip):
+        # Addresses are stored as 32-bit words in host (little-endian) order
+        try:
+            if len(hex_ip) == 8:
+                return ".".join(str(int(hex_ip[i:i+2], 16)) for i in range(6, -2, -2))
+            packed = b"".join(struct.pack('<I', int(hex_ip[i:i+8], 16)) for i in range(0, 32, 8))
+            return socket.inet_ntop(socket.AF_INET6, packed)
+        except:
+            return hex_ip
+
+    def _find_pid_by_inode(self, inode):
+        owner = self.inode_index.lookup(inode)
+        return owner[0] if owner else None
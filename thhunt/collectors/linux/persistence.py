@@ -0,0 +1,217 @@
+import glob
+import hashlib
+import os
+import queue
+import stat
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from ..base import CollectorBase
+from ...utils.logger import setup_logger
+from ...utils.state_file import load_json_state, save_json_state
+
+logger = setup_logger(__name__)
+
+# (entry_name, command, user)
+Entry = Tuple[str, str, Optional[str]]
+
+def _owner_from_path(path: str, default: Optional[str]) -> Optional[str]:
+    if path.startswith('/home/'):
+        return path.split('/')[2]
+    if path.startswith('/root/'):
+        return "root"
+    return default
+
+def _lines(text: str):
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+def _is_env_assignment(line: str) -> bool:
+    name, sep, _ = line.partition('=')
+    return bool(sep) and ' ' not in name.strip() and '\t' not in name.strip()
+
+def _parse_crontab(text: str, user: Optional[str]) -> List[Entry]:
+    """
+    Parses crontab lines. System crontabs (user None) carry a user field
+    after the schedule; per-user crontabs do not.
+    """
+    entries = []
+    for line in _lines(text):
+        if _is_env_assignment(line):
+            continue
+        # "@reboot cmd" or "m h dom mon dow cmd"
+        schedule_fields = 1 if line.startswith('@') else 5
+        fields = line.split(None, schedule_fields)
+        if len(fields) <= schedule_fields:
+            continue
+        schedule = " ".join(fields[:schedule_fields])
+        command = fields[schedule_fields]
+        entry_user = user
+        if user is None:
+            user_command = command.split(None, 1)
+            if len(user_command) < 2:
+                continue
+            entry_user, command = user_command
+        entries.append((schedule, command, entry_user))
+    return entries
+
+def parse_system_crontab(path: str, text: str) -> List[Entry]:
+    return _parse_crontab(text, None)
+
+def parse_user_crontab(path: str, text: str) -> List[Entry]:
+    return _parse_crontab(text, os.path.basename(path))
+
+def parse_cron_script(path: str, text: str) -> List[Entry]:
+    # run-parts executes the whole file; the script itself is the entry
+    return [(os.path.basename(path), path, "root")]
+
+def parse_systemd_unit(path: str, text: str) -> List[Entry]:
+    user = _owner_from_path(path, "root")
+    commands = []
+    for line in _lines(text):
+        key, sep, value = line.partition('=')
+        key = key.strip()
+        if not sep:
+            continue
+        if key == "User":
+            user = value.strip()
+        elif key in ("ExecStart", "ExecStartPre", "ExecStartPost", "ExecReload", "ExecStop"):
+            if value.strip():
+                commands.append(value.strip())
+    name = os.path.basename(path)
+    return [(name, command, user) for command in commands]
+
+def parse_shell_lines(path: str, text: str) -> List[Entry]:
+    # Files under /etc apply to every user
+    user = _owner_from_path(path, "root" if os.path.basename(path) == "rc.local" else None)
+    name = os.path.basename(path)
+    return [(name, line, user) for line in _lines(text)]
+
+# (mechanism, path patterns relative to the root, parser)
+PERSISTENCE_SOURCES: List[Tuple[str, List[str], Callable[[str, str], List[Entry]]]] = [
+    ("crontab", ["etc/crontab", "etc/cron.d/*"], parse_system_crontab),
+    ("crontab", ["var/spool/cron/crontabs/*", "var/spool/cron/*"], parse_user_crontab),
+    ("cron_script", ["etc/cron.hourly/*", "etc/cron.daily/*", "etc/cron.weekly/*", "etc/cron.monthly/*"], parse_cron_script),
+    ("systemd", [
+        "etc/systemd/system/*.service", "etc/systemd/system/*/*.service",
+        "usr/lib/systemd/system/*.service", "lib/systemd/system/*.service",
+        "etc/systemd/user/*.service", "root/.config/systemd/user/*.service",
+        "home/*/.config/systemd/user/*.service",
+    ], parse_systemd_unit),
+    ("rc_local", ["etc/rc.local"], parse_shell_lines),
+    ("shell_profile", [
+        "etc/profile", "etc/profile.d/*", "etc/bash.bashrc", "etc/bashrc", "etc/zsh/zshrc",
+        "root/.bashrc", "root/.profile", "root/.bash_profile", "root/.zshrc",
+        "home/*/.bashrc", "home/*/.profile", "home/*/.bash_profile", "home/*/.zshrc",
+    ], parse_shell_lines),
+]
+
+class LinuxPersistenceCollector(CollectorBase):
+    """
+    Tracks cron, systemd, rc.local and shell profile persistence and
+    publishes one persistence_change per added or removed entry. A file
+    whose content changed without changing its entries (a rewritten cron
+    script, which is its own single entry) has its entries published with
+    action "modified".
+
+    A manifest of (mtime, size, inode, content hash) per file is kept and
+    saved to manifest_path, so an unchanged file costs one stat per cycle
+    and a restart does not re-report the whole system. Only files whose
+    stat changed are read; only those whose hash changed are parsed and
+    diffed against the entries recorded for them. On the very first scan
+    every entry is published once with action "existing".
+    """
+    MAX_FILE_BYTES = 1 << 20
+
+    def __init__(self, event_queue: queue.Queue, interval: int = 60,
+                 manifest_path: str = "thhunt.persistence_manifest.json", root: str = '/'):
+        super().__init__(event_queue, interval)
+        self.manifest_path = manifest_path
+        self.root = root
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._baseline = not self._manifest
+
+    def collect(self):
+        changed = False
+        seen = set()
+        for mechanism, patterns, parser in PERSISTENCE_SOURCES:
+            for pattern in patterns:
+                for real_path in glob.glob(os.path.join(self.root, pattern)):
+                    # Reported and recorded as seen from inside root
+                    path = '/' + os.path.relpath(real_path, self.root)
+                    if path in seen:
+                        continue
+                    seen.add(path)
+                    try:
+                        changed |= self._check(path, real_path, mechanism, parser)
+                    except Exception as e:
+                        logger.error(f"Error checking persistence file {path}: {e}")
+
+        for path in self._manifest.keys() - seen:
+            self._publish_entries(path, self._manifest.pop(path), "removed")
+            changed = True
+
+        self._baseline = False
+        if changed:
+            try:
+                save_json_state(self.manifest_path, self._manifest)
+            except OSError as e:
+                logger.error(f"Failed to save persistence manifest: {e}")
+
+    def _check(self, path: str, real_path: str, mechanism: str, parser) -> bool:
+        """
+        Returns True if the manifest changed.
+        """
+        try:
+            st = os.stat(real_path)
+        except OSError:
+            # Dangling symlink or vanished
+            return False
+        if not stat.S_ISREG(st.st_mode):
+            return False
+
+        known = self._manifest.get(path)
+        signature = [st.st_mtime_ns, st.st_size, st.st_ino]
+        if known is not None and known["stat"] == signature:
+            return False
+
+        with open(real_path, 'rb') as f:
+            data = f.read(self.MAX_FILE_BYTES)
+        digest = hashlib.sha256(data).hexdigest()
+        if known is not None and known["hash"] == digest:
+            # Touched or replaced with identical content
+            known["stat"] = signature
+            return True
+
+        entries = sorted(set(parser(path, data.decode('utf-8', 'replace'))))
+        record = {"mechanism": mechanism, "stat": signature, "hash": digest, "entries": [list(e) for e in entries]}
+        self._manifest[path] = record
+
+        if known is None:
+            self._publish_entries(path, record, "existing" if self._baseline else "added")
+        else:
+            old = {tuple(e) for e in known["entries"]}
+            new = set(entries)
+            if old == new:
+                self._publish_entries(path, record, "modified")
+            else:
+                self._publish_entries(path, dict(record, entries=sorted(new - old)), "added")
+                self._publish_entries(path, dict(known, entries=sorted(old - new)), "removed")
+        return True
+
+    def _publish_entries(self, path: str, record: Dict[str, Any], action: str):
+        self.publish_batch("persistence_change", ({
+            "mechanism": record["mechanism"],
+            "entry_name": entry_name,
+            "command": command,
+            "path": path,
+            "user": user,
+            "action": action,
+        } for entry_name, command, user in record["entries"]))
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return load_json_state(self.manifest_path, {})
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable persistence manifest {self.manifest_path}: {e}")
+            return {}
@@ -1,63 +1,145 @@
-import os
-import time
-from ..base import CollectorBase
-from ...utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class LinuxProcessCollector(CollectorBase):
-    def collect(self):
-        """
-        Collects process information by iterating over /proc.
-        """
-        try:
-            # Iterate over all PIDs in /proc
-            pids = [pid for pid in os.listdir('/proc') if pid.isdigit()]
-            
-            for pid in pids:
-                try:
-                    pid_path = os.path.join('/proc', pid)
-                    
-                    # Read command line
-                    try:
-                        with open(os.path.join(pid_path, 'cmdline'), 'r') as f:
-                            cmdline = f.read().replace('\0', ' ').strip()
-                    except (IOError, OSError):
-                        cmdline = ""
-
-                    # Read status for Name, PPID, Uid
-                    status = {}
-                    try:
-                        with open(os.path.join(pid_path, 'status'), 'r') as f:
-                            for line in f:
-                                parts = line.split(':', 1)
-                                if len(parts) == 2:
-                                    status[parts[0].strip()] = parts[1].strip()
-                    except (IOError, OSError):
-                        pass
-
-                    # Read exe link
-                    try:
-                        exe_path = os.readlink(os.path.join(pid_path, 'exe'))
-                    except (IOError, OSError):
-                        exe_path = ""
-
-                    # Construct payload
-                    if status.get("Name"):
-                        payload = {
-                            "pid": int(pid),
-                            "ppid": int(status.get("PPid", 0)),
-                            "name": status.get("Name"),
-                            "path": exe_path,
-                            "cmdline": cmdline,
-                            "user": status.get("Uid", "").split()[0] if status.get("Uid") else "unknown",
-                            # "start_time": ... # Could read /proc/uptime and /proc/[pid]/stat to calc start time
-                        }
-                        self.publish_event("process_snapshot", payload)
-
-                except Exception as e:
-                    # Process might have ended while reading
-                    continue
-
-        except Exception as e:
-            logger.error(f"Error in LinuxProcessCollector: {e}")
+import os
+import time
+import queue
+from typing import Dict, Any, Tuple
+from ..base import CollectorBase
+from .procfs import read_stat, read_boot_time, CLOCK_TICKS
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class LinuxProcessCollector(CollectorBase):
+    """
+    Collects processes from /proc.
+
+    In "snapshot" mode every process is published as a process_snapshot on
+    every sweep. In "delta" mode the collector keeps a live process table
+    keyed by (pid, start time) and only publishes process_start (including
+    an exec within a known process) and process_exit when the table
+    changes, plus a full snapshot on the first sweep and every
+    resync_interval seconds (0 disables resyncs).
+
+    The same table doubles as a static-attribute cache in both modes, see
+    _scan.
+    """
+    def __init__(self, event_queue: queue.Queue, interval: int = 5, mode: str = "snapshot",
+                 resync_interval: int = 0, proc_root: str = '/proc'):
+        super().__init__(event_queue, interval)
+        self.mode = mode
+        self.resync_interval = resync_interval
+        self.proc_root = proc_root
+        self.boot_time = read_boot_time(proc_root)
+        self._table: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._next_resync = None
+
+    def collect(self):
+        """
+        Collects process information by iterating over /proc.
+        """
+        try:
+            processes = self._scan()
+        except Exception as e:
+            logger.error(f"Error in LinuxProcessCollector: {e}")
+            return
+
+        previous, self._table = self._table, processes
+
+        if self.mode != "delta":
+            self.publish_batch("process_snapshot", processes.values())
+            return
+
+        now = time.monotonic()
+        if self._next_resync is None or (self.resync_interval and now >= self._next_resync):
+            self._next_resync = now + self.resync_interval
+            self.publish_batch("process_snapshot", processes.values())
+            return
+
+        self._publish_changes(previous, processes)
+
+    def _publish_changes(self, previous: Dict[Tuple[int, int], Dict[str, Any]],
+                         processes: Dict[Tuple[int, int], Dict[str, Any]]):
+        # A same-key process with a new name has exec'd a new program
+        self.publish_batch("process_start", (
+            payload for key, payload in processes.items()
+            if key not in previous or previous[key]["name"] != payload["name"]
+        ))
+        self.publish_batch("process_exit", (previous[key] for key in previous.keys() - processes.keys()))
+
+    def _scan(self) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """
+        Sweeps /proc, keyed by (pid, start time in ticks) so that a reused
+        pid is seen as a different process.
+
+        Static attributes (cmdline, exe, uid) are read once per process
+        lifetime: a process already in the table from the previous sweep
+        only costs one read of /proc/[pid]/stat. A changed comm means the
+        process exec'd since we cached it, so it is re-read.
+        """
+        previous = self._table
+        processes = {}
+        with os.scandir(self.proc_root) as entries:
+            for entry in entries:
+                pid = entry.name
+                if not pid.isdigit():
+                    continue
+                pid_path = entry.path
+
+                stat = read_stat(pid_path)
+                if stat is None:
+                    # Process ended while reading
+                    continue
+                name, ppid, starttime = stat
+                key = (int(pid), starttime)
+
+                payload = previous.get(key)
+                if payload is not None and payload["name"] == name:
+                    if payload["ppid"] != ppid:
+                        # Re-parented after its parent exited
+                        payload = dict(payload, ppid=ppid)
+                    processes[key] = payload
+                    continue
+
+                payload = self._read_static(pid_path, key[0], name, ppid, starttime)
+                if payload is not None:
+                    processes[key] = payload
+
+        return processes
+
+    def _read_static(self, pid_path: str, pid: int, name: str, ppid: int, starttime: int):
+        try:
+            # Read command line
+            try:
+                with open(os.path.join(pid_path, 'cmdline'), 'r') as f:
+                    cmdline = f.read().replace('\0', ' ').strip()
+            except (IOError, OSError):
+                cmdline = ""
+
+            # Read Uid from status
+            user = "unknown"
+            try:
+                with open(os.path.join(pid_path, 'status'), 'r') as f:
+                    for line in f:
+                        if line.startswith('Uid:'):
+                            user = line.split()[1]
+                            break
+            except (IOError, OSError):
+                return None
+
+            # Read exe link
+            try:
+                exe_path = os.readlink(os.path.join(pid_path, 'exe'))
+            except (IOError, OSError):
+                exe_path = ""
+
+            return {
+                "pid": pid,
+                "ppid": ppid,
+                "name": name,
+                "path": exe_path,
+                "cmdline": cmdline,
+                "user": user,
+                "start_time": self.boot_time + starttime / CLOCK_TICKS,
+            }
+        except Exception:
+            # Process might have ended while reading
+            return None
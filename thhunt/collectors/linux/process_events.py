@@ -0,0 +1,193 @@
+import errno
+import os
+import queue
+import socket
+from typing import Dict, Any, Optional
+from .netlink import ProcConnector, PROC_EVENT_FORK, PROC_EVENT_EXEC, PROC_EVENT_EXIT
+from .process import LinuxProcessCollector
+from .procfs import read_stat
+from ...utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class LinuxProcEventCollector(LinuxProcessCollector):
+    """
+    Event-driven process collection from the kernel proc connector, so
+    processes that live for less than a polling interval are still seen.
+
+    On start the current process table is published once as
+    process_snapshot events. After that every exec is published as a
+    process_start and every process exit as a process_exit, the event
+    types of delta mode, with the same payload schema as
+    LinuxProcessCollector.
+
+    /proc is not read in the exec handler. Execs are held until whatever
+    the kernel has queued (up to MAX_BURST events) has been handled, then
+    read from /proc in one pass and published as one batch. A process
+    that exits within the burst is read as soon as its exit is handled,
+    while its /proc entry may still be there; only if it is already gone
+    is it reported from its pid and the parent pid of the fork event. A
+    pid that execs again within the burst is read once.
+
+    Without the privilege the connector needs (CAP_NET_ADMIN), or on
+    kernels without it, the collector falls back to polling /proc exactly
+    like LinuxProcessCollector with the same mode and interval.
+    """
+    schedulable = False
+    # Forked children not yet exec'd or exited; bounds memory under fork storms
+    MAX_PENDING_FORKS = 65536
+    # Connector events handled before held execs are read and published
+    MAX_BURST = 512
+
+    def __init__(self, event_queue: queue.Queue, interval: int = 5, mode: str = "snapshot",
+                 resync_interval: int = 0, proc_root: str = '/proc'):
+        super().__init__(event_queue, interval, mode=mode, resync_interval=resync_interval, proc_root=proc_root)
+        self._pid_keys: Dict[int, tuple] = {}
+        self._forks: Dict[int, int] = {}  # child pid -> parent pid
+        self._execs: Dict[int, None] = {}  # exec'd pids not read from /proc yet, in exec order
+
+    def run(self):
+        try:
+            connector = ProcConnector()
+        except OSError as e:
+            logger.warning(f"Proc connector unavailable ({e}), falling back to polling /proc")
+            super().run()
+            return
+
+        logger.info(f"Starting collector: {self.__class__.__name__}")
+        try:
+            self._sync(initial=True)
+            while self.running:
+                try:
+                    events = self._receive_burst(connector)
+                except socket.timeout:
+                    continue
+                except OSError as e:
+                    if e.errno != errno.ENOBUFS:
+                        raise
+                    # The kernel dropped events; diff against /proc to catch up
+                    logger.warning("Proc connector overrun, resyncing from /proc")
+                    self._sync()
+                    continue
+                for what, data in events:
+                    self.handle_event(what, data)
+                self.flush_execs()
+        except Exception as e:
+            logger.error(f"Error in {self.__class__.__name__}: {e}")
+        finally:
+            connector.close()
+
+        if self.running:
+            logger.warning("Proc connector failed, falling back to polling /proc")
+            super().run()
+            return
+        logger.info(f"Stopping collector: {self.__class__.__name__}")
+
+    def _receive_burst(self, connector: ProcConnector) -> list:
+        """
+        Waits for connector events, then takes whatever else is already
+        queued, up to MAX_BURST events.
+        """
+        events = connector.receive(timeout=1.0)
+        while len(events) < self.MAX_BURST:
+            try:
+                events.extend(connector.receive(timeout=0))
+            except BlockingIOError:
+                break
+        return events
+
+    def _sync(self, initial: bool = False):
+        """
+        Rebuilds the process table from /proc. The first sync publishes it as
+        a snapshot, later ones only the differences.
+        """
+        # Held execs are in the new table, and so among the differences
+        self._execs.clear()
+        previous, self._table = self._table, self._scan()
+        self._pid_keys = {key[0]: key for key in self._table}
+        if initial:
+            self.publish_batch("process_snapshot", self._table.values())
+        else:
+            self._publish_changes(previous, self._table)
+
+    def handle_event(self, what: int, data: tuple):
+        if what == PROC_EVENT_FORK:
+            parent_tgid, child_pid, child_tgid = data[1], data[2], data[3]
+            if child_pid == child_tgid:
+                # New process rather than a new thread
+                if len(self._forks) >= self.MAX_PENDING_FORKS:
+                    del self._forks[next(iter(self._forks))]
+                self._forks[child_pid] = parent_tgid
+        elif what == PROC_EVENT_EXEC:
+            self._on_exec(data[1])
+        elif what == PROC_EVENT_EXIT:
+            pid, tgid, exit_code = data[0], data[1], data[2]
+            if pid == tgid:
+                self._on_exit(tgid, exit_code)
+
+    def _on_exec(self, pid: int):
+        self._execs.pop(pid, None)
+        self._execs[pid] = None
+
+    def flush_execs(self):
+        """
+        Reads the held execs from /proc and publishes them as one batch.
+        """
+        payloads = [self._start(pid, self._enrich(pid)) for pid in self._execs]
+        self._execs.clear()
+        self.publish_batch("process_start", payloads)
+
+    def _start(self, pid: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        old_key = self._pid_keys.pop(pid, None)
+        if old_key is not None:
+            self._table.pop(old_key, None)
+        key = (pid, payload.pop("_starttime"))
+        self._table[key] = payload
+        self._pid_keys[pid] = key
+        return payload
+
+    def _on_exit(self, pid: int, exit_code: int):
+        if pid in self._execs:
+            # Exiting before the flush: read it now, before it is reaped
+            del self._execs[pid]
+            self.publish_event("process_start", self._start(pid, self._enrich(pid)))
+        self._forks.pop(pid, None)
+        key = self._pid_keys.pop(pid, None)
+        if key is None:
+            # Forked but never exec'd, so never published
+            return
+        payload = self._table.pop(key, None)
+        if payload is not None:
+            self.publish_event("process_exit", dict(payload, exit_code=exit_code))
+
+    def _enrich(self, pid: int) -> Dict[str, Any]:
+        """
+        Reads the freshly exec'd process from /proc. Returns a payload plus
+        a _starttime key for the table.
+        """
+        ppid = self._forks.pop(pid, None)
+        pid_path = os.path.join(self.proc_root, str(pid))
+        stat = read_stat(pid_path)
+        if stat is not None:
+            name, ppid, starttime = stat
+            payload = self._read_static(pid_path, pid, name, ppid, starttime)
+            if payload is not None:
+                payload["_starttime"] = starttime
+                return payload
+        return self._unread(pid, ppid)
+
+    def _unread(self, pid: int, ppid: Optional[int]) -> Dict[str, Any]:
+        """
+        Payload of a process that could not be read from /proc: all we know
+        is what the connector told us.
+        """
+        return {
+            "pid": pid,
+            "ppid": ppid,
+            "name": None,
+            "path": None,
+            "cmdline": None,
+            "user": None,
+            "start_time": None,
+            "_starttime": 0,
+        }
@@ -0,0 +1,120 @@
+import os
+from typing import Dict, Optional, Set, Tuple
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+def read_stat(pid_path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Parses /proc/[pid]/stat into (comm, ppid, starttime in clock ticks).
+    Returns None if the process is gone.
+    """
+    try:
+        with open(os.path.join(pid_path, 'stat'), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm is wrapped in parentheses and may itself contain spaces or ')'
+    open_paren = data.find(b'(')
+    close_paren = data.rfind(b')')
+    if open_paren < 0 or close_paren < 0:
+        return None
+    comm = data[open_paren + 1:close_paren].decode('utf-8', 'replace')
+    fields = data[close_paren + 2:].split()
+    # fields[0] is field 3 (state) in proc(5), so ppid is fields[1], starttime fields[19]
+    try:
+        return comm, int(fields[1]), int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+def read_boot_time(proc_root: str = '/proc') -> float:
+    """
+    Returns the system boot time (epoch seconds) from /proc/stat.
+    """
+    try:
+        with open(os.path.join(proc_root, 'stat'), 'r') as f:
+            for line in f:
+                if line.startswith('btime'):
+                    return float(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0.0
+
+
+class SocketInodeIndex:
+    """
+    Maps socket inodes to the (pid, name) of a process holding them, built
+    from /proc/[pid]/fd.
+
+    refresh() is incremental: a pid's fd directory is only re-read when it
+    is new or its signature (inode, size, mtime of /proc/[pid]/fd; size is
+    the open fd count on current kernels) changed. Lookups are dict hits.
+    rescan() re-reads every pid and is meant for lookups that still miss,
+    e.g. an fd swapped for another without changing the count.
+    """
+    def __init__(self, proc_root: str = '/proc'):
+        self.proc_root = proc_root
+        self._by_inode: Dict[str, Tuple[int, str]] = {}
+        self._pids: Dict[int, Tuple[tuple, Set[str]]] = {}  # pid -> (signature, socket inodes)
+
+    def refresh(self, force: bool = False):
+        seen = set()
+        with os.scandir(self.proc_root) as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                pid = int(entry.name)
+                fd_path = os.path.join(entry.path, 'fd')
+                try:
+                    st = os.stat(fd_path)
+                except OSError:
+                    continue
+                seen.add(pid)
+                signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+                known = self._pids.get(pid)
+                if not force and known is not None and known[0] == signature:
+                    continue
+                self._scan_pid(pid, entry.path, fd_path, signature)
+
+        for pid in self._pids.keys() - seen:
+            self._forget(pid)
+
+    def rescan(self):
+        self.refresh(force=True)
+
+    def lookup(self, inode: str) -> Optional[Tuple[int, str]]:
+        return self._by_inode.get(inode)
+
+    def _scan_pid(self, pid: int, pid_path: str, fd_path: str, signature: tuple):
+        inodes = set()
+        try:
+            with os.scandir(fd_path) as fds:
+                for fd in fds:
+                    try:
+                        target = os.readlink(fd.path)
+                    except OSError:
+                        continue
+                    if target.startswith('socket:['):
+                        inodes.add(target[8:-1])
+        except OSError:
+            # Exited, or not ours to read
+            self._forget(pid)
+            return
+
+        try:
+            with open(os.path.join(pid_path, 'comm'), 'r') as f:
+                name = f.read().strip()
+        except OSError:
+            name = ""
+
+        self._forget(pid)
+        self._pids[pid] = (signature, inodes)
+        for inode in inodes:
+            self._by_inode[inode] = (pid, name)
+
+    def _forget(self, pid: int):
+        known = self._pids.pop(pid, None)
+        if known is None:
+            return
+        for inode in known[1]:
+            if self._by_inode.get(inode, (None,))[0] == pid:
+                del self._by_inode[inode]
@@ -1,2 +1,2 @@
-from .process import MacOSProcessCollector
-from .network import MacOSNetworkCollector
+from .process import MacOSProcessCollector
+from .network import MacOSNetworkCollector
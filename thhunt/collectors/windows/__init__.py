@@ -1,2 +1,2 @@
-from .process import WindowsProcessCollector
-from .network import WindowsNetworkCollector
+from .process import WindowsProcessCollector
+from .network import WindowsNetworkCollector
@@ -1,36 +1,63 @@
-import os
-import yaml
-import platform
-import uuid
-from .schema import Config, DatabaseConfig, LLMConfig, CollectorConfig, DetectionConfig, APIConfig
-
-def load_config(config_path: str = "config.yaml") -> Config:
-    """
-    Loads configuration from a YAML file or returns defaults.
-    """
-    
-    # Default values
-    os_type = platform.system().lower()
-    host_id = str(uuid.uuid4())
-    
-    config_data = {}
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f) or {}
-        except Exception as e:
-            print(f"Error loading config file: {e}")
-
-    # Helper to load nested configs
-    def load_section(section_class, section_name):
-        return section_class(**config_data.get(section_name, {}))
-
-    return Config(
-        os_type=config_data.get('os_type', os_type),
-        host_id=config_data.get('host_id', host_id),
-        database=load_section(DatabaseConfig, 'database'),
-        llm=load_section(LLMConfig, 'llm'),
-        collectors=load_section(CollectorConfig, 'collectors'),
-        detection=load_section(DetectionConfig, 'detection'),
-        api=load_section(APIConfig, 'api')
-    )
+import os
+import yaml
+import platform
+import uuid
+from .schema import Config, DatabaseConfig, LLMConfig, CollectorConfig, QueueConfig, HashingConfig, DetectionConfig, APIConfig
+
+# Values accepted for the PRAGMAs taken from DatabaseConfig, by name and number
+PRAGMA_VALUES = {
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+}
+
+def validate_database_config(config: DatabaseConfig) -> DatabaseConfig:
+    """
+    Checks the settings that go into PRAGMA statements verbatim, and
+    normalizes them to the upper-case name.
+    """
+    for name, allowed in PRAGMA_VALUES.items():
+        value = getattr(config, name)
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(allowed):
+            value = allowed[value]
+        elif isinstance(value, str) and value.strip().upper() in allowed:
+            value = value.strip().upper()
+        elif isinstance(value, str) and value.strip().isdigit() and int(value) < len(allowed):
+            value = allowed[int(value)]
+        else:
+            raise ValueError(f"database.{name} must be one of {', '.join(allowed)} "
+                             f"(or 0-{len(allowed) - 1}), got {value!r}")
+        setattr(config, name, value)
+    return config
+
+def load_config(config_path: str = "config.yaml") -> Config:
+    """
+    Loads configuration from a YAML file or returns defaults.
+    """
+    
+    # Default values
+    os_type = platform.system().lower()
+    host_id = str(uuid.uuid4())
+    
+    config_data = {}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                config_data = yaml.safe_load(f) or {}
+        except Exception as e:
+            print(f"Error loading config file: {e}")
+
+    # Helper to load nested configs
+    def load_section(section_class, section_name):
+        return section_class(**config_data.get(section_name, {}))
+
+    return Config(
+        os_type=config_data.get('os_type', os_type),
+        host_id=config_data.get('host_id', host_id),
+        database=validate_database_config(load_section(DatabaseConfig, 'database')),
+        llm=load_section(LLMConfig, 'llm'),
+        collectors=load_section(CollectorConfig, 'collectors'),
+        queue=load_section(QueueConfig, 'queue'),
+        hashing=load_section(HashingConfig, 'hashing'),
+        detection=load_section(DetectionConfig, 'detection'),
+        api=load_section(APIConfig, 'api')
+    )
@@ -1,39 +1,115 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
-
-@dataclass
-class DatabaseConfig:
-    path: str = "thhunt.db"
-
-@dataclass
-class LLMConfig:
-    provider: str = "ollama"  # ollama, lmstudio, etc.
-    base_url: str = "http://localhost:11434"
-    model: str = "llama3"
-    timeout: int = 30
-
-@dataclass
-class CollectorConfig:
-    process_interval_seconds: int = 5
-    network_interval_seconds: int = 10
-    file_watch_paths: List[str] = field(default_factory=list)
-
-@dataclass
-class DetectionConfig:
-    rules_path: str = "rules/"
-    enable_anomaly_detection: bool = True
-
-@dataclass
-class APIConfig:
-    host: str = "127.0.0.1"
-    port: int = 9999
-
-@dataclass
-class Config:
-    os_type: str
-    host_id: str
-    database: DatabaseConfig = field(default_factory=DatabaseConfig)
-    llm: LLMConfig = field(default_factory=LLMConfig)
-    collectors: CollectorConfig = field(default_factory=CollectorConfig)
-    detection: DetectionConfig = field(default_factory=DetectionConfig)
-    api: APIConfig = field(default_factory=APIConfig)
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass
+class DatabaseConfig:
+    path: str = "thhunt.db"
+    write_batch_size: int = 500  # Flush buffered events once this many are queued
+    write_flush_interval_seconds: float = 1.0  # ...or once the oldest buffered event is this old
+    write_max_retries: int = 5  # Retries of a batch that failed to commit before it is dropped
+    write_retry_backoff_seconds: float = 0.5  # First retry delay, doubled on each further failure
+    # Connection tuning, applied once when each connection is opened
+    synchronous: str = "NORMAL"  # NORMAL is durable across app crashes in WAL mode
+    cache_size_kb: int = 16384
+    mmap_size_mb: int = 256
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+    reader_pool_size: int = 4  # Idle read-only connections kept open for reuse
+    # Time partitioning: 0 keeps every event in the main database file,
+    # indexing each event as it is inserted; 24 writes one events file per
+    # day next to it and indexes each day's file once the day is over
+    # (hunts on the current day scan it)
+    partition_period_hours: int = 0
+    retention_days: int = 0  # Drop partitions older than this; 0 keeps them forever
+
+@dataclass
+class LLMConfig:
+    provider: str = "ollama"  # ollama, lmstudio, etc.
+    base_url: str = "http://localhost:11434"
+    model: str = "llama3"
+    timeout: int = 30
+
+@dataclass
+class CollectorConfig:
+    process_interval_seconds: int = 5
+    network_interval_seconds: int = 10
+    # "scheduler" runs polling collectors from one timer heap on a small pool,
+    # "threaded" gives every collector its own sleeping thread
+    scheduler_mode: str = "scheduler"
+    scheduler_workers: int = 2
+    scheduler_jitter: float = 0.1  # Each run is delayed by up to this fraction of its interval
+    file_watch_paths: List[str] = field(default_factory=list)
+    file_coalesce_window_seconds: float = 1.0  # Events for one path within this window become one file_change
+    file_max_watches: int = 8192  # Upper bound on watched directories (Linux inotify)
+    # Linux auth logs tailed for auth_event; the checkpoint records how far each was read
+    auth_log_paths: List[str] = field(default_factory=lambda: ["/var/log/auth.log", "/var/log/secure"])
+    auth_interval_seconds: int = 2
+    auth_checkpoint_path: str = "thhunt.auth_checkpoint.json"
+    # Linux cron/systemd/rc.local/profile persistence; the manifest survives restarts
+    persistence_interval_seconds: int = 60
+    persistence_manifest_path: str = "thhunt.persistence_manifest.json"
+    # Linux process collection: "snapshot" publishes every process each sweep,
+    # "delta" publishes only process_start/process_exit
+    process_mode: str = "snapshot"
+    process_resync_interval_seconds: int = 0  # Full snapshot period in delta mode; 0 = first sweep only
+    # Linux process source: "poll" sweeps /proc, "connector" subscribes to the
+    # kernel proc connector (needs CAP_NET_ADMIN, falls back to poll)
+    process_backend: str = "poll"
+    # Linux socket source: "proc" parses /proc/net, "netlink" queries
+    # NETLINK_SOCK_DIAG (falls back to proc when unavailable)
+    network_backend: str = "proc"
+    network_states: List[str] = field(default_factory=list)  # e.g. ["ESTABLISHED"]; empty reports every state
+
+@dataclass
+class QueueConfig:
+    max_size: int = 10000  # Events buffered between collectors and the processor
+    # block: collectors wait; drop_oldest: evict the oldest low-priority event;
+    # sample: keep 1 in sample_every process_snapshot events once the queue is
+    # sample_threshold full (process_start/process_exit are not sampled).
+    # auth and persistence events are never dropped.
+    overflow_policy: str = "drop_oldest"
+    sample_every: int = 10
+    sample_threshold: float = 0.5
+
+@dataclass
+class HashingConfig:
+    enabled: bool = True  # Attach SHA-256 of executables to process and file events
+    workers: int = 2
+    max_pending: int = 1024  # Files queued for hashing before events go out without a hash
+    lru_size: int = 4096  # Recent hashes kept in memory in front of the file_hashes table
+    max_file_mb: int = 256
+
+@dataclass
+class DetectionConfig:
+    rules_path: str = "rules/"
+    enable_anomaly_detection: bool = True
+    workers: int = 2  # Detection shards; 0 runs detection on the event processor thread
+    worker_mode: str = "thread"  # "process" gives each shard its own process for CPU-bound rule sets
+    # "host" shards by host only (needed by sequence rules joining categories),
+    # "category" by host + category, "entity" also by process path, remote IP,
+    # file path, user or persistence file. Coarsened, with a warning, when the
+    # loaded correlation rules need it
+    shard_key: str = "category"
+    shard_queue_size: int = 256  # Batches buffered per shard before the processor waits
+    max_correlation_state: int = 100000  # Keys of windowed correlation state kept per shard
+    retrohunt_workers: int = 2  # Processes per retro-hunt job; 0 runs it on one thread
+    retrohunt_chunk_size: int = 2000  # Stored events read and evaluated per chunk
+    baseline_max_entries: int = 100000  # Process paths / remote IPs cached in memory per baseline and shard
+    baseline_flush_interval: float = 5.0  # Seconds between batched writes of baseline sightings
+
+@dataclass
+class APIConfig:
+    host: str = "127.0.0.1"
+    port: int = 9999
+
+@dataclass
+class Config:
+    os_type: str
+    host_id: str
+    database: DatabaseConfig = field(default_factory=DatabaseConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    collectors: CollectorConfig = field(default_factory=CollectorConfig)
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    hashing: HashingConfig = field(default_factory=HashingConfig)
+    detection: DetectionConfig = field(default_factory=DetectionConfig)
+    api: APIConfig = field(default_factory=APIConfig)
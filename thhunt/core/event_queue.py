@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import deque
+from queue import Empty, Full
+from typing import Dict, Any, Optional, Tuple, Union
+from ..collectors.base import EventBatch
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+POLICIES = ("block", "drop_oldest", "sample")
+
+# Raw event types that are never shed, whatever the policy
+CRITICAL_TYPES = frozenset({"auth_event", "persistence_change"})
+# Raw event types thinned out under the sample policy. A process_snapshot
+# is repeated every sweep, so a dropped one costs little; process_start
+# and process_exit (delta mode, proc connector) report each transition
+# once and are not sampled, only shed like other events when full.
+SAMPLED_TYPES = frozenset({"process_snapshot"})
+
+QueueItem = Union[EventBatch, Dict[str, Any]]
+
+def _describe(item: QueueItem) -> Tuple[Optional[str], str, int]:
+    # (type, collector, number of events)
+    if isinstance(item, EventBatch):
+        return item.type, item.collector, len(item)
+    return item.get("type"), item.get("collector") or "unknown", 1
+
+def event_category(event_type: Optional[str]) -> str:
+    if not event_type:
+        return "unknown"
+    if event_type.startswith("process_"):
+        return "process"
+    return {
+        "network_connection": "network",
+        "file_change": "file",
+        "persistence_change": "persistence",
+        "auth_event": "auth",
+    }.get(event_type, event_type)
+
+class BoundedEventQueue:
+    """
+    Bounded collector -> processor queue with a queue.Queue compatible
+    put/get/task_done interface and an explicit overflow policy:
+
+      block        put() waits for space, so collectors slow down with the
+                   processor.
+      drop_oldest  a full queue evicts its oldest low-priority event to
+                   make room (or discards the new one if there is none).
+      sample       above sample_threshold of max_size only every
+                   sample_every-th process_snapshot is admitted (never
+                   process_start/process_exit); a full queue discards
+                   new low-priority events.
+
+    auth_event and persistence_change events are never dropped: when the
+    queue is full of them they wait for space, as under block. Events are
+    still delivered in FIFO order.
+
+    Items are single events or EventBatches. Capacity and all counts are in
+    events, so a batch takes len(batch) places and is kept or dropped as a
+    whole; a batch larger than max_size is only let into an empty queue.
+
+    stats() reports depth, high-water mark and enqueued/dropped counts per
+    collector and per category.
+    """
+    def __init__(self, max_size: int = 10000, policy: str = "drop_oldest",
+                 sample_every: int = 10, sample_threshold: float = 0.5):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue overflow policy {policy!r}, expected one of {POLICIES}")
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        self.sample_every = max(1, sample_every)
+        self.sample_threshold = sample_threshold
+
+        # (seq, item, weight). Critical and low-priority events are kept apart so the oldest
+        # droppable one is always at the left of _normal. seq restores FIFO.
+        self._critical: deque = deque()
+        self._normal: deque = deque()
+        self._seq = 0
+        self._size = 0  # Events, not items
+        self._sample_counter = 0
+        self._unfinished = 0
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+
+        self.high_water = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self._by_collector: Dict[str, Dict[str, int]] = {}
+        self._by_category: Dict[str, Dict[str, int]] = {}
+
+    def _depth(self) -> int:
+        return self._size
+
+    def _fits(self, weight: int) -> bool:
+        return not self._size or self._size + weight <= self.max_size
+
+    def qsize(self) -> int:
+        with self._lock:
+            return self._depth()
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        return self.qsize() >= self.max_size
+
+    def _count(self, event_type: Optional[str], collector: str, weight: int, field: str):
+        for table, key in ((self._by_collector, collector), (self._by_category, event_category(event_type))):
+            counts = table.get(key)
+            if counts is None:
+                counts = table[key] = {"enqueued": 0, "dropped": 0}
+            counts[field] += weight
+
+    def _drop(self, item: QueueItem):
+        event_type, collector, weight = _describe(item)
+        before = self.dropped
+        self.dropped += weight
+        self._count(event_type, collector, weight, "dropped")
+        if not before or before // 1000 != self.dropped // 1000:
+            logger.warning(f"Event queue full ({self.policy}), {self.dropped} events dropped so far")
+
+    def put(self, item: QueueItem, block: bool = True, timeout: Optional[float] = None):
+        event_type, collector, weight = _describe(item)
+        critical = event_type in CRITICAL_TYPES
+        with self._not_full:
+            if not critical and self.policy == "sample" and event_type in SAMPLED_TYPES \
+                    and self._depth() >= self.sample_threshold * self.max_size:
+                self._sample_counter += 1
+                if self._sample_counter % self.sample_every:
+                    self._drop(item)
+                    return
+
+            if self.policy == "drop_oldest":
+                while not self._fits(weight) and self._normal:
+                    _, evicted, evicted_weight = self._normal.popleft()
+                    self._size -= evicted_weight
+                    self._drop(evicted)
+                    self._task_removed()
+            if not self._fits(weight):
+                if self.policy != "block" and not critical:
+                    self._drop(item)
+                    return
+                self._wait_for_space(weight, block, timeout)
+
+            self._seq += 1
+            (self._critical if critical else self._normal).append((self._seq, item, weight))
+            self._size += weight
+            self._unfinished += 1
+            self.enqueued += weight
+            self._count(event_type, collector, weight, "enqueued")
+            self.high_water = max(self.high_water, self._size)
+            self._not_empty.notify()
+
+    def _wait_for_space(self, weight: int, block: bool, timeout: Optional[float]):
+        if not block:
+            raise Full
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._fits(weight):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise Full
+            self._not_full.wait(remaining)
+
+    def put_nowait(self, item: QueueItem):
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> QueueItem:
+        with self._not_empty:
+            if not block:
+                if not self._depth():
+                    raise Empty
+            else:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._depth():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    self._not_empty.wait(remaining)
+
+            if self._critical and (not self._normal or self._critical[0][0] < self._normal[0][0]):
+                _, item, weight = self._critical.popleft()
+            else:
+                _, item, weight = self._normal.popleft()
+            self._size -= weight
+            self._not_full.notify_all()
+            return item
+
+    def get_nowait(self) -> QueueItem:
+        return self.get(block=False)
+
+    def _task_removed(self):
+        # An evicted event will never be task_done()'d by a consumer
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._all_done.notify_all()
+
+    def task_done(self):
+        with self._all_done:
+            if self._unfinished <= 0:
+                raise ValueError("task_done() called too many times")
+            self._task_removed()
+
+    def join(self):
+        with self._all_done:
+            while self._unfinished:
+                self._all_done.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "max_size": self.max_size,
+                "depth": self._depth(),
+                "high_water": self.high_water,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "by_collector": {k: dict(v) for k, v in self._by_collector.items()},
+                "by_category": {k: dict(v) for k, v in self._by_category.items()},
+            }
@@ -0,0 +1,162 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from ..collectors.base import CollectorBase
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class ScheduledCollector:
+    """
+    Schedule and run statistics of one collector.
+    """
+    def __init__(self, collector: CollectorBase, start: float, jitter: float):
+        self.collector = collector
+        self.name = collector.__class__.__name__
+        self.period = max(float(collector.interval), 0.001)
+        self.jitter = jitter * self.period
+        # Ticks are start + n * period; jitter only delays a single run
+        self.base = start
+        self.deadline = self._jittered(start)
+        self.busy = False
+
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0
+        self.total_run_seconds = 0.0
+        self.last_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def _jittered(self, base: float) -> float:
+        return base + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def advance(self, now: float) -> int:
+        """
+        Moves to the next tick after now. Returns how many ticks were missed
+        on the way (coalesced into the run that is about to happen).
+        """
+        missed = max(0, int((now - self.base) // self.period))
+        self.base += (missed + 1) * self.period
+        self.deadline = self._jittered(self.base)
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.period,
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "avg_run_ms": 1000 * self.total_run_seconds / self.runs if self.runs else 0.0,
+            "last_run_ms": 1000 * self.last_run_seconds,
+            "max_run_ms": 1000 * self.max_run_seconds,
+            "last_lag_ms": 1000 * self.last_lag_seconds,
+            "max_lag_ms": 1000 * self.max_lag_seconds,
+        }
+
+
+class CollectorScheduler(threading.Thread):
+    """
+    Runs polling collectors from one timer heap on a small worker pool,
+    replacing one sleeping thread per collector.
+
+    Each collector runs at fixed-rate deadlines (start + n * interval), so
+    its period does not drift by the time collect() takes, and every run
+    is delayed by a random 0..jitter * interval so collectors with the same
+    interval do not fire in lockstep. A tick that comes due while the
+    previous run of the same collector is still going is skipped, and ticks
+    missed while workers were saturated are coalesced into one run; both
+    count as skipped. Run time and lag (start time minus deadline) are
+    recorded per collector, see stats().
+    """
+    def __init__(self, workers: int = 2, jitter: float = 0.1):
+        super().__init__()
+        self.workers = max(1, workers)
+        self.jitter = jitter
+        self.running = True
+        self.daemon = True
+        self._tasks: List[ScheduledCollector] = []
+        self._heap: list = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._pool = None
+
+    def add(self, collector: CollectorBase):
+        with self._cond:
+            task = ScheduledCollector(collector, time.monotonic(), self.jitter)
+            self._tasks.append(task)
+            self._push(task)
+            self._cond.notify()
+
+    def _push(self, task: ScheduledCollector):
+        self._seq += 1
+        heapq.heappush(self._heap, (task.deadline, self._seq, task))
+
+    def run(self):
+        logger.info(f"Collector scheduler started ({len(self._tasks)} collectors, {self.workers} workers)")
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="collector")
+        try:
+            with self._cond:
+                while self.running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, _, task = self._heap[0]
+                    now = time.monotonic()
+                    if deadline > now:
+                        self._cond.wait(deadline - now)
+                        continue
+                    heapq.heappop(self._heap)
+                    if not task.collector.running:
+                        # Stopped collectors leave the schedule
+                        continue
+                    self._dispatch(task, deadline, now)
+                    self._push(task)
+        finally:
+            self._pool.shutdown(wait=True)
+        logger.info("Collector scheduler stopped")
+
+    def _dispatch(self, task: ScheduledCollector, deadline: float, now: float):
+        missed = task.advance(now)
+        if task.busy:
+            task.skipped += missed + 1
+            if task.skipped == 1 or task.skipped % 100 == 0:
+                logger.warning(f"{task.name} overran its {task.period:g}s interval ({task.skipped} ticks skipped so far)")
+            return
+        task.skipped += missed
+        task.busy = True
+        self._pool.submit(self._execute, task, deadline)
+
+    def _execute(self, task: ScheduledCollector, deadline: float):
+        start = time.monotonic()
+        failed = False
+        try:
+            task.collector.collect()
+        except Exception as e:
+            failed = True
+            logger.error(f"Error in {task.name}: {e}")
+        elapsed = time.monotonic() - start
+        with self._cond:
+            task.busy = False
+            task.runs += 1
+            task.errors += failed
+            task.total_run_seconds += elapsed
+            task.last_run_seconds = elapsed
+            task.max_run_seconds = max(task.max_run_seconds, elapsed)
+            task.last_lag_seconds = start - deadline
+            task.max_lag_seconds = max(task.max_lag_seconds, task.last_lag_seconds)
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self.is_alive():
+            self.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {task.name: task.stats() for task in self._tasks}
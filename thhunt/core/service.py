@@ -1,135 +1,280 @@
-import time
-import queue
-import threading
-import platform
-import signal
-import sys
-from ..config.loader import load_config
-from ..storage.db import DatabaseManager
-from ..utils.logger import setup_logger
-from ..api.server import APIServer
-from ..detection.pipeline import DetectionPipeline
-from ..enrichment.worker import EnrichmentWorker
-from ..normalization.normalize_process import normalize_process_event
-
-logger = setup_logger(__name__)
-
-class ThreatHuntService:
-    def __init__(self):
-        self.config = load_config()
-        self.db = DatabaseManager(self.config.database.path)
-        self.event_queue = queue.Queue()
-        self.collectors = []
-        self.api_server = APIServer(self.config.api, self.config.database.path)
-        self.detection_pipeline = DetectionPipeline(self.config.database.path, self.config.detection.rules_path)
-        self.enrichment_worker = EnrichmentWorker(self.config.database.path, self.config.llm)
-        self.running = False
-
-    def _init_collectors(self):
-        os_type = platform.system().lower()
-        logger.info(f"Initializing collectors for {os_type}")
-        
-        if os_type == 'windows':
-            try:
-                from ..collectors.windows import WindowsProcessCollector, WindowsNetworkCollector
-                self.collectors.append(WindowsProcessCollector(self.event_queue, interval=self.config.collectors.process_interval_seconds))
-                self.collectors.append(WindowsNetworkCollector(self.event_queue, interval=self.config.collectors.network_interval_seconds))
-            except ImportError as e:
-                logger.error(f"Failed to import Windows collectors: {e}")
-        elif os_type == 'linux':
-            try:
-                from ..collectors.linux import LinuxProcessCollector, LinuxNetworkCollector
-                self.collectors.append(LinuxProcessCollector(self.event_queue, interval=self.config.collectors.process_interval_seconds))
-                self.collectors.append(LinuxNetworkCollector(self.event_queue, interval=self.config.collectors.network_interval_seconds))
-            except ImportError as e:
-                logger.error(f"Failed to import Linux collectors: {e}")
-        elif os_type == 'darwin': # macOS
-            try:
-                from ..collectors.macos import MacOSProcessCollector, MacOSNetworkCollector
-                self.collectors.append(MacOSProcessCollector(self.event_queue, interval=self.config.collectors.process_interval_seconds))
-                self.collectors.append(MacOSNetworkCollector(self.event_queue, interval=self.config.collectors.network_interval_seconds))
-            except ImportError as e:
-                logger.error(f"Failed to import macOS collectors: {e}")
-
-    def _process_events(self):
-        """
-        Main loop to process events from the queue.
-        """
-        logger.info("Event processor started")
-        from ..normalization.normalize_network import normalize_network_event
-        from ..normalization.normalize_process import normalize_process_event
-        from ..normalization.normalize_file import normalize_file_event
-        from ..normalization.normalize_persistence import normalize_persistence_event
-        from ..normalization.normalize_auth import normalize_auth_event
-        
-        while self.running:
-            try:
-                event = self.event_queue.get(timeout=1)
-                
-                # 1. Normalize
-                normalized_event = event
-                event_type = event.get("type")
-                
-                if event_type == "process_snapshot":
-                    normalized_event = normalize_process_event(event)
-                elif event_type == "network_connection":
-                    normalized_event = normalize_network_event(event)
-                elif event_type == "file_change":
-                    normalized_event = normalize_file_event(event)
-                elif event_type == "persistence_change":
-                    normalized_event = normalize_persistence_event(event)
-                elif event_type == "auth_event":
-                    normalized_event = normalize_auth_event(event)
-
-                # 2. Store in DB
-                self.db.insert_event(normalized_event)
-                
-                # 3. Pass to Detection Engine
-                self.detection_pipeline.process(normalized_event)
-                
-                self.event_queue.task_done()
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Error processing event: {e}")
-
-    def start(self):
-        self.running = True
-        self._init_collectors()
-        
-        # Start collectors
-        for collector in self.collectors:
-            collector.start()
-
-        # Start event processor
-        self.processor_thread = threading.Thread(target=self._process_events)
-        self.processor_thread.daemon = True
-        self.processor_thread.start()
-
-        # Start Enrichment Worker
-        self.enrichment_worker.start()
-
-        # Start API Server
-        self.api_server.start()
-
-        logger.info("Service started successfully")
-        
-        # Keep main thread alive
-        try:
-            while self.running:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            self.stop()
-
-    def stop(self):
-        logger.info("Stopping service...")
-        self.running = False
-        for collector in self.collectors:
-            collector.stop()
-        self.enrichment_worker.stop()
-        # API server is daemon, will stop on exit
-        logger.info("Service stopped")
-
-if __name__ == "__main__":
-    service = ThreatHuntService()
-    service.start()
+import time
+import queue
+import threading
+import platform
+import signal
+import sys
+from functools import partial
+from ..config.loader import load_config
+from ..storage.db import DatabaseManager
+from ..storage.writer import EventWriter
+from .scheduler import CollectorScheduler
+from .event_queue import BoundedEventQueue
+from ..utils.logger import setup_logger
+from ..collectors.base import iter_events
+from ..api.server import APIServer
+from ..detection.pipeline import DetectionPipeline
+from ..detection.workers import ShardedDetectionPool
+from ..rules.engine import load_rule_files
+from ..detection.retrohunt import RetroHuntManager
+from ..enrichment.worker import EnrichmentWorker
+from ..enrichment.hashing import HashService
+from ..normalization.registry import NORMALIZERS
+
+logger = setup_logger(__name__)
+
+class ThreatHuntService:
+    # How often an idle processor checks for events back from the hashing pool
+    HASHED_POLL_INTERVAL = 0.2
+
+    def __init__(self):
+        self.config = load_config()
+        self.db = DatabaseManager(self.config.database.path, self.config.database)
+        self.event_writer = EventWriter(
+            self.db,
+            batch_size=self.config.database.write_batch_size,
+            flush_interval=self.config.database.write_flush_interval_seconds,
+            max_retries=self.config.database.write_max_retries,
+            retry_backoff=self.config.database.write_retry_backoff_seconds
+        )
+        self.hash_service = None
+        if self.config.hashing.enabled:
+            self.hash_service = HashService(
+                self.config.database.path,
+                workers=self.config.hashing.workers,
+                max_pending=self.config.hashing.max_pending,
+                lru_size=self.config.hashing.lru_size,
+                max_file_bytes=self.config.hashing.max_file_mb << 20
+            )
+        self.event_queue = BoundedEventQueue(
+            max_size=self.config.queue.max_size,
+            policy=self.config.queue.overflow_policy,
+            sample_every=self.config.queue.sample_every,
+            sample_threshold=self.config.queue.sample_threshold
+        )
+        self.collectors = []
+        self.api_server = APIServer(self.config.api, self.config.database.path)
+        self.api_server.register_stats("event_queue", self.event_queue.stats)
+        self.api_server.register_stats("event_writer", self.event_writer.stats)
+        if self.hash_service is not None:
+            self.api_server.register_stats("hashing", self.hash_service.stats)
+        self.detection_pipeline = None
+        self.detection_pool = None
+        if self.config.detection.workers > 0:
+            self.detection_pool = ShardedDetectionPool(
+                partial(DetectionPipeline, self.config.database.path, self.config.detection.rules_path,
+                        self.config.detection.max_correlation_state, self.config.detection.baseline_max_entries,
+                        self.config.detection.baseline_flush_interval, self.config.database),
+                workers=self.config.detection.workers,
+                mode=self.config.detection.worker_mode,
+                key=self.config.detection.shard_key,
+                queue_size=self.config.detection.shard_queue_size,
+                rules=load_rule_files(self.config.detection.rules_path)
+            )
+            self.api_server.register_stats("detection", self.detection_pool.stats)
+            self.api_server.register_rule_stats(self.detection_pool.rule_stats)
+        else:
+            self.detection_pipeline = DetectionPipeline(self.config.database.path, self.config.detection.rules_path,
+                                                        self.config.detection.max_correlation_state,
+                                                        self.config.detection.baseline_max_entries,
+                                                        self.config.detection.baseline_flush_interval,
+                                                        self.config.database)
+            self.api_server.register_rule_stats(self.detection_pipeline.rule_engine.stats)
+        self.retrohunts = RetroHuntManager(
+            self.config.database.path,
+            self.config.database,
+            workers=self.config.detection.retrohunt_workers,
+            chunk_size=self.config.detection.retrohunt_chunk_size
+        )
+        self.api_server.register_retrohunt(self.retrohunts)
+        self.enrichment_worker = EnrichmentWorker(self.config.database.path, self.config.llm)
+        # Events the hashing pool is done with, handed back to the processor
+        # thread so detection state is only ever touched from one thread
+        self._hashed_events = queue.Queue()
+        self.running = False
+
+    def _init_collectors(self):
+        os_type = platform.system().lower()
+        logger.info(f"Initializing collectors for {os_type}")
+        
+        if os_type == 'windows':
+            try:
+                from ..collectors.windows import WindowsProcessCollector, WindowsNetworkCollector
+                self.collectors.append(WindowsProcessCollector(self.event_queue, interval=self.config.collectors.process_interval_seconds))
+                self.collectors.append(WindowsNetworkCollector(self.event_queue, interval=self.config.collectors.network_interval_seconds))
+            except ImportError as e:
+                logger.error(f"Failed to import Windows collectors: {e}")
+        elif os_type == 'linux':
+            try:
+                from ..collectors.linux import LinuxProcessCollector, LinuxProcEventCollector, LinuxNetworkCollector, LinuxFileCollector, LinuxAuthCollector, LinuxPersistenceCollector
+                process_collector = LinuxProcEventCollector if self.config.collectors.process_backend == "connector" else LinuxProcessCollector
+                self.collectors.append(process_collector(
+                    self.event_queue,
+                    interval=self.config.collectors.process_interval_seconds,
+                    mode=self.config.collectors.process_mode,
+                    resync_interval=self.config.collectors.process_resync_interval_seconds
+                ))
+                self.collectors.append(LinuxNetworkCollector(
+                    self.event_queue,
+                    interval=self.config.collectors.network_interval_seconds,
+                    backend=self.config.collectors.network_backend,
+                    states=self.config.collectors.network_states
+                ))
+                if self.config.collectors.auth_log_paths:
+                    self.collectors.append(LinuxAuthCollector(
+                        self.event_queue,
+                        interval=self.config.collectors.auth_interval_seconds,
+                        paths=self.config.collectors.auth_log_paths,
+                        checkpoint_path=self.config.collectors.auth_checkpoint_path
+                    ))
+                self.collectors.append(LinuxPersistenceCollector(
+                    self.event_queue,
+                    interval=self.config.collectors.persistence_interval_seconds,
+                    manifest_path=self.config.collectors.persistence_manifest_path
+                ))
+                if self.config.collectors.file_watch_paths:
+                    try:
+                        self.collectors.append(LinuxFileCollector(
+                            self.event_queue,
+                            self.config.collectors.file_watch_paths,
+                            coalesce_window=self.config.collectors.file_coalesce_window_seconds,
+                            max_watches=self.config.collectors.file_max_watches
+                        ))
+                    except OSError as e:
+                        logger.error(f"Failed to start file collector: {e}")
+            except ImportError as e:
+                logger.error(f"Failed to import Linux collectors: {e}")
+        elif os_type == 'darwin': # macOS
+            try:
+                from ..collectors.macos import MacOSProcessCollector, MacOSNetworkCollector
+                self.collectors.append(MacOSProcessCollector(self.event_queue, interval=self.config.collectors.process_interval_seconds))
+                self.collectors.append(MacOSNetworkCollector(self.event_queue, interval=self.config.collectors.network_interval_seconds))
+            except ImportError as e:
+                logger.error(f"Failed to import macOS collectors: {e}")
+
+    def _process_events(self):
+        """
+        Main loop to process events from the queue. Batches are normalized,
+        stored and run through detection together.
+        """
+        logger.info("Event processor started")
+        poll_interval = self.HASHED_POLL_INTERVAL if self.hash_service is not None else 1
+
+        while self.running:
+            try:
+                self._store_and_detect_hashed()
+                item = self.event_queue.get(timeout=poll_interval)
+                
+                # 1. Normalize (one type per batch)
+                events = list(iter_events(item))
+                normalize = NORMALIZERS.get(events[0].get("type")) if events else None
+                if normalize is not None:
+                    events = [normalize(event) for event in events]
+
+                # 2. Attach executable hashes; events whose file still has to be
+                # hashed come back through _hashed_events once it is done
+                if self.hash_service is not None:
+                    events = self.hash_service.bind_batch(events, self._hashed_events.put)
+                self._store_and_detect_batch(events)
+                
+                self.event_queue.task_done()
+            except queue.Empty:
+                continue
+            except Exception as e:
+                logger.error(f"Error processing event: {e}")
+
+    def _store_and_detect_hashed(self):
+        events = []
+        while True:
+            try:
+                events.append(self._hashed_events.get_nowait())
+            except queue.Empty:
+                break
+        self._store_and_detect_batch(events)
+
+    def _store_and_detect_batch(self, events):
+        if not events:
+            return
+        # Store in DB (group-committed by the writer stage)
+        self.event_writer.write_batch(events)
+
+        # Pass to Detection Engine, on the shard workers if there are any
+        if self.detection_pool is not None:
+            self.detection_pool.submit(events)
+        else:
+            self.detection_pipeline.process_batch(events)
+
+    def start(self):
+        self.running = True
+        self._init_collectors()
+        
+        # Start collectors
+        self.scheduler = None
+        if self.config.collectors.scheduler_mode == "scheduler":
+            self.scheduler = CollectorScheduler(
+                workers=self.config.collectors.scheduler_workers,
+                jitter=self.config.collectors.scheduler_jitter
+            )
+        for collector in self.collectors:
+            collector.host_id = self.config.host_id
+            if self.scheduler is not None and collector.schedulable:
+                self.scheduler.add(collector)
+            else:
+                collector.start()
+        if self.scheduler is not None:
+            self.api_server.register_stats("scheduler", self.scheduler.stats)
+            self.scheduler.start()
+
+        # Start event writer
+        self.event_writer.start()
+
+        # Start detection workers
+        if self.detection_pool is not None:
+            self.detection_pool.start()
+
+        # Start event processor
+        self.processor_thread = threading.Thread(target=self._process_events)
+        self.processor_thread.daemon = True
+        self.processor_thread.start()
+
+        # Start Enrichment Worker
+        self.enrichment_worker.start()
+
+        # Start API Server
+        self.api_server.start()
+
+        logger.info("Service started successfully")
+        
+        # Keep main thread alive
+        try:
+            while self.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        logger.info("Stopping service...")
+        self.running = False
+        for collector in self.collectors:
+            collector.stop()
+        if getattr(self, 'scheduler', None) is not None:
+            self.scheduler.stop()
+        if hasattr(self, 'processor_thread'):
+            self.processor_thread.join(timeout=5)
+        if self.hash_service is not None:
+            self.hash_service.stop()
+            # The processor has stopped; store what the pool finished since
+            self._store_and_detect_hashed()
+        if self.detection_pool is not None:
+            self.detection_pool.stop()
+        else:
+            self.detection_pipeline.close()
+        self.retrohunts.stop()
+        self.event_writer.stop()
+        self.enrichment_worker.stop()
+        # API server is daemon, will stop on exit
+        logger.info("Service stopped")
+
+if __name__ == "__main__":
+    service = ThreatHuntService()
+    service.start()
@@ -1,82 +1,117 @@
-from typing import Dict, Any, List
-import json
-import time
-from ..rules.engine import RuleEngine
-from ..baselines.process_baseline import ProcessBaseline
-from ..baselines.network_baseline import NetworkBaseline
-from ..storage.db import DatabaseManager
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class DetectionPipeline:
-    def __init__(self, db_path: str, rules_path: str):
-        self.db = DatabaseManager(db_path)
-        self.rule_engine = RuleEngine(rules_path)
-        self.process_baseline = ProcessBaseline(db_path)
-        self.network_baseline = NetworkBaseline(db_path)
-
-    def process(self, event: Dict[str, Any]):
-        """
-        Main entry point for the detection pipeline.
-        1. Update Baselines
-        2. Check Anomalies
-        3. Evaluate Rules
-        4. Create Alerts
-        """
-        # 1. Update Baselines & Check Anomalies
-        anomalies = self._check_anomalies(event)
-        
-        # 2. Evaluate Rules
-        rule_matches = self.rule_engine.evaluate(event)
-        
-        # 3. Create Alerts if any matches or significant anomalies
-        if rule_matches or anomalies:
-            self._create_alert(event, rule_matches, anomalies)
-
-    def _check_anomalies(self, event: Dict[str, Any]) -> List[str]:
-        anomalies = []
-        category = event.get("category")
-        
-        if category == "process":
-            path = event.get("process", {}).get("path")
-            if self.process_baseline.is_new(path):
-                anomalies.append(f"New process seen: {path}")
-            self.process_baseline.update(path)
-            
-        elif category == "network":
-            remote_ip = event.get("network", {}).get("remote_ip")
-            if self.network_baseline.is_new(remote_ip):
-                anomalies.append(f"New remote IP contacted: {remote_ip}")
-            self.network_baseline.update(remote_ip)
-            
-        return anomalies
-
-    def _create_alert(self, event: Dict[str, Any], rule_matches: List[Dict[str, Any]], anomalies: List[str]):
-        """
-        Constructs and stores an alert.
-        """
-        # Calculate severity (simple logic for now)
-        base_severity = 0
-        descriptions = []
-        
-        for match in rule_matches:
-            base_severity = max(base_severity, match.get("severity", 0))
-            descriptions.append(f"Rule: {match.get('rule_name')}")
-            
-        if anomalies:
-            base_severity = max(base_severity, 3) # Anomalies have base severity
-            descriptions.append(f"Anomalies: {', '.join(anomalies)}")
-
-        alert = {
-            "timestamp": time.time(),
-            "severity": str(base_severity),
-            "rule_name": " | ".join([m.get("rule_name") for m in rule_matches]) if rule_matches else "Anomaly",
-            "description": "; ".join(descriptions),
-            "related_events": json.dumps([event]), # Store list of events
-            "is_enriched": False
-        }
-        
-        # Store alert
-        self.db.insert_alert(alert)
-        logger.info(f"Generated Alert: {alert['description']}")
+from typing import Dict, Any, List, Optional
+import json
+import time
+from ..rules.engine import RuleEngine
+from ..baselines.process_baseline import ProcessBaseline
+from ..baselines.network_baseline import NetworkBaseline
+from ..config.schema import DatabaseConfig
+from ..storage.db import DatabaseManager
+from ..normalization.model import to_plain
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class DetectionPipeline:
+    def __init__(self, db_path: str, rules_path: str, max_correlation_state: int = 100000,
+                 baseline_max_entries: int = 100000, baseline_flush_interval: float = 5.0,
+                 db_config: Optional[DatabaseConfig] = None):
+        # Opened first so the baselines share its connection manager (and PRAGMAs)
+        self.db = DatabaseManager(db_path, db_config)
+        self.rule_engine = RuleEngine(rules_path, max_correlation_state)
+        self.process_baseline = ProcessBaseline(db_path, baseline_max_entries, baseline_flush_interval)
+        self.network_baseline = NetworkBaseline(db_path, baseline_max_entries, baseline_flush_interval)
+
+    def process(self, event: Dict[str, Any]):
+        """
+        Main entry point for the detection pipeline.
+        1. Update Baselines
+        2. Check Anomalies
+        3. Evaluate Rules
+        4. Create Alerts
+        """
+        # 1. Update Baselines & Check Anomalies
+        anomalies = self._check_anomalies(event)
+        
+        # 2. Evaluate Rules
+        rule_matches = self.rule_engine.evaluate(event)
+        
+        # 3. Create Alerts if any matches or significant anomalies
+        if rule_matches or anomalies:
+            self._create_alert(event, rule_matches, anomalies)
+
+    def process_batch(self, events: List[Dict[str, Any]]):
+        """
+        process() for a batch of events, with rules evaluated over the
+        whole batch at once.
+        """
+        for event, rule_matches in zip(events, self.rule_engine.evaluate_batch(events)):
+            anomalies = self._check_anomalies(event)
+            if rule_matches or anomalies:
+                self._create_alert(event, rule_matches, anomalies)
+
+    def _check_anomalies(self, event: Dict[str, Any]) -> List[str]:
+        anomalies = []
+        category = event.get("category")
+        
+        if category == "process":
+            if event.get("event_type") == "process_exit":
+                # The start of this process was already checked
+                return anomalies
+            path = event.get("process", {}).get("path")
+            if self.process_baseline.is_new(path):
+                anomalies.append(f"New process seen: {path}")
+            self.process_baseline.update(path)
+            
+        elif category == "network":
+            remote_ip = event.get("network", {}).get("remote_ip")
+            if self.network_baseline.is_new(remote_ip):
+                anomalies.append(f"New remote IP contacted: {remote_ip}")
+            self.network_baseline.update(remote_ip)
+            
+        return anomalies
+
+    def close(self):
+        """
+        Stops the baseline flushers and writes the sightings not flushed yet.
+        """
+        self.process_baseline.close()
+        self.network_baseline.close()
+
+    def _create_alert(self, event: Dict[str, Any], rule_matches: List[Dict[str, Any]], anomalies: List[str]):
+        """
+        Constructs and stores an alert.
+        """
+        alert = build_alert(event, rule_matches, anomalies)
+        
+        # Store alert
+        self.db.insert_alert(alert)
+        logger.info(f"Generated Alert: {alert['description']}")
+
+def build_alert(event: Dict[str, Any], rule_matches: List[Dict[str, Any]], anomalies: List[str]) -> Dict[str, Any]:
+    """
+    The alert row for an event's rule matches and anomalies.
+    """
+    # Calculate severity (simple logic for now)
+    base_severity = 0
+    descriptions = []
+    
+    for match in rule_matches:
+        base_severity = max(base_severity, match.get("severity") or 0)
+        descriptions.append(f"Rule: {match.get('rule_name')}")
+        
+    if anomalies:
+        base_severity = max(base_severity, 3) # Anomalies have base severity
+        descriptions.append(f"Anomalies: {', '.join(anomalies)}")
+
+    # Earlier events of correlation matches (sequence steps) come first
+    related_events = [e for m in rule_matches for e in m.get("related_events", ())]
+    related_events.append(event)
+
+    return {
+        "timestamp": time.time(),
+        "severity": str(base_severity),
+        "rule_name": " | ".join([m.get("rule_name") for m in rule_matches]) if rule_matches else "Anomaly",
+        "description": "; ".join(descriptions),
+        "related_events": json.dumps(related_events, default=to_plain), # Store list of events
+        "is_enriched": False
+    }
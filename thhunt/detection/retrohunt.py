@@ -0,0 +1,227 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+from .pipeline import build_alert
+from ..config.schema import DatabaseConfig
+from ..rules.engine import RuleEngine
+from ..storage.db import DatabaseManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SOURCE_PREFIX = "retrohunt:"
+
+# Rule engine of a pool worker process, loaded once by _init_worker
+_worker_engine: Optional[RuleEngine] = None
+
+def _init_worker(rules_path: str):
+    global _worker_engine
+    _worker_engine = RuleEngine(rules_path)
+
+def _hunt_chunk(raw_events: List[str]) -> List[tuple]:
+    return evaluate_chunk(_worker_engine, raw_events)
+
+def evaluate_chunk(engine: RuleEngine, raw_events: List[str]) -> List[tuple]:
+    """
+    Runs stored events (raw_data JSON) through engine. Returns (event,
+    matches) for every event that matched, matches without their copy of
+    the event.
+    """
+    events = [json.loads(raw) for raw in raw_events]
+    results = []
+    for event, matches in zip(events, engine.evaluate_batch(events)):
+        if matches:
+            for match in matches:
+                match.pop("event", None)
+            results.append((event, matches))
+    return results
+
+class RetroHuntJob(threading.Thread):
+    """
+    Runs the rules at rules_path over the events stored in [start, end)
+    and writes what they match as alerts with source "retrohunt:<id>".
+
+    Events are streamed from the database in chunks (see
+    DatabaseManager.iter_event_chunks) and evaluated on a pool of worker
+    processes; at most two chunks per worker are in flight, so memory
+    stays flat whatever the size of the range. Rule sets with correlation
+    rules run on a single worker, which sees the chunks in time order and
+    keeps its window state across them. workers=0 evaluates on this
+    thread.
+    """
+    def __init__(self, job_id: str, db_path: str, rules_path: str, start: Optional[float] = None,
+                 end: Optional[float] = None, workers: int = 2, chunk_size: int = 2000,
+                 db_config: Optional[DatabaseConfig] = None):
+        super().__init__(name=f"retrohunt-{job_id}")
+        self.daemon = True
+        self.job_id = job_id
+        self.db_path = db_path
+        self.db_config = db_config
+        self.rules_path = rules_path
+        self.start_time = start
+        self.end_time = end
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.source = SOURCE_PREFIX + job_id
+
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.total: Optional[int] = None
+        self.scanned = 0
+        self.matched = 0  # events that matched at least one rule
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("completed", "cancelled", "failed")
+
+    def run(self):
+        self.state = "running"
+        self.started_at = time.time()
+        try:
+            self._hunt()
+            self.state = "cancelled" if self._cancel.is_set() else "completed"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Retro-hunt {self.job_id} failed: {e}")
+        self.finished_at = time.time()
+        logger.info(f"Retro-hunt {self.job_id} {self.state}: {self.scanned} events scanned, {self.matched} matched")
+
+    def _hunt(self):
+        db = DatabaseManager(self.db_path, self.db_config)
+        engine = RuleEngine(self.rules_path)
+        if not engine.rules:
+            raise ValueError(f"No rules loaded from {self.rules_path}")
+        self.total = db.count_events(self.start_time, self.end_time)
+        chunks = db.iter_event_chunks(self.start_time, self.end_time, self.chunk_size)
+
+        workers = self.workers
+        if workers > 1 and engine.correlation is not None:
+            logger.info(f"Retro-hunt {self.job_id} has correlation rules; running on one worker to keep them in order")
+            workers = 1
+        if workers <= 0:
+            for chunk in chunks:
+                if self._cancel.is_set():
+                    break
+                self._record(db, evaluate_chunk(engine, chunk), len(chunk))
+            return
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(self.rules_path,)) as pool:
+            pending: Dict[Any, int] = {}  # future -> events in its chunk
+            for chunk in chunks:
+                if self._cancel.is_set():
+                    break
+                pending[pool.submit(_hunt_chunk, chunk)] = len(chunk)
+                while len(pending) >= 2 * workers and not self._cancel.is_set():
+                    self._collect(db, pending)
+            while pending and not self._cancel.is_set():
+                self._collect(db, pending)
+            # On cancel, drop the chunks that have not started yet
+            for future in pending:
+                future.cancel()
+
+    def _collect(self, db: DatabaseManager, pending: Dict[Any, int]):
+        finished, _ = wait(list(pending), timeout=1, return_when=FIRST_COMPLETED)
+        for future in finished:
+            self._record(db, future.result(), pending.pop(future))
+
+    def _record(self, db: DatabaseManager, results: List[tuple], scanned: int):
+        alerts = []
+        for event, matches in results:
+            alert = build_alert(event, matches, [])
+            alert["source"] = self.source
+            alerts.append(alert)
+        db.insert_alerts(alerts)
+        self.matched += len(results)
+        self.scanned += scanned
+
+    def status(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return {
+            "id": self.job_id,
+            "state": self.state,
+            "rules": self.rules_path,
+            "start": self.start_time,
+            "end": self.end_time,
+            "source": self.source,
+            "total": self.total,
+            "scanned": self.scanned,
+            "progress": self.scanned / self.total if self.total else (1.0 if self.done else 0.0),
+            "matched": self.matched,
+            "events_per_sec": self.scanned / elapsed if elapsed else 0.0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+class RetroHuntManager:
+    """
+    Starts retro-hunt jobs and keeps track of them for the API. The most
+    recent max_history finished jobs are remembered.
+    """
+    def __init__(self, db_path: str, db_config: Optional[DatabaseConfig] = None, workers: int = 2,
+                 chunk_size: int = 2000, max_history: int = 50):
+        self.db_path = db_path
+        self.db_config = db_config
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_history = max_history
+        self.jobs: "OrderedDict[str, RetroHuntJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, rules_path: str, start: Optional[float] = None, end: Optional[float] = None) -> RetroHuntJob:
+        if not os.path.exists(rules_path):
+            raise ValueError(f"Rules not found: {rules_path}")
+        if start is not None and end is not None and start >= end:
+            raise ValueError("start must be before end")
+        job = RetroHuntJob(uuid.uuid4().hex[:12], self.db_path, rules_path, start, end,
+                           workers=self.workers, chunk_size=self.chunk_size, db_config=self.db_config)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            finished = [job_id for job_id, j in self.jobs.items() if j.done]
+            for job_id in finished[:max(0, len(finished) - self.max_history)]:
+                del self.jobs[job_id]
+        job.start()
+        logger.info(f"Started retro-hunt {job.job_id} of {rules_path} over [{start}, {end})")
+        return job
+
+    def get(self, job_id: str) -> Optional[RetroHuntJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return [job.status() for job in jobs]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def stop(self, timeout: float = 10):
+        with self._lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.cancel()
+        for job in jobs:
+            if job.is_alive():
+                job.join(timeout)
@@ -0,0 +1,253 @@
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from typing import Dict, Any, Callable, List, Optional
+from ..rules.correlation import correlation_categories, is_correlation_rule
+from ..rules.profiling import merge_rule_stats
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SHARD_KEYS = ("host", "category", "entity")
+WORKER_MODES = ("thread", "process")
+
+# Per category, the field the baselines and per-entity state are keyed on
+ENTITY_FIELDS = {
+    "process": ("process", "path"),
+    "network": ("network", "remote_ip"),
+    "file": ("file", "path"),
+    "auth": ("auth", "user"),
+    "persistence": ("persistence", "path"),
+}
+
+# Slots of a shard's shared counters
+EVENTS, BATCHES, ERRORS, BUSY_SECONDS = range(4)
+
+RULE_STATS_INTERVAL = 2.0  # Seconds between rule stats snapshots of a busy shard
+
+def shard_key(event: Dict[str, Any], mode: str = "category") -> str:
+    """
+    host_id + category, plus in "entity" mode the entity baselines are kept
+    for (process path, remote IP, file path, user, persistence file). In
+    "host" mode just host_id, so rules correlating events of different
+    categories see all of them.
+    """
+    if mode == "host":
+        return str(event.get("host_id"))
+    category = event.get("category")
+    key = f"{event.get('host_id')}|{category}"
+    if mode == "entity" and category in ENTITY_FIELDS:
+        section, field = ENTITY_FIELDS[category]
+        key += f"|{(event.get(section) or {}).get(field)}"
+    return key
+
+def correlation_shard_key(key: str, rules: List[Dict[str, Any]]) -> str:
+    """
+    The shard key to use so that every correlation rule in rules sees all
+    the events it correlates: "host" if one spans categories (or is not
+    limited to one), "category" instead of "entity" if there is any, since
+    its group_by keys are not the entity. Otherwise key itself.
+    """
+    correlation = [rule for rule in rules if is_correlation_rule(rule)]
+    if not correlation or key == "host":
+        return key
+    for rule in correlation:
+        categories = correlation_categories(rule)
+        if categories is None or len(categories) > 1:
+            return "host"
+    return "category" if key == "entity" else key
+
+def _shard_loop(pipeline_factory: Callable, shard_queue, counters, stats_queue=None):
+    """
+    Worker body for both modes: one pipeline per shard, fed lists of
+    events until a None sentinel arrives, then closed (if it has a
+    close()). Every RULE_STATS_INTERVAL while busy, and once it goes idle,
+    the rule engine's stats replace the snapshot in stats_queue.
+    """
+    pipeline = pipeline_factory()
+    rule_engine = getattr(pipeline, "rule_engine", None)
+    if stats_queue is None:
+        rule_engine = None
+    published = 0.0
+    unpublished = False
+    while True:
+        try:
+            events = shard_queue.get(timeout=RULE_STATS_INTERVAL if unpublished else None)
+        except queue.Empty:
+            _publish(stats_queue, rule_engine.stats())
+            unpublished = False
+            continue
+        if events is None:
+            break
+        start = time.perf_counter()
+        try:
+            pipeline.process_batch(events)
+        except Exception as e:
+            counters[ERRORS] += 1
+            logger.error(f"Error in detection shard: {e}")
+        counters[BUSY_SECONDS] += time.perf_counter() - start
+        counters[BATCHES] += 1
+        counters[EVENTS] += len(events)
+        if rule_engine is not None:
+            unpublished = True
+            if time.monotonic() - published >= RULE_STATS_INTERVAL:
+                published = time.monotonic()
+                unpublished = False
+                _publish(stats_queue, rule_engine.stats())
+    close = getattr(pipeline, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Error closing detection shard: {e}")
+
+def _publish(stats_queue, snapshot):
+    try:
+        stats_queue.get_nowait()  # drop the previous snapshot if not yet collected
+    except queue.Empty:
+        pass
+    try:
+        stats_queue.put_nowait(snapshot)
+    except queue.Full:
+        pass
+
+class DetectionShard:
+    def __init__(self, index: int, shard_queue, counters, stats_queue=None):
+        self.index = index
+        self.queue = shard_queue
+        # Written only by the shard's worker; shared memory so process mode works too
+        self.counters = counters
+        self.stats_queue = stats_queue  # latest rule stats of the shard
+        self.rule_stats = None
+        self.worker = None
+        self.submitted = 0
+        self.high_water = 0
+
+    def pending(self) -> int:
+        return self.submitted - int(self.counters[EVENTS])
+
+    def collect_rule_stats(self) -> Optional[Dict[str, Any]]:
+        try:
+            self.rule_stats = self.stats_queue.get_nowait()
+        except queue.Empty:
+            pass
+        return self.rule_stats
+
+    def stats(self) -> Dict[str, Any]:
+        events, batches = int(self.counters[EVENTS]), int(self.counters[BATCHES])
+        busy = self.counters[BUSY_SECONDS]
+        return {
+            "pending": self.pending(),
+            "high_water": self.high_water,
+            "submitted": self.submitted,
+            "processed": events,
+            "batches": batches,
+            "errors": int(self.counters[ERRORS]),
+            "avg_batch_ms": 1000 * busy / batches if batches else 0.0,
+            "events_per_sec": events / busy if busy else 0.0,
+        }
+
+class ShardedDetectionPool:
+    """
+    Runs detection on a pool of workers, each owning one shard and its own
+    pipeline from pipeline_factory.
+
+    Events are routed by a stable hash of shard_key(), so all events of a
+    key are handled by one worker in submission order and a baseline entry
+    is only ever checked and updated from one place. With the default
+    "category" key a burst in one category no longer holds up the others;
+    "entity" spreads a single category over the workers as well. Each
+    shard keeps its own correlation state, so given the rules, key is
+    coarsened as far as correlation_shard_key says (with a warning):
+    sequence rules spanning categories need "host", and any correlation
+    rule rules out "entity".
+
+    In "process" mode the workers are separate processes (pipeline_factory
+    must then be picklable), for rule sets heavy enough to be CPU bound.
+    Each shard queue holds at most queue_size batches; submit() blocks when
+    one is full, which pushes back onto the event queue.
+    """
+    def __init__(self, pipeline_factory: Callable, workers: int = 2, mode: str = "thread",
+                 key: str = "category", queue_size: int = 256, rules: Optional[List[Dict[str, Any]]] = None):
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Unknown detection worker mode {mode!r}, expected one of {WORKER_MODES}")
+        if key not in SHARD_KEYS:
+            raise ValueError(f"Unknown detection shard key {key!r}, expected one of {SHARD_KEYS}")
+        if rules:
+            required = correlation_shard_key(key, rules)
+            if required != key:
+                logger.warning(f"Detection shard key {key!r} would split the events of correlation rules "
+                               f"across shards; sharding by {required!r} instead")
+                key = required
+        self.pipeline_factory = pipeline_factory
+        self.mode = mode
+        self.key = key
+
+        self._context = multiprocessing.get_context("spawn") if mode == "process" else None
+        self.shards: List[DetectionShard] = []
+        for index in range(max(1, workers)):
+            if self._context is not None:
+                shard_queue = self._context.Queue(queue_size)
+                counters = self._context.Array('d', 4, lock=False)
+                stats_queue = self._context.Queue(1)
+            else:
+                shard_queue = queue.Queue(queue_size)
+                counters = [0.0] * 4
+                stats_queue = queue.Queue(1)
+            self.shards.append(DetectionShard(index, shard_queue, counters, stats_queue))
+
+    def start(self):
+        for shard in self.shards:
+            args = (self.pipeline_factory, shard.queue, shard.counters, shard.stats_queue)
+            if self._context is not None:
+                shard.worker = self._context.Process(target=_shard_loop, args=args,
+                                                     name=f"detection-{shard.index}", daemon=True)
+            else:
+                shard.worker = threading.Thread(target=_shard_loop, args=args,
+                                                name=f"detection-{shard.index}", daemon=True)
+            shard.worker.start()
+        logger.info(f"Detection pool started ({len(self.shards)} {self.mode} workers, sharded by {self.key})")
+
+    def shard_for(self, event: Dict[str, Any]) -> DetectionShard:
+        return self.shards[zlib.crc32(shard_key(event, self.key).encode()) % len(self.shards)]
+
+    def submit(self, events: List[Dict[str, Any]]):
+        # Only called from the processor thread, which keeps per-key order
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for event in events:
+            groups.setdefault(self.shard_for(event).index, []).append(event)
+        for index, group in groups.items():
+            shard = self.shards[index]
+            shard.queue.put(group)
+            shard.submitted += len(group)
+            shard.high_water = max(shard.high_water, shard.pending())
+
+    def stop(self, timeout: Optional[float] = 10):
+        """
+        Lets the workers finish what is queued, then stops them.
+        """
+        for shard in self.shards:
+            if shard.worker is not None:
+                shard.queue.put(None)
+        for shard in self.shards:
+            if shard.worker is not None:
+                shard.worker.join(timeout)
+                if shard.worker.is_alive():
+                    logger.warning(f"Detection shard {shard.index} did not stop within {timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "key": self.key,
+            "shards": [shard.stats() for shard in self.shards],
+        }
+
+    def rule_stats(self) -> Dict[str, Any]:
+        """
+        Rule profiles of all shards merged (see rules/profiling.py), as of
+        each shard's last snapshot.
+        """
+        snapshots = [shard.collect_rule_stats() for shard in self.shards]
+        return merge_rule_stats([snapshot for snapshot in snapshots if snapshot is not None])
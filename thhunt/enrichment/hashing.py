@@ -0,0 +1,260 @@
+import hashlib
+import mmap
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from ..storage.connection import get_connection_manager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (st_dev, st_ino, st_size, st_mtime_ns): changes whenever the content can have
+FileKey = Tuple[int, int, int, int]
+
+READ_SIZE = 1 << 20
+MMAP_THRESHOLD = 8 << 20
+
+def file_key(st: os.stat_result) -> FileKey:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+def hash_file(path: str, key: FileKey) -> Optional[str]:
+    """
+    SHA-256 of path, or None if the file no longer matches key (replaced
+    or written to while hashing). Large files are hashed through mmap,
+    smaller ones with large reads; hashlib releases the GIL either way.
+    """
+    with open(path, 'rb') as f:
+        if file_key(os.fstat(f.fileno())) != key:
+            return None
+        size = key[2]
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest = hashlib.sha256(mm).hexdigest()
+        else:
+            h = hashlib.sha256()
+            buffer = bytearray(READ_SIZE)
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                h.update(view[:n])
+            digest = h.hexdigest()
+        if file_key(os.fstat(f.fileno())) != key:
+            return None
+    return digest
+
+class FileHashCache:
+    """
+    Persistent (dev, inode, size, mtime_ns) -> SHA-256 table with an
+    in-memory LRU of recent results in front of it.
+    """
+    def __init__(self, db_path: str, lru_size: int = 4096):
+        self.connections = get_connection_manager(db_path)
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[FileKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def _init_table(self):
+        with self.connections.write() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    dev INTEGER,
+                    ino INTEGER,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    sha256 TEXT,
+                    path TEXT,
+                    hashed_at REAL,
+                    PRIMARY KEY (dev, ino, size, mtime_ns)
+                ) WITHOUT ROWID
+            ''')
+
+    def get(self, key: FileKey) -> Optional[str]:
+        with self._lock:
+            digest = self._lru.get(key)
+            if digest is not None:
+                self._lru.move_to_end(key)
+                return digest
+        with self.connections.read() as conn:
+            row = conn.execute(
+                'SELECT sha256 FROM file_hashes WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?', key
+            ).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+
+    def put(self, key: FileKey, digest: str, path: str):
+        self._remember(key, digest)
+        with self.connections.write() as conn:
+            conn.execute('INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         key + (digest, path, time.time()))
+
+    def _remember(self, key: FileKey, digest: str):
+        with self._lock:
+            self._lru[key] = digest
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+
+def hash_target(event: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    Returns (section, path) for a normalized event whose section["hash"]
+    should be filled in: executables of process events, and created or
+    modified executable files of file events.
+    """
+    category = event.get("category")
+    if category == "process":
+        section = event.get("process") or {}
+        if event.get("event_type") == "process_exit":
+            return None
+    elif category == "file":
+        section = event.get("file") or {}
+        if section.get("action") not in ("created", "modified") or section.get("is_directory"):
+            return None
+        try:
+            if not int(section.get("permissions") or "0", 8) & 0o111:
+                return None
+        except ValueError:
+            return None
+    else:
+        return None
+    path = section.get("path")
+    if not path or section.get("hash"):
+        return None
+    return section, path
+
+
+class HashService:
+    """
+    Attaches SHA-256 hashes to process and file events without blocking
+    the event path.
+
+    bind() resolves the hash from the cache when the (dev, inode, size,
+    mtime) key is known, which is the case for every launch of an
+    unchanged binary after the first, and delivers the event straight
+    away. Otherwise the file is queued on a bounded worker pool and the
+    event is delivered, hash attached, once hashing finishes; events for a
+    file already being hashed wait on the same job. When more than
+    max_pending files are queued, or the file is larger than
+    max_file_bytes, the event is delivered without a hash.
+
+    deliver may therefore be called from a worker thread.
+
+    bind_batch() does the same for a batch, returning the events that are
+    ready now so they can be handed on together.
+    """
+    def __init__(self, db_path: str, workers: int = 2, max_pending: int = 1024,
+                 lru_size: int = 4096, max_file_bytes: int = 256 << 20):
+        self.cache = FileHashCache(db_path, lru_size)
+        self.max_pending = max_pending
+        self.max_file_bytes = max_file_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hasher")
+        self._inflight: Dict[FileKey, List[tuple]] = {}  # key -> [(section, event, deliver)]
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.cache_hits = 0
+        self.files_hashed = 0
+        self.skipped = 0
+
+    def lookup(self, path: str) -> Optional[str]:
+        """
+        Cached hash of path as it is on disk now, without hashing it.
+        """
+        try:
+            return self.cache.get(file_key(os.stat(path)))
+        except OSError:
+            return None
+
+    def bind(self, event: Dict[str, Any], deliver: Callable[[Dict[str, Any]], None]):
+        if self._resolve(event, deliver):
+            deliver(event)
+
+    def bind_batch(self, events: List[Dict[str, Any]],
+                   deliver: Callable[[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+        """
+        Returns the events of the batch that can go on now; the others are
+        passed to deliver one by one once their file is hashed.
+        """
+        return [event for event in events if self._resolve(event, deliver)]
+
+    def _resolve(self, event: Dict[str, Any], deliver: Callable[[Dict[str, Any]], None]) -> bool:
+        """
+        Attaches a cached hash if there is one. Returns False if the event
+        was queued behind a hashing job, which will deliver it.
+        """
+        target = hash_target(event)
+        if target is None:
+            return True
+        section, path = target
+        try:
+            st = os.stat(path)
+        except OSError:
+            return True
+        if not stat.S_ISREG(st.st_mode) or st.st_size > self.max_file_bytes:
+            return True
+
+        key = file_key(st)
+        digest = self.cache.get(key)
+        if digest is not None:
+            self.cache_hits += 1
+            section["hash"] = digest
+            return True
+
+        with self._lock:
+            waiters = self._inflight.get(key)
+            if waiters is not None:
+                waiters.append((section, event, deliver))
+                return False
+            full = len(self._inflight) >= self.max_pending
+            if not full:
+                self._inflight[key] = [(section, event, deliver)]
+        if full:
+            self.skipped += 1
+            return True
+        self._pool.submit(self._hash, path, key)
+        return False
+
+    def _hash(self, path: str, key: FileKey):
+        digest = None
+        try:
+            digest = hash_file(path, key)
+            if digest is not None:
+                self.cache.put(key, digest, path)
+                self.files_hashed += 1
+        except Exception as e:
+            logger.error(f"Failed to hash {path}: {e}")
+
+        with self._lock:
+            waiters = self._inflight.pop(key, [])
+        for section, event, deliver in waiters:
+            if digest is not None:
+                section["hash"] = digest
+            try:
+                deliver(event)
+            except Exception as e:
+                logger.error(f"Error delivering hashed event: {e}")
+
+    def stop(self):
+        """
+        Finishes queued hashes (delivering their events) and stops the pool.
+        """
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._inflight)
+        return {
+            "cache_hits": self.cache_hits,
+            "files_hashed": self.files_hashed,
+            "skipped": self.skipped,
+            "pending": pending,
+        }
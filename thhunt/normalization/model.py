@@ -0,0 +1,171 @@
+import platform
+import sys
+from collections.abc import Mapping
+from typing import Dict, Any, FrozenSet, Tuple
+
+# Host envelope fields, computed once rather than per event
+OS_NAME = platform.system().lower()
+
+_intern = sys.intern
+
+def intern_str(value):
+    # Repeated values (paths, names, users) share one string object
+    return _intern(value) if type(value) is str else value
+
+class Record(Mapping):
+    """
+    Fixed-field record stored in __slots__ instead of a per-instance dict.
+
+    It is a read-only Mapping over FIELDS with item assignment on top, so
+    code written against the dict events (event.get("process", {}),
+    section["hash"] = ...) keeps working. to_dict() gives the plain nested
+    dict, e.g. for JSON.
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    DEFAULTS: Dict[str, Any] = {}
+    INTERNED: FrozenSet[str] = frozenset()
+    _KEYS: FrozenSet[str] = frozenset()
+    # (field, default, interned) per field, worked out once per class
+    _PLAN: Tuple[Tuple[str, Any, bool], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEYS = frozenset(cls.FIELDS)
+        cls._PLAN = tuple((field, cls.DEFAULTS.get(field), field in cls.INTERNED) for field in cls.FIELDS)
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "Record":
+        """
+        Builds the record from a raw payload: missing keys take DEFAULTS,
+        INTERNED fields are interned.
+        """
+        record = cls.__new__(cls)
+        get = payload.get
+        for field, default, interned in cls._PLAN:
+            value = get(field, default)
+            if interned and value.__class__ is str:
+                value = _intern(value)
+            setattr(record, field, value)
+        return record
+
+    def __getitem__(self, key):
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._KEYS:
+            return getattr(self, key)
+        return default
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            result[field] = value.to_dict() if isinstance(value, Record) else value
+        return result
+
+
+class ProcessInfo(Record):
+    __slots__ = FIELDS = ("pid", "ppid", "name", "path", "cmdline", "user", "hash", "start_time", "exit_code")
+    INTERNED = frozenset({"name", "path", "user"})
+
+class NetworkInfo(Record):
+    __slots__ = FIELDS = ("local_ip", "local_port", "remote_ip", "remote_port", "protocol", "state", "pid", "process_name",
+                          "inode", "uid")
+    DEFAULTS = {"protocol": "tcp"}
+    INTERNED = frozenset({"local_ip", "remote_ip", "protocol", "state", "process_name"})
+
+class FileInfo(Record):
+    __slots__ = FIELDS = ("path", "action", "is_directory", "hash", "size", "owner", "group", "permissions")
+    DEFAULTS = {"is_directory": False}
+    INTERNED = frozenset({"action", "owner", "group", "permissions"})
+
+class AuthInfo(Record):
+    __slots__ = FIELDS = ("user", "src_ip", "result", "method", "service", "message", "log_path")
+    INTERNED = frozenset({"user", "src_ip", "result", "method", "service", "log_path"})
+
+class PersistenceInfo(Record):
+    __slots__ = FIELDS = ("mechanism", "entry_name", "command", "path", "user", "action")
+    INTERNED = frozenset({"mechanism", "path", "user", "action"})
+
+
+ENVELOPE = ("category", "timestamp", "host_id", "os", "event_type")
+
+class NormalizedEvent(Record):
+    """
+    Envelope shared by all categories; each subclass adds one section slot
+    named after its category. category and os are class-level constants.
+    """
+    __slots__ = ("timestamp", "host_id", "event_type")
+    category = None
+    os = OS_NAME
+    SECTION = Record
+
+    def __init__(self, raw_event: Dict[str, Any]):
+        self.timestamp = raw_event.get("timestamp")
+        self.host_id = intern_str(raw_event.get("host_id", "unknown"))
+        self.event_type = intern_str(raw_event.get("type"))
+        setattr(self, self.category, self.SECTION.from_payload(raw_event.get("payload", {})))
+
+    def __setitem__(self, key, value):
+        if key in ("category", "os"):
+            raise KeyError(key)
+        super().__setitem__(key, value)
+
+class ProcessEvent(NormalizedEvent):
+    __slots__ = ("process",)
+    category = "process"
+    SECTION = ProcessInfo
+    FIELDS = ENVELOPE + ("process",)
+
+class NetworkEvent(NormalizedEvent):
+    __slots__ = ("network",)
+    category = "network"
+    SECTION = NetworkInfo
+    FIELDS = ENVELOPE + ("network",)
+
+class FileEvent(NormalizedEvent):
+    __slots__ = ("file",)
+    category = "file"
+    SECTION = FileInfo
+    FIELDS = ENVELOPE + ("file",)
+
+class AuthEvent(NormalizedEvent):
+    __slots__ = ("auth",)
+    category = "auth"
+    SECTION = AuthInfo
+    FIELDS = ENVELOPE + ("auth",)
+
+class PersistenceEvent(NormalizedEvent):
+    __slots__ = ("persistence",)
+    category = "persistence"
+    SECTION = PersistenceInfo
+    FIELDS = ENVELOPE + ("persistence",)
+
+
+def to_plain(obj):
+    """
+    JSON default hook: records become plain dicts.
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
@@ -0,0 +1,21 @@
+from typing import Dict, Any, Callable
+from .normalize_process import normalize_process_event
+from .normalize_network import normalize_network_event
+from .normalize_file import normalize_file_event
+from .normalize_persistence import normalize_persistence_event
+from .normalize_auth import normalize_auth_event
+
+# Raw event type -> normalizer; types not listed pass through unchanged
+NORMALIZERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "process_snapshot": normalize_process_event,
+    "process_start": normalize_process_event,
+    "process_exit": normalize_process_event,
+    "network_connection": normalize_network_event,
+    "file_change": normalize_file_event,
+    "persistence_change": normalize_persistence_event,
+    "auth_event": normalize_auth_event,
+}
+
+def normalize_event(raw_event: Dict[str, Any]):
+    normalize = NORMALIZERS.get(raw_event.get("type"))
+    return normalize(raw_event) if normalize is not None else raw_event
@@ -0,0 +1,72 @@
+from collections import deque
+from typing import Any, Dict, List, Set
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher. Patterns are added with a value;
+    after build(), find(text) returns the values of every pattern that
+    occurs in text, in a single pass over text whatever the number of
+    patterns.
+    """
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[tuple] = [()]  # values of patterns ending at each state
+        self._out: List[tuple] = [()]  # the same plus those of the failure chain
+        self._built = False
+
+    def __len__(self):
+        return len(self._goto)
+
+    def add(self, pattern: str, value: Any):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append(())
+            state = nxt
+        self._own[state] += (value,)
+        self._built = False
+
+    def build(self):
+        """
+        Computes failure links breadth-first and folds the outputs of each
+        state's failure chain into it.
+        """
+        goto, fail = self._goto, self._fail
+        out = self._out = list(self._own)
+        todo = deque()
+        for nxt in goto[0].values():
+            fail[nxt] = 0
+            out[nxt] += out[0]
+            todo.append(nxt)
+        while todo:
+            state = todo.popleft()
+            for ch, nxt in goto[state].items():
+                link = fail[state]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                fail[nxt] = goto[link].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                todo.append(nxt)
+        self._built = True
+
+    def find(self, text: str) -> Set[Any]:
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -0,0 +1,197 @@
+"""
+Columnar evaluation of the rule index over a batch of events.
+
+A batch is cut into chunks of CHUNK_ROWS events and, per category, into
+sub-batches. Each field a bucket's rules look at becomes a column,
+dictionary-encoded: the distinct values of the field and the rows holding
+each. Conditions are then evaluated once per distinct value rather than
+once per event (equality and membership by one dict lookup, substrings
+by one Aho-Corasick scan, ranges, prefixes, regexes or CIDRs by their
+compiled test), giving a row mask per condition. Masks are Python ints
+used as bitsets, so combining a rule's conditions is a few big-int ANDs
+over the whole chunk.
+
+Values are grouped by type as well as value (1, 1.0 and True hash alike
+but stringify and compare differently), so results are exactly those of
+RuleIndex.match on each event.
+"""
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+from .conditions import FieldPath, field_getter, field_test
+
+CHUNK_ROWS = 4096
+
+_NONZERO_BYTE = re.compile(b'[^\x00]')
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+def bitset(rows: List[int]) -> int:
+    """
+    Mask with the bits of rows (ascending) set.
+    """
+    if len(rows) <= 8:
+        mask = 0
+        for row in rows:
+            mask |= 1 << row
+        return mask
+    bits = bytearray((rows[-1] >> 3) + 1)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bits, "little")
+
+def iter_rows(mask: int) -> Iterator[int]:
+    """
+    Set bits of mask, ascending.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) >> 3, "little")
+    for found in _NONZERO_BYTE.finditer(data):
+        base = found.start() << 3
+        for bit in _BYTE_BITS[data[base >> 3]]:
+            yield base + bit
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+class Column:
+    """
+    One field of a batch: rows per distinct (type, value), the rows whose
+    value is unhashable, and the value of every row.
+    """
+    __slots__ = ("values", "groups", "unhashable", "_masks")
+
+    def __init__(self, path: FieldPath, events: List[Any]):
+        get = field_getter(path)
+        self.values = values = [get(event) for event in events]
+        self.groups: Dict[Tuple[type, Any], List[int]] = {}
+        self.unhashable: List[Tuple[int, Any]] = []
+        groups = self.groups
+        for row, value in enumerate(values):
+            if value is None:
+                continue
+            try:
+                rows = groups.get((value.__class__, value))
+            except TypeError:
+                self.unhashable.append((row, value))
+                continue
+            if rows is None:
+                groups[(value.__class__, value)] = [row]
+            else:
+                rows.append(row)
+        self._masks: Dict[Tuple[type, Any], int] = {}
+
+    def mask(self, key) -> int:
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = bitset(self.groups[key])
+        return mask
+
+    def where(self, test, within: int) -> int:
+        """
+        Mask of the rows in within whose value passes test.
+        """
+        if popcount(within) < len(self.groups):
+            values = self.values
+            mask = 0
+            for row in iter_rows(within):
+                value = values[row]
+                if value is not None and test(value):
+                    mask |= 1 << row
+            return mask
+        mask = 0
+        for key in self.groups:
+            if test(key[1]):
+                mask |= self.mask(key)
+        for row, value in self.unhashable:
+            if test(value):
+                mask |= 1 << row
+        return mask & within
+
+class ColumnBatch:
+    def __init__(self, events: List[Any]):
+        self.events = events
+        self.full = (1 << len(events)) - 1
+        self._columns: Dict[FieldPath, Column] = {}
+
+    def column(self, path: FieldPath) -> Column:
+        column = self._columns.get(path)
+        if column is None:
+            column = self._columns[path] = Column(path, self.events)
+        return column
+
+def match_bucket(bucket, batch: ColumnBatch) -> Dict[int, int]:
+    """
+    CategoryBucket.match over a whole batch: rule id -> mask of the rows
+    it matches (rules matching no row are left out).
+    """
+    condition_masks: Dict[int, int] = {}
+    for (path, ignore_case), table in bucket.equals.items():
+        column = batch.column(path)
+        for key in column.groups:
+            value = key[1]
+            if ignore_case and isinstance(value, str):
+                value = value.lower()
+            condition_ids = table.get(value)
+            if condition_ids:
+                mask = column.mask(key)
+                for condition_id in condition_ids:
+                    condition_masks[condition_id] = condition_masks.get(condition_id, 0) | mask
+    for (path, ignore_case), automaton in bucket.contains.items():
+        column = batch.column(path)
+        texts = [(key, str(key[1])) for key in column.groups]
+        for key, text in texts:
+            for condition_id in automaton.find(text.lower() if ignore_case else text):
+                condition_masks[condition_id] = condition_masks.get(condition_id, 0) | column.mask(key)
+        for row, value in column.unhashable:
+            text = str(value)
+            for condition_id in automaton.find(text.lower() if ignore_case else text):
+                condition_masks[condition_id] = condition_masks.get(condition_id, 0) | 1 << row
+
+    rule_masks: Dict[int, int] = {}
+    hits: Dict[int, int] = {}
+    condition_rule = bucket.condition_rule
+    for condition_id, mask in condition_masks.items():
+        rule_id = condition_rule[condition_id]
+        if rule_id in rule_masks:
+            rule_masks[rule_id] &= mask
+            hits[rule_id] += 1
+        else:
+            rule_masks[rule_id] = mask
+            hits[rule_id] = 1
+    required = bucket.required
+    matched = {rule_id: mask for rule_id, mask in rule_masks.items() if mask and hits[rule_id] == required[rule_id]}
+    for rule_id in bucket.always:
+        matched[rule_id] = batch.full
+
+    for rule_id, conjuncts in bucket.residual_conjuncts.items():
+        mask = matched.get(rule_id)
+        if not mask:
+            continue
+        mask = conjuncts_mask(conjuncts, batch, mask)
+        if mask:
+            matched[rule_id] = mask
+        else:
+            del matched[rule_id]
+    return matched
+
+def conjuncts_mask(conjuncts: List[tuple], batch: ColumnBatch, within: int) -> int:
+    """
+    Mask of the rows in within where all of conjuncts hold.
+    """
+    for conjunct in conjuncts:
+        within = conjunct_mask(conjunct, batch, within)
+        if not within:
+            break
+    return within
+
+def conjunct_mask(conjunct: tuple, batch: ColumnBatch, within: int) -> int:
+    kind = conjunct[0]
+    if kind == "any":
+        mask = 0
+        for option in conjunct[2]:
+            mask |= conjuncts_mask(option, batch, within & ~mask)
+            if mask == within:
+                break
+        return mask
+    if kind == "not":
+        return within & ~conjuncts_mask(conjunct[2], batch, within)
+    path, test = field_test(conjunct)
+    return batch.column(path).where(test, within)
@@ -0,0 +1,294 @@
+"""
+Rule condition language.
+
+A rule's conditions are a mapping whose entries must all hold:
+
+    conditions:
+      category: process                         # event category
+      process.path: {startswith: /tmp/}         # dotted field path -> operators
+      process.name: {in: [nc, ncat, socat]}
+      network.remote_port: {gte: 1024, lt: 2000}
+      network.remote_ip: {cidr: [10.0.0.0/8, 192.168.0.0/16]}
+      process.cmdline: {regex: ' -e /bin/(ba)?sh'}
+      auth.user: root                           # plain value: equals
+      any:                                      # also all: [...] and not: {...}
+        - auth.result: failure
+        - auth.method: {not_in: [publickey]}
+
+Operators: equals, not_equals, in, not_in, contains, startswith, endswith,
+regex, gt, gte, lt, lte, cidr. Several operators on one field must all
+hold; string operators accept ignore_case: true. process_name and
+process_path_contains remain as shorthands for process.name equals and
+case-insensitive process.path contains.
+
+Everything is compiled once into plain closures: regexes are compiled,
+networks parsed and sets built at load time. Top-level equals, in and
+contains conditions are also handed to the rule index (see index.py),
+the rest becomes one residual predicate per rule. Conditions on a single
+field keep their path and value test apart, so the columnar evaluator
+(see columnar.py) can run the test once per distinct value of a batch.
+"""
+import ipaddress
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+Predicate = Callable[[Any], bool]
+FieldPath = Tuple[str, ...]
+
+LOGICAL = ("all", "any", "not")
+STRING_OPS = ("contains", "startswith", "endswith", "equals", "not_equals", "in", "not_in")
+OPERATORS = STRING_OPS + ("regex", "gt", "gte", "lt", "lte", "cidr")
+
+# Legacy shorthand -> (field, operator, ignore_case)
+SHORTHANDS = {
+    "process_name": ("process.name", "equals", False),
+    "process_path_contains": ("process.path", "contains", True),
+}
+
+class RuleSyntaxError(ValueError):
+    pass
+
+def field_getter(path: FieldPath) -> Callable[[Any], Any]:
+    """
+    Returns event -> value at path, None if any step is missing.
+    """
+    if len(path) == 1:
+        key = path[0]
+        return lambda event: event.get(key)
+    if len(path) == 2:
+        section_key, key = path
+
+        def get2(event):
+            section = event.get(section_key)
+            try:
+                return section.get(key) if section else None
+            except AttributeError:
+                return None
+        return get2
+
+    def get(event):
+        value = event
+        for key in path:
+            try:
+                value = value.get(key)
+            except AttributeError:
+                return None
+            if value is None:
+                return None
+        return value
+    return get
+
+@lru_cache(maxsize=65536)
+def _parse_ip(value: str):
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    # "::ffff:10.0.0.1" as reported for v4 peers of v6 sockets
+    if address.version == 6 and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _fold(value, ignore_case: bool):
+    if ignore_case and isinstance(value, str):
+        return value.lower()
+    return value
+
+def _member(value, targets: frozenset) -> bool:
+    try:
+        return value in targets
+    except TypeError:  # unhashable field value, equal to no target
+        return False
+
+def _compile_operator(op: str, arg: Any, ignore_case: bool) -> Predicate:
+    """
+    value -> bool for one operator. value is never None here.
+    """
+    if op in ("equals", "not_equals"):
+        target = _fold(arg, ignore_case)
+        if ignore_case:
+            test = lambda value: _fold(value, True) == target
+        else:
+            test = lambda value: value == target
+        return test if op == "equals" else (lambda value: not test(value))
+    if op in ("in", "not_in"):
+        if not isinstance(arg, list):
+            raise RuleSyntaxError(f"{op} expects a list")
+        targets = frozenset(_fold(a, ignore_case) for a in arg)
+        if op == "in":
+            return lambda value: _member(_fold(value, ignore_case), targets)
+        return lambda value: not _member(_fold(value, ignore_case), targets)
+    if op in ("contains", "startswith", "endswith"):
+        needle = _fold(str(arg), ignore_case)
+        method = {"contains": str.__contains__, "startswith": str.startswith, "endswith": str.endswith}[op]
+        return lambda value: method(_fold(str(value), ignore_case), needle)
+    if op == "regex":
+        try:
+            pattern = re.compile(str(arg), re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise RuleSyntaxError(f"bad regex {arg!r}: {e}")
+        search = pattern.search
+        return lambda value: search(str(value)) is not None
+    if op in ("gt", "gte", "lt", "lte"):
+        bound = _number(arg)
+        if bound is None:
+            raise RuleSyntaxError(f"{op} expects a number")
+        compare = {"gt": float.__gt__, "gte": float.__ge__, "lt": float.__lt__, "lte": float.__le__}[op]
+
+        def in_range(value):
+            number = _number(value)
+            return number is not None and compare(float(number), float(bound))
+        return in_range
+    if op == "cidr":
+        try:
+            networks = tuple(ipaddress.ip_network(net, strict=False) for net in (arg if isinstance(arg, list) else [arg]))
+        except ValueError as e:
+            raise RuleSyntaxError(f"bad network: {e}")
+
+        def in_networks(value):
+            address = _parse_ip(str(value))
+            return address is not None and any(address in net for net in networks)
+        return in_networks
+    raise RuleSyntaxError(f"unknown operator {op!r}")
+
+def _field_conditions(path: str, spec: Any) -> List[tuple]:
+    """
+    Conjuncts for one field entry: ("equals", path, value, ignore_case),
+    ("in", path, values, ignore_case), ("contains", path, needle,
+    ignore_case) or ("field", path, test) with test taking the non-None
+    field value.
+    """
+    field_path = tuple(path.split('.'))
+    if not isinstance(spec, dict):
+        if isinstance(spec, list):
+            spec = {"in": spec}
+        else:
+            spec = {"equals": spec}
+    ignore_case = bool(spec.get("ignore_case", False))
+    conjuncts = []
+    for op, arg in spec.items():
+        if op == "ignore_case":
+            continue
+        if op not in OPERATORS:
+            raise RuleSyntaxError(f"unknown operator {op!r} for {path}")
+        if op == "equals" and _hashable(arg):
+            conjuncts.append(("equals", field_path, _fold(arg, ignore_case), ignore_case))
+        elif op == "in" and isinstance(arg, list) and all(_hashable(a) for a in arg):
+            conjuncts.append(("in", field_path, tuple(_fold(a, ignore_case) for a in arg), ignore_case))
+        elif op == "contains":
+            conjuncts.append(("contains", field_path, _fold(str(arg), ignore_case), ignore_case))
+        else:
+            conjuncts.append(("field", field_path, _compile_operator(op, arg, ignore_case)))
+    return conjuncts
+
+def _hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+def _field_predicate(path: FieldPath, test: Predicate) -> Predicate:
+    get = field_getter(path)
+
+    def predicate(event):
+        value = get(event)
+        return value is not None and test(value)
+    return predicate
+
+def field_test(conjunct: tuple) -> Tuple[FieldPath, Predicate]:
+    """
+    (path, value test) of a field conjunct, indexed kinds included.
+    """
+    kind = conjunct[0]
+    if kind == "field":
+        return conjunct[1], conjunct[2]
+    _, path, arg, ignore_case = conjunct
+    if kind == "equals":
+        return path, _compile_operator("equals", arg, ignore_case)
+    if kind == "in":
+        return path, _compile_operator("in", list(arg), ignore_case)
+    return path, _compile_operator("contains", arg, ignore_case)
+
+def conjunct_predicate(conjunct: tuple) -> Predicate:
+    if conjunct[0] in ("any", "not"):
+        return conjunct[1]
+    return _field_predicate(*field_test(conjunct))
+
+def compile_conjuncts(conditions: Any) -> List[tuple]:
+    """
+    Flattens a condition mapping into the list of conjuncts that must all
+    hold: the field conjuncts of _field_conditions, plus ("any", fn,
+    options) and ("not", fn, conjuncts) where fn takes the whole event and
+    options/conjuncts are what nested_conjuncts gives for the inner
+    conditions. "category" is left to the caller.
+    """
+    if not isinstance(conditions, dict):
+        raise RuleSyntaxError("conditions must be a mapping")
+    conjuncts = []
+    for key, spec in conditions.items():
+        if key == "category":
+            continue
+        if key in SHORTHANDS:
+            path, op, ignore_case = SHORTHANDS[key]
+            conjuncts.extend(_field_conditions(path, {op: spec, "ignore_case": ignore_case}))
+        elif key == "all":
+            for item in _condition_list(key, spec):
+                conjuncts.extend(compile_conjuncts(item))
+        elif key == "any":
+            options = [nested_conjuncts(item) for item in _condition_list(key, spec)]
+            predicates = [all_of([conjunct_predicate(c) for c in option]) for option in options]
+            conjuncts.append(("any", lambda event, predicates=predicates: any(p(event) for p in predicates),
+                              options))
+        elif key == "not":
+            inner_conjuncts = nested_conjuncts(spec)
+            inner = all_of([conjunct_predicate(c) for c in inner_conjuncts])
+            conjuncts.append(("not", lambda event, inner=inner: not inner(event), inner_conjuncts))
+        else:
+            conjuncts.extend(_field_conditions(key, spec))
+    return conjuncts
+
+def _condition_list(key: str, spec: Any) -> list:
+    if not isinstance(spec, list) or not spec:
+        raise RuleSyntaxError(f"{key} expects a non-empty list of conditions")
+    return spec
+
+def compile_predicate(conditions: Any) -> Predicate:
+    """
+    The whole condition mapping (category included) as one closure.
+    """
+    return all_of([conjunct_predicate(c) for c in nested_conjuncts(conditions)])
+
+def nested_conjuncts(conditions: Any) -> List[tuple]:
+    """
+    compile_conjuncts for conditions the index does not see (inside
+    any/not): category becomes a field conjunct and indexed kinds become
+    ("field", path, test).
+    """
+    conjuncts = [c if c[0] in ("field", "any", "not") else ("field",) + field_test(c)
+                 for c in compile_conjuncts(conditions)]
+    category = conditions.get("category")
+    if category is not None:
+        conjuncts.insert(0, ("field", ("category",), lambda value: value == category))
+    return conjuncts
+
+def all_of(predicates: List[Predicate]) -> Predicate:
+    if not predicates:
+        return lambda event: True
+    if len(predicates) == 1:
+        return predicates[0]
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda event: first(event) and second(event)
+    return lambda event: all(p(event) for p in predicates)
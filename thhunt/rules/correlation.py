@@ -0,0 +1,276 @@
+"""
+Correlation rules: rules over several events of one key within a window.
+
+    name: SSH brute force
+    type: threshold              # at least `threshold` matching events
+    window: 60                   # seconds
+    threshold: 5
+    group_by: [auth.src_ip]      # per host_id and these fields
+    conditions: {category: auth, auth.result: failure}
+
+    type: distinct_count         # at least `threshold` distinct values of `field`
+    field: network.remote_ip
+
+    type: sequence               # steps matched in order, all within window
+    steps:                       # a step may override group_by, so different
+      - conditions: {category: process, process.path: {startswith: /tmp/}}
+        group_by: [process.pid]  # categories can be joined on one key
+      - conditions: {category: network, network.state: ESTABLISHED}
+        group_by: [network.pid]
+
+Windows are measured on event timestamps. Events missing a group_by field
+are ignored by the rule. A rule fires once and starts over, so a sustained
+brute force alerts every `threshold` failures rather than on each one.
+
+Per-key state is small and bounded by the rule (at most threshold
+timestamps, threshold values or one event per step), lives in a shared
+WindowedStateStore capped at max_entries keys, and each event costs O(1)
+amortized per matching rule.
+"""
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+from .conditions import RuleSyntaxError, compile_conjuncts, field_getter
+from .index import RuleIndex
+from .state import WindowedStateStore
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CORRELATION_TYPES = ("threshold", "distinct_count", "sequence")
+
+def is_correlation_rule(rule: Dict[str, Any]) -> bool:
+    return rule.get("type", "match") != "match"
+
+def correlation_categories(rule: Dict[str, Any]) -> Optional[set]:
+    """
+    Event categories a correlation rule (all its steps) can match, or None
+    when some step is not limited to a category.
+    """
+    steps = rule.get("steps") if rule.get("type") == "sequence" else [rule]
+    categories = set()
+    for step in steps if isinstance(steps, list) else []:
+        category = ((step.get("conditions") if isinstance(step, dict) else None) or {}).get("category")
+        if not isinstance(category, str):
+            return None
+        categories.add(category)
+    return categories
+
+def _group_getters(spec: Any, name: str) -> list:
+    if spec is None:
+        return []
+    if isinstance(spec, str):
+        spec = [spec]
+    if not isinstance(spec, list) or not all(isinstance(path, str) for path in spec):
+        raise RuleSyntaxError(f"{name} expects a list of field paths")
+    return [field_getter(tuple(path.split('.'))) for path in spec]
+
+def _positive(rule: Dict[str, Any], name: str, kind=float):
+    value = rule.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise RuleSyntaxError(f"{name} must be a positive number")
+    return kind(value)
+
+class CorrelationRule:
+    """
+    One rule, split into steps (a single one unless it is a sequence); the
+    engine feeds it the events matching each step through on_event().
+    """
+    def __init__(self, rule_id: int, rule: Dict[str, Any]):
+        self.rule_id = rule_id
+        self.rule = rule
+        self.type = rule.get("type")
+        if self.type not in CORRELATION_TYPES:
+            raise RuleSyntaxError(f"unknown rule type {self.type!r}")
+        self.window = _positive(rule, "window")
+        group_by = _group_getters(rule.get("group_by"), "group_by")
+
+        if self.type == "sequence":
+            steps = rule.get("steps")
+            if not isinstance(steps, list) or len(steps) < 2:
+                raise RuleSyntaxError("sequence expects at least two steps")
+            if not all(isinstance(step, dict) for step in steps):
+                raise RuleSyntaxError("sequence steps must be mappings")
+            self.steps = [step.get("conditions") or {} for step in steps]
+            self.step_keys = [_group_getters(step["group_by"], "group_by") if "group_by" in step else group_by
+                              for step in steps]
+        else:
+            self.steps = [rule.get("conditions") or {}]
+            self.step_keys = [group_by]
+            self.threshold = _positive(rule, "threshold", int)
+            if self.type == "distinct_count":
+                if not isinstance(rule.get("field"), str):
+                    raise RuleSyntaxError("distinct_count expects a field")
+                self.field = field_getter(tuple(rule["field"].split('.')))
+        for conditions in self.steps:
+            compile_conjuncts(conditions)  # raises on invalid conditions
+
+    def key(self, step: int, event) -> Optional[tuple]:
+        values = [get(event) for get in self.step_keys[step]]
+        if any(value is None for value in values):
+            return None
+        return (self.rule_id, event.get("host_id"), *values)
+
+    def on_event(self, step: int, event, now: float, store: WindowedStateStore) -> Optional[Dict[str, Any]]:
+        key = self.key(step, event)
+        if key is None:
+            return None
+        if self.type == "threshold":
+            return self._threshold(key, event, now, store)
+        if self.type == "distinct_count":
+            return self._distinct(key, event, now, store)
+        return self._sequence(step, key, event, now, store)
+
+    def _threshold(self, key, event, now, store):
+        # deque of event times, never longer than threshold
+        times = store.get(key, now)
+        if times is None:
+            times = deque(maxlen=self.threshold)
+        horizon = now - self.window
+        while times and times[0] <= horizon:
+            times.popleft()
+        times.append(now)
+        if len(times) < self.threshold:
+            store.put(key, times, now + self.window)
+            return None
+        store.pop(key)
+        return self._fire(event, key, count=len(times), first_seen=times[0])
+
+    def _distinct(self, key, event, now, store):
+        value = self.field(event)
+        if value is None:
+            return None
+        # value -> last seen, oldest first; never longer than threshold
+        seen = store.get(key, now)
+        if seen is None:
+            seen = OrderedDict()
+        seen[value] = now
+        seen.move_to_end(value)
+        horizon = now - self.window
+        while seen and next(iter(seen.values())) <= horizon:
+            seen.popitem(last=False)
+        if len(seen) < self.threshold:
+            store.put(key, seen, now + self.window)
+            return None
+        store.pop(key)
+        return self._fire(event, key, count=len(seen), first_seen=min(seen.values()),
+                          values=[str(v) for v in seen])
+
+    def _sequence(self, step, key, event, now, store):
+        # [start time, matched events]; the next step is len(events)
+        state = store.get(key, now)
+        if step == 0:
+            # A new first step restarts the sequence unless it has progressed
+            if state is None or len(state[1]) == 1:
+                store.put(key, [now, [event]], now + self.window)
+            return None
+        if state is None or len(state[1]) != step:
+            return None
+        state[1].append(event)
+        if len(state[1]) < len(self.steps):
+            return None
+        store.pop(key)
+        return self._fire(event, key, count=len(self.steps), first_seen=state[0],
+                          related_events=state[1][:-1])
+
+    def _fire(self, event, key, count: int, first_seen: float, related_events=None, values=None):
+        correlation = {"type": self.type, "key": list(key[1:]), "count": count,
+                       "window": self.window, "first_seen": first_seen}
+        if values is not None:
+            correlation["values"] = values
+        match = {
+            "rule_name": self.rule.get("name"),
+            "severity": self.rule.get("severity"),
+            "description": self.rule.get("description"),
+            "event": event,
+            "correlation": correlation,
+        }
+        if related_events:
+            match["related_events"] = related_events
+        return match
+
+class CorrelationEngine:
+    """
+    Evaluates correlation rules. The conditions of every step are put in a
+    RuleIndex, so finding the steps an event feeds costs the same as
+    matching plain rules; window state lives in one WindowedStateStore.
+    """
+    def __init__(self, rules: List[Dict[str, Any]], max_entries: int = 100000):
+        self.rules: List[CorrelationRule] = []
+        steps = []
+        self._rule_steps: Dict[int, List[int]] = {}  # rule id (position in rules) -> step ids
+        for rule_id, rule in enumerate(rules):
+            try:
+                correlation_rule = CorrelationRule(rule_id, rule)
+            except RuleSyntaxError as e:
+                logger.error(f"Invalid correlation rule {rule.get('name')!r}: {e}")
+                continue
+            self.rules.append(correlation_rule)
+            for step, conditions in enumerate(correlation_rule.steps):
+                self._rule_steps.setdefault(rule_id, []).append(len(steps))
+                steps.append({"name": rule.get("name"), "conditions": conditions,
+                              "rule": correlation_rule, "step": step})
+        self._steps = steps
+        self._index = RuleIndex(steps)
+        self.store = WindowedStateStore(max_entries)
+        self._clock = 0.0
+
+    def __len__(self):
+        return len(self.rules)
+
+    def process(self, event) -> List[Dict[str, Any]]:
+        """
+        Feeds event to every step it matches and returns the rules it
+        completes.
+        """
+        return [match for _, match in self.process_ids(event)]
+
+    def process_ids(self, event, timings: Optional[list] = None) -> List[tuple]:
+        """
+        process() as (rule id, match) pairs, rule ids being positions in
+        the rules given to the constructor. With timings, each state
+        update is timed and appended to it as (rule id, seconds).
+        """
+        now = event.get("timestamp")
+        if not isinstance(now, (int, float)):
+            now = time.time()
+        if now > self._clock:
+            self._clock = now
+            self.store.advance(now)
+        matches = []
+        # Later steps first, so an event matching two steps of one sequence
+        # cannot complete a sequence it has just started
+        step_timings = None if timings is None else []
+        step_ids = self._index.match_ids(event, step_timings)
+        if step_timings:
+            timings.extend((self._steps[step_id]["rule"].rule_id, seconds) for step_id, seconds in step_timings)
+        for step_id in reversed(step_ids):
+            step = self._steps[step_id]
+            rule = step["rule"]
+            if timings is None:
+                match = rule.on_event(step["step"], event, now, self.store)
+            else:
+                start = time.perf_counter()
+                match = rule.on_event(step["step"], event, now, self.store)
+                timings.append((rule.rule_id, time.perf_counter() - start))
+            if match is not None:
+                matches.append((rule.rule_id, match))
+        matches.reverse()
+        return matches
+
+    def evaluations(self, rule_id: int) -> Optional[int]:
+        """
+        Events checked against the steps of rule_id, None if it did not compile.
+        """
+        step_ids = self._rule_steps.get(rule_id)
+        if step_ids is None:
+            return None
+        # Steps of one category share their events
+        by_category = {self._steps[step_id]["conditions"].get("category"): self._index.evaluations(step_id) or 0
+                       for step_id in step_ids}
+        if None in by_category:
+            return by_category[None]
+        return sum(by_category.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.store.stats(), rules=len(self.rules))
@@ -1,79 +1,187 @@
-from typing import List, Dict, Any
-import yaml
-import os
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class RuleEngine:
-    def __init__(self, rules_path: str):
-        self.rules_path = rules_path
-        self.rules = []
-        self.load_rules()
-
-    def load_rules(self):
-        """
-        Load rules from YAML files.
-        """
-        if not os.path.exists(self.rules_path):
-            logger.warning(f"Rules directory not found: {self.rules_path}")
-            return
-
-        for filename in os.listdir(self.rules_path):
-            if filename.endswith(".yml") or filename.endswith(".yaml"):
-                try:
-                    with open(os.path.join(self.rules_path, filename), 'r') as f:
-                        rule = yaml.safe_load(f)
-                        self.rules.append(rule)
-                except Exception as e:
-                    logger.error(f"Failed to load rule {filename}: {e}")
-        
-        logger.info(f"Loaded {len(self.rules)} rules")
-
-    def evaluate(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """
-        Evaluate event against loaded rules.
-        Returns a list of matches (alerts).
-        """
-        matches = []
-        for rule in self.rules:
-            if self._match(rule, event):
-                matches.append({
-                    "rule_name": rule.get("name"),
-                    "severity": rule.get("severity"),
-                    "description": rule.get("description"),
-                    "event": event
-                })
-        return matches
-
-    def _match(self, rule: Dict[str, Any], event: Dict[str, Any]) -> bool:
-        conditions = rule.get("conditions", {})
-        
-        # Check category first
-        if "category" in conditions and event.get("category") != conditions["category"]:
-            return False
-
-        # Helper to get nested value
-        def get_value(obj, path):
-            parts = path.split('.')
-            for part in parts:
-                if isinstance(obj, dict):
-                    obj = obj.get(part)
-                else:
-                    return None
-            return obj
-
-        # Process specific conditions
-        if conditions.get("category") == "process":
-            proc = event.get("process", {})
-            
-            if "process_name" in conditions:
-                if proc.get("name") != conditions["process_name"]:
-                    return False
-            
-            if "process_path_contains" in conditions:
-                path = proc.get("path", "")
-                if not path or conditions["process_path_contains"].lower() not in path.lower():
-                    return False
-
-        return True
+from typing import List, Dict, Any, Optional
+import yaml
+import os
+import time
+from .correlation import CorrelationEngine, is_correlation_rule
+from .index import RuleIndex
+from .profiling import RuleProfiler
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Smallest batch evaluate_batch() evaluates column-wise by default
+COLUMNAR_MIN_BATCH = 64
+
+def load_rule_files(rules_path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the rules under rules_path, a directory of rule files or a
+    single one. See rules/conditions.py for the condition syntax.
+    """
+    if not os.path.exists(rules_path):
+        logger.warning(f"Rules directory not found: {rules_path}")
+        return []
+
+    if os.path.isfile(rules_path):
+        directory, filenames = os.path.split(rules_path)
+        filenames = [filenames]
+    else:
+        directory, filenames = rules_path, os.listdir(rules_path)
+    rules = []
+    for filename in filenames:
+        if filename.endswith(".yml") or filename.endswith(".yaml"):
+            try:
+                with open(os.path.join(directory, filename), 'r') as f:
+                    documents = list(yaml.safe_load_all(f))
+            except Exception as e:
+                logger.error(f"Failed to load rule {filename}: {e}")
+                continue
+            # One rule per YAML document ("---" separated), or a list of rules
+            for document in documents:
+                for rule in (document if isinstance(document, list) else [document]):
+                    if isinstance(rule, dict):
+                        rules.append(rule)
+                    elif rule is not None:
+                        logger.error(f"Skipping rule in {filename}: not a mapping")
+    return rules
+
+class RuleEngine:
+    def __init__(self, rules_path: str, max_correlation_state: int = 100000):
+        self.rules_path = rules_path
+        self.max_correlation_state = max_correlation_state
+        self.rules = []
+        self.load_rules()
+
+    def load_rules(self):
+        """
+        Load rules from YAML files and compile them into the match index.
+        See load_rule_files for the layout.
+        """
+        self.rules.extend(load_rule_files(self.rules_path))
+        self.compile()
+        logger.info(f"Loaded {len(self.rules)} rules")
+
+    def compile(self):
+        """
+        (Re)builds the match index from self.rules. Correlation rules (see
+        rules/correlation.py) go to their own engine, with fresh state.
+        Profiling counters start over.
+        """
+        # Positions in self.rules of the rules given to each engine
+        self._plain_ids = [i for i, rule in enumerate(self.rules) if not is_correlation_rule(rule)]
+        self._correlation_ids = [i for i, rule in enumerate(self.rules) if is_correlation_rule(rule)]
+        self._index = RuleIndex([self.rules[i] for i in self._plain_ids])
+        self.correlation = None
+        if self._correlation_ids:
+            self.correlation = CorrelationEngine([self.rules[i] for i in self._correlation_ids],
+                                                 self.max_correlation_state)
+        self.profiler = RuleProfiler(len(self.rules))
+
+    def evaluate(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Evaluate event against loaded rules.
+        Returns a list of matches (alerts). Events are also fed to the
+        correlation rules, whose matches carry a "correlation" summary and
+        the earlier events of a sequence as "related_events".
+
+        One event in profiler.sample_every is timed, per rule and as a
+        whole; see stats().
+        """
+        if not self.profiler.tick():
+            return self._evaluate(event, None)
+        return self._evaluate_timed(event)
+
+    def _evaluate_timed(self, event):
+        profiler = self.profiler
+        timings = []
+        start = time.perf_counter()
+        matches = self._evaluate(event, timings)
+        profiler.engine.record(time.perf_counter() - start)
+        for rule_id, seconds in timings:
+            profiler.record(rule_id, seconds)
+        return matches
+
+    def _evaluate(self, event, timings, index_ids: Optional[List[int]] = None):
+        """
+        index_ids, when given, are the index matches of event already
+        computed by RuleIndex.match_batch.
+        """
+        plain_ids = self._plain_ids
+        if index_ids is not None:
+            rule_ids = [plain_ids[i] for i in index_ids]
+        elif timings is None:
+            rule_ids = [plain_ids[i] for i in self._index.match_ids(event)]
+        else:
+            index_timings = []
+            rule_ids = [plain_ids[i] for i in self._index.match_ids(event, index_timings)]
+            timings.extend((plain_ids[i], seconds) for i, seconds in index_timings)
+        matches = [{
+            "rule_name": rule.get("name"),
+            "severity": rule.get("severity"),
+            "description": rule.get("description"),
+            "event": event
+        } for rule in map(self.rules.__getitem__, rule_ids)]
+        if self.correlation is not None:
+            correlation_timings = None if timings is None else []
+            for i, match in self.correlation.process_ids(event, correlation_timings):
+                rule_ids.append(self._correlation_ids[i])
+                matches.append(match)
+            if correlation_timings:
+                timings.extend((self._correlation_ids[i], seconds) for i, seconds in correlation_timings)
+        if rule_ids:
+            now = time.time()
+            for rule_id in rule_ids:
+                self.profiler.matched(rule_id, now)
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-rule profile, in load order: events checked against the rule
+        (evaluations, None if it failed to compile), matches, last match
+        time, and from sampled events its estimated total time_ms plus
+        avg_us/p99_us per evaluation. Only the work specific to a rule is
+        timed (residual predicates such as regexes and ranges, correlation
+        state updates); the shared index lookup shows in the engine-wide
+        avg_us/p99_us.
+        """
+        evaluations = {rule_id: self._index.evaluations(i) for i, rule_id in enumerate(self._plain_ids)}
+        if self.correlation is not None:
+            evaluations.update((rule_id, self.correlation.evaluations(i))
+                               for i, rule_id in enumerate(self._correlation_ids))
+        stats = self.profiler.engine_stats()
+        stats["rules"] = [dict({
+            "id": rule_id,
+            "name": rule.get("name"),
+            "type": rule.get("type", "match"),
+            "evaluations": evaluations.get(rule_id),
+        }, **self.profiler.rule_stats(rule_id)) for rule_id, rule in enumerate(self.rules)]
+        if self.correlation is not None:
+            stats["correlation"] = self.correlation.store.stats()
+        return stats
+
+    def evaluate_batch(self, events: List[Dict[str, Any]],
+                       columnar: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """
+        evaluate() for every event of a batch. Returns the matches of each
+        event, in order.
+
+        Batches of COLUMNAR_MIN_BATCH events or more (or any batch with
+        columnar=True) go through the index column-wise, see
+        rules/columnar.py; the matches are the same. Correlation rules
+        still see the events one at a time, in order, and the events the
+        profiler samples are evaluated and timed on their own.
+        """
+        if columnar is None:
+            columnar = len(events) >= COLUMNAR_MIN_BATCH
+        if not columnar:
+            return [self.evaluate(event) for event in events]
+        profiler = self.profiler
+        timed = {row for row in range(len(events)) if profiler.tick()}
+        if timed:
+            untimed = [row for row in range(len(events)) if row not in timed]
+            index_ids: List[Optional[List[int]]] = [None] * len(events)
+            for row, ids in zip(untimed, self._index.match_batch([events[row] for row in untimed])):
+                index_ids[row] = ids
+        else:
+            index_ids = self._index.match_batch(events)
+        return [self._evaluate_timed(event) if row in timed else self._evaluate(event, None, index_ids[row])
+                for row, event in enumerate(events)]
@@ -0,0 +1,196 @@
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from .aho_corasick import AhoCorasick
+from .columnar import CHUNK_ROWS, ColumnBatch, iter_rows, match_bucket
+from .conditions import FieldPath, Predicate, RuleSyntaxError, all_of, compile_conjuncts, conjunct_predicate, field_getter
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (field path, ignore_case)
+IndexKey = Tuple[FieldPath, bool]
+
+# Conjuncts the index cannot serve, checked per candidate rule
+RESIDUAL_KINDS = ("field", "any", "not")
+
+class CategoryBucket:
+    """
+    The rules of one category, indexed by their conditions. Every indexed
+    condition gets an id; a rule is a candidate when all of them are hit,
+    and matches if its residual predicate (conditions the index cannot
+    serve, such as regexes, ranges or any/not) also holds. Equality and
+    membership conditions are looked up in one dict per field and
+    substring conditions are found by one Aho-Corasick scan per field, so
+    the cost of matching an event depends on its fields and the number of
+    hits, not on the number of rules.
+    """
+    def __init__(self):
+        self.always: List[int] = []  # rules without indexed conditions
+        self.condition_rule: List[int] = []  # condition id -> rule id
+        self.required: Dict[int, int] = {}  # rule id -> number of indexed conditions
+        self.residual: Dict[int, Predicate] = {}
+        self.residual_conjuncts: Dict[int, List[tuple]] = {}
+        self.equals: Dict[IndexKey, Dict[Any, List[int]]] = {}
+        self.contains: Dict[IndexKey, AhoCorasick] = {}
+        self.events = 0  # events matched against this bucket
+        self._getters = {}
+
+    def add(self, rule_id: int, conjuncts: List[tuple]):
+        residual = [c for c in conjuncts if c[0] in RESIDUAL_KINDS]
+        if residual:
+            self.residual[rule_id] = all_of([conjunct_predicate(c) for c in residual])
+            self.residual_conjuncts[rule_id] = residual
+        indexed = [c for c in conjuncts if c[0] not in RESIDUAL_KINDS]
+        if not indexed:
+            self.always.append(rule_id)
+            return
+        self.required[rule_id] = len(indexed)
+        for kind, path, arg, ignore_case in indexed:
+            condition_id = len(self.condition_rule)
+            self.condition_rule.append(rule_id)
+            key = (path, ignore_case)
+            self._getters.setdefault(path, field_getter(path))
+            if kind == "contains":
+                self.contains.setdefault(key, AhoCorasick()).add(arg, condition_id)
+            else:
+                table = self.equals.setdefault(key, {})
+                # Each condition is hit at most once per event, however often a value repeats
+                for value in dict.fromkeys(arg if kind == "in" else (arg,)):
+                    table.setdefault(value, []).append(condition_id)
+
+    def build(self):
+        for automaton in self.contains.values():
+            automaton.build()
+
+    def match(self, event, timings: Optional[list] = None) -> List[int]:
+        """
+        Ids of the rules matching event. With timings, every residual
+        predicate run is timed and appended to it as (rule id, seconds).
+        """
+        self.events += 1
+        candidates = list(self.always)
+        if self.required:
+            hits: Dict[int, int] = {}
+            condition_rule = self.condition_rule
+            getters = self._getters
+            for (path, ignore_case), table in self.equals.items():
+                value = getters[path](event)
+                if value is None:
+                    continue
+                if ignore_case and isinstance(value, str):
+                    value = value.lower()
+                try:
+                    condition_ids = table.get(value, ())
+                except TypeError:  # unhashable field value
+                    continue
+                for condition_id in condition_ids:
+                    rule_id = condition_rule[condition_id]
+                    hits[rule_id] = hits.get(rule_id, 0) + 1
+            for (path, ignore_case), automaton in self.contains.items():
+                value = getters[path](event)
+                if value is None:
+                    continue
+                text = str(value)
+                for condition_id in automaton.find(text.lower() if ignore_case else text):
+                    rule_id = condition_rule[condition_id]
+                    hits[rule_id] = hits.get(rule_id, 0) + 1
+            required = self.required
+            candidates.extend(rule_id for rule_id, count in hits.items() if count == required[rule_id])
+        if not self.residual:
+            return candidates
+        residual = self.residual
+        if timings is None:
+            return [rule_id for rule_id in candidates if rule_id not in residual or residual[rule_id](event)]
+        matched = []
+        for rule_id in candidates:
+            predicate = residual.get(rule_id)
+            if predicate is not None:
+                start = time.perf_counter()
+                hit = predicate(event)
+                timings.append((rule_id, time.perf_counter() - start))
+                if not hit:
+                    continue
+            matched.append(rule_id)
+        return matched
+
+class RuleIndex:
+    """
+    Rules compiled once at load into per-category buckets. Rules without a
+    category apply to every event; rules that fail to compile are logged
+    and never match.
+    """
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = rules
+        self._any = CategoryBucket()
+        self._buckets: Dict[Any, CategoryBucket] = {}
+        self._rule_bucket: Dict[int, CategoryBucket] = {}
+        for rule_id, rule in enumerate(rules):
+            try:
+                conditions = rule.get("conditions") or {}
+                conjuncts = compile_conjuncts(conditions)
+            except RuleSyntaxError as e:
+                logger.error(f"Invalid conditions in rule {rule.get('name')!r}: {e}")
+                continue
+            category = conditions.get("category")
+            bucket = self._any if category is None else self._buckets.setdefault(category, CategoryBucket())
+            bucket.add(rule_id, conjuncts)
+            self._rule_bucket[rule_id] = bucket
+        self._any.build()
+        for bucket in self._buckets.values():
+            bucket.build()
+
+    def match(self, event) -> List[Dict[str, Any]]:
+        """
+        Rules matching event, in load order.
+        """
+        return [self.rules[rule_id] for rule_id in self.match_ids(event)]
+
+    def match_ids(self, event, timings: Optional[list] = None) -> List[int]:
+        """
+        Positions in self.rules of the rules matching event, in order. See
+        CategoryBucket.match for timings.
+        """
+        rule_ids = self._any.match(event, timings)
+        bucket = self._buckets.get(event.get("category"))
+        if bucket is not None:
+            rule_ids.extend(bucket.match(event, timings))
+        rule_ids.sort()
+        return rule_ids
+
+    def match_batch(self, events: List[Any]) -> List[List[int]]:
+        """
+        match_ids for every event of a batch, evaluated column-wise (see
+        rules/columnar.py). Same results, not timed.
+        """
+        results: List[List[int]] = [[] for _ in events]
+        any_bucket = self._any
+        for offset in range(0, len(events), CHUNK_ROWS):
+            chunk = events[offset:offset + CHUNK_ROWS]
+            any_bucket.events += len(chunk)
+            if any_bucket.required or any_bucket.always:
+                for rule_id, mask in match_bucket(any_bucket, ColumnBatch(chunk)).items():
+                    for row in iter_rows(mask):
+                        results[offset + row].append(rule_id)
+            by_category: Dict[Any, List[int]] = {}
+            for row, event in enumerate(chunk):
+                by_category.setdefault(event.get("category"), []).append(row)
+            for category, rows in by_category.items():
+                bucket = self._buckets.get(category)
+                if bucket is None:
+                    continue
+                bucket.events += len(rows)
+                matched = match_bucket(bucket, ColumnBatch([chunk[row] for row in rows]))
+                for rule_id, mask in matched.items():
+                    for row in iter_rows(mask):
+                        results[offset + rows[row]].append(rule_id)
+        for rule_ids in results:
+            if len(rule_ids) > 1:
+                rule_ids.sort()
+        return results
+
+    def evaluations(self, rule_id: int) -> Optional[int]:
+        """
+        Events rule_id has been matched against, None if it did not compile.
+        """
+        bucket = self._rule_bucket.get(rule_id)
+        return bucket.events if bucket is not None else None
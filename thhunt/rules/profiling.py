@@ -0,0 +1,128 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+SAMPLE_EVERY = 64  # Time one event in this many
+RESERVOIR = 512  # Timings kept per rule for percentiles
+
+SORT_KEYS = ("time", "matches", "evaluations", "p99")
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class RuleProfile:
+    """
+    Counters of one rule. Timings only come from sampled events; each
+    stands for sample_every evaluations when estimating total time.
+    """
+    __slots__ = ("matches", "last_match", "timed", "sampled_seconds", "samples")
+
+    def __init__(self):
+        self.matches = 0
+        self.last_match: Optional[float] = None
+        self.timed = 0
+        self.sampled_seconds = 0.0
+        self.samples = deque(maxlen=RESERVOIR)
+
+    def record(self, seconds: float):
+        self.timed += 1
+        self.sampled_seconds += seconds
+        self.samples.append(seconds)
+
+class RuleProfiler:
+    """
+    Always-on profiling for a RuleEngine: tick() tells the engine whether
+    to time the current event, so the untimed path only pays for a
+    counter.
+    """
+    def __init__(self, rule_count: int, sample_every: int = SAMPLE_EVERY):
+        self.sample_every = sample_every
+        self.profiles = [RuleProfile() for _ in range(rule_count)]
+        self.events = 0
+        self.engine = RuleProfile()  # whole evaluate() calls
+        self._countdown = sample_every
+
+    def tick(self) -> bool:
+        self.events += 1
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.sample_every
+        return True
+
+    def record(self, rule_id: int, seconds: float):
+        self.profiles[rule_id].record(seconds)
+
+    def matched(self, rule_id: int, now: float):
+        profile = self.profiles[rule_id]
+        profile.matches += 1
+        profile.last_match = now
+
+    def rule_stats(self, rule_id: int) -> Dict[str, Any]:
+        profile = self.profiles[rule_id]
+        return {
+            "matches": profile.matches,
+            "last_match": profile.last_match,
+            "timed": profile.timed,
+            "time_ms": 1000 * profile.sampled_seconds * self.sample_every,
+            "avg_us": 1e6 * profile.sampled_seconds / profile.timed if profile.timed else 0.0,
+            "p99_us": 1e6 * percentile(list(profile.samples), 0.99),
+        }
+
+    def engine_stats(self) -> Dict[str, Any]:
+        engine = self.engine
+        return {
+            "events": self.events,
+            "sample_every": self.sample_every,
+            "avg_us": 1e6 * engine.sampled_seconds / engine.timed if engine.timed else 0.0,
+            "p99_us": 1e6 * percentile(list(engine.samples), 0.99),
+        }
+
+def merge_rule_stats(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combines RuleEngine.stats() of several shards running the same rules.
+    Counts and times add up; p99 is the worst shard's, which is an upper
+    bound rather than the exact percentile of the union.
+    """
+    if not snapshots:
+        return {"events": 0, "rules": []}
+    if len(snapshots) == 1:
+        return snapshots[0]
+    merged = {
+        "events": sum(s["events"] for s in snapshots),
+        "sample_every": snapshots[0].get("sample_every"),
+        "avg_us": _weighted(snapshots, "avg_us", "events"),
+        "p99_us": max(s.get("p99_us", 0.0) for s in snapshots),
+        "rules": [],
+    }
+    for rules in zip(*(s["rules"] for s in snapshots)):
+        rule = dict(rules[0])
+        for field in ("evaluations", "matches", "timed", "time_ms"):
+            rule[field] = sum(r[field] or 0 for r in rules)
+        rule["last_match"] = max((r["last_match"] for r in rules if r["last_match"] is not None), default=None)
+        rule["avg_us"] = _weighted(rules, "avg_us", "timed")
+        rule["p99_us"] = max(r["p99_us"] for r in rules)
+        merged["rules"].append(rule)
+    correlation = [s["correlation"] for s in snapshots if s.get("correlation")]
+    if correlation:
+        merged["correlation"] = {field: sum(c[field] for c in correlation) for field in correlation[0]}
+    return merged
+
+def _weighted(items, field: str, weight: str) -> float:
+    total = sum(item.get(weight) or 0 for item in items)
+    if not total:
+        return 0.0
+    return sum((item.get(field) or 0.0) * (item.get(weight) or 0) for item in items) / total
+
+def top_rules(stats: Dict[str, Any], sort: str = "time", limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    stats with its rules ordered worst first by sort (one of SORT_KEYS)
+    and cut to limit.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key {sort!r}, expected one of {SORT_KEYS}")
+    field = {"time": "time_ms", "matches": "matches", "evaluations": "evaluations", "p99": "p99_us"}[sort]
+    rules = sorted(stats.get("rules", []), key=lambda rule: rule.get(field) or 0, reverse=True)
+    return dict(stats, rules=rules[:limit] if limit else rules)
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+class TimerWheel:
+    """
+    Hashed timer wheel: slots of resolution seconds, reused every
+    len(slots) ticks. schedule() and advance() are O(1) amortized; an
+    entry due further out than one turn of the wheel simply comes back
+    early and is expected to be rescheduled by the caller.
+    """
+    def __init__(self, resolution: float = 1.0, slots: int = 4096):
+        self.resolution = resolution
+        self._slots: List[List[Tuple[Hashable, Any]]] = [[] for _ in range(slots)]
+        self._tick: Optional[int] = None
+
+    def schedule(self, key: Hashable, token: Any, deadline: float):
+        tick = int(deadline // self.resolution)
+        if self._tick is not None and tick <= self._tick:
+            tick = self._tick + 1
+        self._slots[tick % len(self._slots)].append((key, token))
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """
+        Moves the wheel to now and returns the (key, token) pairs of every
+        slot passed on the way.
+        """
+        target = int(now // self.resolution)
+        if self._tick is None or target <= self._tick:
+            if self._tick is None:
+                self._tick = target
+            return []
+        due = []
+        slots = self._slots
+        for tick in range(self._tick + 1, self._tick + 1 + min(target - self._tick, len(slots))):
+            slot = tick % len(slots)
+            if slots[slot]:
+                due.extend(slots[slot])
+                slots[slot] = []
+        self._tick = target
+        return due
+
+class WindowedStateStore:
+    """
+    Per-key state for windowed rules, bounded in two ways: every entry has
+    a deadline after which it expires (driven by a TimerWheel, so expiry
+    costs O(1) per entry whatever the number of keys), and at most
+    max_entries entries are kept, evicting the least recently used.
+    """
+    def __init__(self, max_entries: int = 100000, resolution: float = 1.0, slots: int = 4096):
+        self.max_entries = max_entries
+        # key -> [state, deadline]; the list itself is the wheel token, so
+        # a wheel reference to a deleted or replaced entry is recognised.
+        # Dropped entries have their state cleared, as the wheel keeps the
+        # token until its deadline comes round.
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._wheel = TimerWheel(resolution, slots)
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, now: float) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._entries[key]
+            entry[0] = None
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, state: Any, deadline: float):
+        """
+        Stores state under key until deadline (replacing any previous
+        deadline of key).
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[0] = state
+            entry[1] = deadline
+            self._entries.move_to_end(key)
+            return
+        entry = self._entries[key] = [state, deadline]
+        self._wheel.schedule(key, entry, deadline)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)[1][0] = None
+            self.evicted += 1
+
+    def pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[0] = None
+
+    def advance(self, now: float):
+        """
+        Drops every entry whose deadline has passed.
+        """
+        entries = self._entries
+        for key, entry in self._wheel.advance(now):
+            if entries.get(key) is not entry:
+                continue  # deleted, evicted or replaced since
+            if entry[1] <= now:
+                del entries[key]
+                entry[0] = None
+                self.expired += 1
+            else:
+                self._wheel.schedule(key, entry, entry[1])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from ..config.schema import DatabaseConfig
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class ConnectionManager:
+    """
+    Owns the SQLite connections for one database file.
+
+    A single long-lived writer connection is shared by every component and
+    serialized with a lock (SQLite only ever allows one writer). Reads borrow
+    a read-only connection from a small pool so they never wait on the
+    writer lock. PRAGMAs are applied once when each connection is opened.
+    """
+    def __init__(self, db_path: str, config: Optional[DatabaseConfig] = None):
+        self.db_path = db_path
+        self.config = config or DatabaseConfig(path=db_path)
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._idle_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.file_id = None
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        conn.execute(f'PRAGMA busy_timeout={int(self.config.busy_timeout_ms)};')
+        conn.execute(f'PRAGMA synchronous={self.config.synchronous};')
+        conn.execute(f'PRAGMA cache_size=-{int(self.config.cache_size_kb)};')
+        conn.execute(f'PRAGMA mmap_size={int(self.config.mmap_size_mb) * 1024 * 1024};')
+        conn.execute(f'PRAGMA temp_store={self.config.temp_store};')
+
+    def connect(self, read_only: bool = False, path: Optional[str] = None) -> sqlite3.Connection:
+        """
+        Opens a new tuned connection to this database, or to another file
+        (e.g. an event partition) when path is given. The caller owns it
+        and must close it.
+        """
+        path = path or self.db_path
+        if read_only:
+            uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL;')
+        self._apply_pragmas(conn)
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self.connect()
+            st = os.stat(self.db_path)
+            self.file_id = (st.st_dev, st.st_ino)
+        return self._writer
+
+    @contextmanager
+    def write(self):
+        """
+        Yields the shared writer connection inside a transaction that is
+        committed on success and rolled back on error.
+        """
+        with self._write_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @contextmanager
+    def read(self):
+        """
+        Borrows a pooled read-only connection for the duration of the block.
+        """
+        with self._readers_lock:
+            conn = self._idle_readers.pop() if self._idle_readers else None
+        if conn is None:
+            # The database (and its WAL) must exist before a read-only open
+            with self._write_lock:
+                self._get_writer()
+            conn = self.connect(read_only=True)
+        try:
+            yield conn
+        finally:
+            with self._readers_lock:
+                if len(self._idle_readers) < self.config.reader_pool_size:
+                    self._idle_readers.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for conn in self._idle_readers:
+                conn.close()
+            self._idle_readers = []
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path: str, config: Optional[DatabaseConfig] = None) -> ConnectionManager:
+    """
+    Returns the process-wide ConnectionManager for db_path, creating it on
+    first use. The first caller's config decides the PRAGMA settings.
+    """
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is not None and manager.file_id is not None:
+            # The file was deleted or replaced underneath us: start over
+            try:
+                st = os.stat(key)
+                stale = (st.st_dev, st.st_ino) != manager.file_id
+            except OSError:
+                stale = True
+            if stale:
+                manager.close()
+                manager = None
+        if manager is None:
+            manager = ConnectionManager(db_path, config)
+            _managers[key] = manager
+        return manager
@@ -1,122 +1,289 @@
-import sqlite3
-import os
-from ..utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class DatabaseManager:
-    def __init__(self, db_path: str):
-        self.db_path = db_path
-        self._init_db()
-
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        return conn
-
-    def _init_db(self):
-        """
-        Initialize database schema.
-        """
-        logger.info(f"Initializing database at {self.db_path}")
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Events table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL,
-                host_id TEXT,
-                category TEXT,
-                event_type TEXT,
-                raw_data JSON
-            )
-        ''')
-        
-        # Alerts table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL,
-                severity TEXT,
-                rule_name TEXT,
-                description TEXT,
-                related_events JSON,
-                is_enriched BOOLEAN DEFAULT 0
-            )
-        ''')
-
-        # Enrichments table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS enrichments (
-                alert_id INTEGER PRIMARY KEY,
-                summary TEXT,
-                severity_score INTEGER,
-                threat_category TEXT,
-                recommendations TEXT,
-                FOREIGN KEY(alert_id) REFERENCES alerts(id)
-            )
-        ''')
-
-        conn.commit()
-        conn.close()
-
-    def insert_event(self, event: dict):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        # TODO: Proper normalization and insertion
-        # For now just dumping raw
-        import json
-        cursor.execute('''
-            INSERT INTO events (timestamp, host_id, category, event_type, raw_data)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (event.get('timestamp'), event.get('host_id', 'unknown'), event.get('category', 'unknown'), event.get('type'), json.dumps(event)))
-        conn.commit()
-        conn.close()
-
-    def insert_alert(self, alert: dict):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO alerts (timestamp, severity, rule_name, description, related_events, is_enriched)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (alert.get('timestamp'), alert.get('severity'), alert.get('rule_name'), alert.get('description'), alert.get('related_events'), alert.get('is_enriched')))
-        conn.commit()
-        conn.close()
-
-    def get_unenriched_alerts(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM alerts WHERE is_enriched = 0')
-        rows = cursor.fetchall()
-        # Convert to dicts
-        alerts = []
-        for row in rows:
-            alerts.append({
-                "id": row[0],
-                "timestamp": row[1],
-                "severity": row[2],
-                "rule_name": row[3],
-                "description": row[4],
-                "related_events": row[5],
-                "is_enriched": row[6]
-            })
-        conn.close()
-        return alerts
-
-    def update_alert_enrichment(self, alert_id: int, enrichment: dict):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Update alert status
-        cursor.execute('UPDATE alerts SET is_enriched = 1, severity = ? WHERE id = ?', (enrichment.get('severity_score'), alert_id))
-        
-        # Insert enrichment details
-        cursor.execute('''
-            INSERT INTO enrichments (alert_id, summary, severity_score, threat_category, recommendations)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (alert_id, enrichment.get('summary'), enrichment.get('severity_score'), enrichment.get('threat_category'), enrichment.get('recommendations')))
-        
-        conn.commit()
-        conn.close()
+import json
+from typing import Optional, List, Dict, Any, Iterator
+from ..config.schema import DatabaseConfig
+from .connection import get_connection_manager
+from .partitions import get_partition_store
+from .event_schema import (EVENT_COLUMNS, EVENT_COLUMN_ASSIGNMENTS, EVENT_INSERT_COLUMNS, EVENT_INSERT_PLACEHOLDERS,
+                           event_row, create_event_indexes, build_event_filter)
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Schema version written to PRAGMA user_version once all migrations have run
+SCHEMA_VERSION = 3
+
+# alerts.source of alerts raised by the live detection pipeline
+LIVE_SOURCE = "live"
+
+class DatabaseManager:
+    # Rows backfilled per transaction when migrating existing events in place
+    MIGRATION_CHUNK_SIZE = 5000
+
+    def __init__(self, db_path: str, config: Optional[DatabaseConfig] = None):
+        self.db_path = db_path
+        self.connections = get_connection_manager(db_path, config)
+        self._init_db()
+        self.partitions = get_partition_store(self.connections)
+        if self.connections.config.retention_days and not self.partitions:
+            logger.warning("retention_days is only enforced when partition_period_hours is set")
+
+    def _get_connection(self):
+        """
+        Opens a private tuned connection for ad hoc use. The caller must close it.
+        """
+        return self.connections.connect()
+
+    def _init_db(self):
+        """
+        Initialize database schema and bring it up to SCHEMA_VERSION.
+        """
+        logger.info(f"Initializing database at {self.db_path}")
+        with self.connections.read() as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+        migrations = {1: self._migrate_v1, 2: self._migrate_v2, 3: self._migrate_v3}
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            logger.info(f"Migrating database schema to version {target}")
+            migrations[target]()
+            with self.connections.write() as conn:
+                conn.execute(f'PRAGMA user_version = {target}')
+
+    def _migrate_v1(self):
+        """
+        Base schema. Uses IF NOT EXISTS so databases created before
+        versioning (user_version 0) pass through unchanged.
+        """
+        with self.connections.write() as conn:
+            cursor = conn.cursor()
+
+            # Events table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL,
+                    host_id TEXT,
+                    category TEXT,
+                    event_type TEXT,
+                    raw_data JSON
+                )
+            ''')
+
+            # Alerts table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL,
+                    severity TEXT,
+                    rule_name TEXT,
+                    description TEXT,
+                    related_events JSON,
+                    is_enriched BOOLEAN DEFAULT 0
+                )
+            ''')
+
+            # Enrichments table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS enrichments (
+                    alert_id INTEGER PRIMARY KEY,
+                    summary TEXT,
+                    severity_score INTEGER,
+                    threat_category TEXT,
+                    recommendations TEXT,
+                    FOREIGN KEY(alert_id) REFERENCES alerts(id)
+                )
+            ''')
+
+    def _migrate_v2(self):
+        """
+        Typed event columns plus hunt indexes. Existing rows are backfilled
+        from raw_data in id-range chunks, one transaction per chunk, so the
+        writer is never held for long. Safe to resume after an interruption.
+        """
+        with self.connections.write() as conn:
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(events)')}
+            for name, col_type, _ in EVENT_COLUMNS:
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE events ADD COLUMN {name} {col_type}')
+            conn.execute('CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value)')
+            row = conn.execute("SELECT value FROM schema_meta WHERE key = 'v2_backfilled_id'").fetchone()
+            last_id = row[0] if row else 0
+            max_id = conn.execute('SELECT MAX(id) FROM events').fetchone()[0] or 0
+
+        while last_id < max_id:
+            upper = last_id + self.MIGRATION_CHUNK_SIZE
+            with self.connections.write() as conn:
+                conn.execute(f'UPDATE events SET {EVENT_COLUMN_ASSIGNMENTS} WHERE id > ? AND id <= ?', (last_id, upper))
+                conn.execute("INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('v2_backfilled_id', ?)", (upper,))
+            last_id = upper
+
+        with self.connections.write() as conn:
+            create_event_indexes(conn)
+            conn.execute("DELETE FROM schema_meta WHERE key = 'v2_backfilled_id'")
+
+    def _migrate_v3(self):
+        """
+        alerts.source tells live alerts from retro-hunt results
+        ("retrohunt:<job id>").
+        """
+        with self.connections.write() as conn:
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(alerts)')}
+            if 'source' not in existing:
+                conn.execute(f"ALTER TABLE alerts ADD COLUMN source TEXT DEFAULT '{LIVE_SOURCE}'")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_source ON alerts (source, timestamp)')
+
+    def insert_event(self, event: dict):
+        self.insert_events([event])
+
+    def insert_events(self, events: list) -> int:
+        """
+        Inserts a batch of events with one executemany in a single transaction.
+        Returns how many were dropped instead for being older than the
+        partition retention.
+        """
+        if not events:
+            return 0
+        if self.partitions:
+            return self.partitions.insert_events(events)
+        # Serialize before taking the writer lock
+        rows = [event_row(event) for event in events]
+        with self.connections.write() as conn:
+            conn.executemany(f'INSERT INTO events ({EVENT_INSERT_COLUMNS}) VALUES ({EVENT_INSERT_PLACEHOLDERS})', rows)
+        return 0
+
+    def query_events(self, start: Optional[float] = None, end: Optional[float] = None,
+                     category: Optional[str] = None, host_id: Optional[str] = None,
+                     pid: Optional[int] = None, process_name: Optional[str] = None,
+                     process_path_prefix: Optional[str] = None, remote_ip: Optional[str] = None,
+                     remote_port: Optional[int] = None, user: Optional[str] = None,
+                     limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Hunts over the typed event columns. Every filter is an indexed
+        equality or range predicate; returns the stored events, newest first.
+        With partitioning enabled only partitions overlapping [start, end)
+        are opened, plus the main table for events stored before it was.
+        """
+        where, params = build_event_filter(start, end, category, host_id, pid, process_name,
+                                           process_path_prefix, remote_ip, remote_port, user)
+        rows = self.partitions.query(where, params, limit, start, end) if self.partitions else []
+        if len(rows) < limit:
+            with self.connections.read() as conn:
+                rows.extend(conn.execute(
+                    f'SELECT timestamp, raw_data FROM events {where} ORDER BY timestamp DESC LIMIT ?',
+                    params + [limit - len(rows)]
+                ).fetchall())
+        if self.partitions:
+            rows.sort(key=lambda row: row[0] or 0, reverse=True)
+        return [json.loads(row[1]) for row in rows[:limit]]
+
+    def _event_sources(self, start: Optional[float], end: Optional[float]) -> List[str]:
+        """
+        Files holding events in [start, end), oldest first: the main
+        database (events stored before partitioning was enabled), then
+        the overlapping partitions.
+        """
+        paths = [self.db_path]
+        if self.partitions:
+            paths.extend(path for _, path in self.partitions.partitions_for_range(start, end))
+        return paths
+
+    def count_events(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        where, params = build_event_filter(start=start, end=end)
+        total = 0
+        for path in self._event_sources(start, end):
+            conn = self.connections.connect(read_only=True, path=path)
+            try:
+                total += conn.execute(f'SELECT COUNT(*) FROM events {where}', params).fetchone()[0]
+            finally:
+                conn.close()
+        return total
+
+    def iter_event_chunks(self, start: Optional[float] = None, end: Optional[float] = None,
+                          chunk_size: int = 1000) -> Iterator[List[str]]:
+        """
+        Streams the raw_data of every event in [start, end) in timestamp
+        order, chunk_size rows at a time. Each chunk is its own keyset
+        query on (timestamp, id), so memory stays flat whatever the range
+        and no read snapshot is held between chunks (a long scan does not
+        keep the WAL from being checkpointed).
+        """
+        # One lower bound on timestamp, so each chunk seeks straight to its
+        # position in idx_events_timestamp instead of rescanning from start
+        where = "WHERE timestamp >= ? AND (timestamp, id) > (?, ?)" + (" AND timestamp < ?" if end is not None else "")
+        for path in self._event_sources(start, end):
+            conn = self.connections.connect(read_only=True, path=path)
+            try:
+                position = (float('-inf') if start is None else start, 0)
+                while True:
+                    rows = conn.execute(
+                        f'SELECT timestamp, id, raw_data FROM events {where} ORDER BY timestamp, id LIMIT ?',
+                        [position[0], *position] + ([end] if end is not None else []) + [chunk_size]
+                    ).fetchall()
+                    if not rows:
+                        break
+                    position = rows[-1][:2]
+                    yield [row[2] for row in rows]
+                    if len(rows) < chunk_size:
+                        break
+            finally:
+                conn.close()
+
+    def index_sealed_partitions(self, now: Optional[float] = None) -> int:
+        """
+        Fills the typed columns and builds the hunt indexes of event
+        partitions whose period is over. Returns how many were indexed.
+        """
+        return self.partitions.index_sealed(now) if self.partitions else 0
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """
+        Drops event partitions older than retention_days. Returns how many were dropped.
+        """
+        return self.partitions.enforce_retention(now) if self.partitions else 0
+
+    def insert_alert(self, alert: dict):
+        self.insert_alerts([alert])
+
+    def insert_alerts(self, alerts: list):
+        """
+        Inserts a batch of alerts in a single transaction.
+        """
+        if not alerts:
+            return
+        rows = [(alert.get('timestamp'), alert.get('severity'), alert.get('rule_name'), alert.get('description'),
+                 alert.get('related_events'), alert.get('is_enriched'), alert.get('source', LIVE_SOURCE))
+                for alert in alerts]
+        with self.connections.write() as conn:
+            conn.executemany('''
+                INSERT INTO alerts (timestamp, severity, rule_name, description, related_events, is_enriched, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    def get_unenriched_alerts(self):
+        with self.connections.read() as conn:
+            rows = conn.execute('SELECT * FROM alerts WHERE is_enriched = 0').fetchall()
+        # Convert to dicts
+        alerts = []
+        for row in rows:
+            alerts.append({
+                "id": row[0],
+                "timestamp": row[1],
+                "severity": row[2],
+                "rule_name": row[3],
+                "description": row[4],
+                "related_events": row[5],
+                "is_enriched": row[6]
+            })
+        return alerts
+
+    def update_alert_enrichment(self, alert_id: int, enrichment: dict):
+        with self.connections.write() as conn:
+            cursor = conn.cursor()
+
+            # Update alert status
+            cursor.execute('UPDATE alerts SET is_enriched = 1, severity = ? WHERE id = ?', (enrichment.get('severity_score'), alert_id))
+
+            # Insert enrichment details
+            cursor.execute('''
+                INSERT INTO enrichments (alert_id, summary, severity_score, threat_category, recommendations)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (alert_id, enrichment.get('summary'), enrichment.get('severity_score'), enrichment.get('threat_category'), enrichment.get('recommendations')))
@@ -0,0 +1,160 @@
+import json
+import sqlite3
+from typing import Dict, List, Tuple
+from ..normalization.model import to_plain
+
+# Hot fields pulled out of raw_data into typed, indexed columns.
+# Each column takes the first non-null value among its JSON paths.
+EVENT_COLUMNS = [
+    ("pid", "INTEGER", ("$.process.pid", "$.network.pid")),
+    ("ppid", "INTEGER", ("$.process.ppid",)),
+    ("process_path", "TEXT", ("$.process.path",)),
+    ("process_name", "TEXT", ("$.process.name", "$.network.process_name")),
+    ("remote_ip", "TEXT", ("$.network.remote_ip", "$.auth.src_ip")),
+    ("remote_port", "INTEGER", ("$.network.remote_port",)),
+    ("user", "TEXT", ("$.process.user", "$.auth.user", "$.persistence.user")),
+]
+
+# Indexes for the common hunt shapes: (column, timestamp) so "X in the last
+# hour" is one range scan. Kept narrow and partial (rows where the column is
+# NULL are skipped) to keep insert cost low; any =, range or IN predicate on
+# the column lets SQLite use the partial index. The main events table keeps
+# columns and indexes up to date on insert. A time partition only stores
+# the base columns while it is current; its typed columns are filled and
+# its indexes built in bulk once its period is over
+# (PartitionedEventStore.index_sealed).
+EVENT_INDEXES = {
+    "idx_events_timestamp": ("timestamp", None),
+    "idx_events_category": ("category, timestamp", None),
+    "idx_events_remote_ip": ("remote_ip, timestamp", "remote_ip IS NOT NULL"),
+    "idx_events_process_path": ("process_path, timestamp", "process_path IS NOT NULL"),
+    "idx_events_process_name": ("process_name, timestamp", "process_name IS NOT NULL"),
+    "idx_events_pid": ("pid, timestamp", "pid IS NOT NULL"),
+    "idx_events_user": ("user, timestamp", "user IS NOT NULL"),
+}
+
+def column_expression(paths) -> str:
+    """
+    SQL for a typed column's value: its first non-null JSON path.
+    """
+    # COALESCE needs two arguments, hence the trailing NULL
+    return "COALESCE(" + ", ".join(f"json_extract(raw_data, '{path}')" for path in paths) + ", NULL)"
+
+# SET clause filling the typed columns from raw_data
+EVENT_COLUMN_ASSIGNMENTS = ", ".join(f"{name} = {column_expression(paths)}" for name, _, paths in EVENT_COLUMNS)
+
+# Stands in for the events table of a partition whose typed columns are
+# not filled yet, so the same WHERE clause works on it
+UNINDEXED_EVENTS = "(SELECT id, timestamp, host_id, category, event_type, raw_data, " + ", ".join(
+    f"{column_expression(paths)} AS {name}" for name, _, paths in EVENT_COLUMNS) + " FROM events)"
+
+def _section_fields() -> List[Tuple[str, List[Tuple[str, int]]]]:
+    """
+    EVENT_COLUMNS regrouped by event section: [(section, [(key, column
+    index)])], sections in first-use order. Every column lists its paths
+    in that same section order, so filling columns section by section
+    keeps "first non-null path wins".
+    """
+    sections: Dict[str, List[Tuple[str, int]]] = {}
+    for index, (name, _, paths) in enumerate(EVENT_COLUMNS):
+        order = []
+        for path in paths:
+            section, key = path[2:].split('.')
+            sections.setdefault(section, []).append((key, index))
+            order.append(list(sections).index(section))
+        if order != sorted(order):
+            raise ValueError(f"Paths of event column {name} are out of section order")
+    return list(sections.items())
+
+_SECTION_FIELDS = _section_fields()
+
+def event_column_values(event: dict) -> tuple:
+    """
+    Extracts the typed column values for an event, mirroring EVENT_COLUMNS.
+    Events carry one or two sections, so only those are looked at.
+    """
+    values = [None] * len(EVENT_COLUMNS)
+    for section, fields in _SECTION_FIELDS:
+        data = event.get(section)
+        if data:
+            for key, index in fields:
+                if values[index] is None:
+                    values[index] = data.get(key)
+    return tuple(values)
+
+EVENT_BASE_COLUMNS = "timestamp, host_id, category, event_type, raw_data"
+EVENT_BASE_PLACEHOLDERS = "?, ?, ?, ?, ?"
+EVENT_INSERT_COLUMNS = EVENT_BASE_COLUMNS + ", " + ", ".join(name for name, _, _ in EVENT_COLUMNS)
+EVENT_INSERT_PLACEHOLDERS = ", ".join("?" * (5 + len(EVENT_COLUMNS)))
+
+_encode_json = json.JSONEncoder(separators=(',', ':'), default=to_plain).encode
+
+def event_base_row(event: dict) -> tuple:
+    """
+    Values for EVENT_BASE_COLUMNS, for tables whose typed columns are filled later.
+    """
+    return (event.get('timestamp'), event.get('host_id', 'unknown'), event.get('category', 'unknown'), event.get('type'), _encode_json(event))
+
+def event_row(event: dict) -> tuple:
+    return event_base_row(event) + event_column_values(event)
+
+def create_events_table(conn: sqlite3.Connection, schema: str = "main", indexes: bool = True):
+    """
+    Creates an events table at the current schema, typed columns and
+    (unless indexes is False) indexes included. Used for fresh event
+    stores such as partitions.
+    """
+    typed = "".join(f",\n            {name} {col_type}" for name, col_type, _ in EVENT_COLUMNS)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL,
+            host_id TEXT,
+            category TEXT,
+            event_type TEXT,
+            raw_data JSON{typed}
+        )
+    ''')
+    if indexes:
+        create_event_indexes(conn, schema)
+
+def create_event_indexes(conn: sqlite3.Connection, schema: str = "main", names=None):
+    """
+    Creates the EVENT_INDEXES listed in names (all by default).
+    """
+    for name in (EVENT_INDEXES if names is None else names):
+        columns, where = EVENT_INDEXES[name]
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.{name} ON events ({columns})' + (f' WHERE {where}' if where else ''))
+
+def has_event_indexes(conn: sqlite3.Connection, schema: str = "main") -> bool:
+    """
+    Whether every one of EVENT_INDEXES exists in schema, meaning its typed
+    columns are filled too (they are filled before the indexes are built).
+    """
+    existing = {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'index'")}
+    return existing.issuperset(EVENT_INDEXES)
+
+def build_event_filter(start=None, end=None, category=None, host_id=None, pid=None,
+                       process_name=None, process_path_prefix=None, remote_ip=None,
+                       remote_port=None, user=None):
+    """
+    Builds an index-friendly WHERE clause over the typed event columns.
+    Path prefixes become a range so they can use idx_events_process_path.
+    """
+    clauses, params = [], []
+    for column, value in (("category", category), ("host_id", host_id), ("pid", pid),
+                          ("process_name", process_name), ("remote_ip", remote_ip),
+                          ("remote_port", remote_port), ("user", user)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if process_path_prefix:
+        clauses.append("process_path >= ? AND process_path < ?")
+        params.extend([process_path_prefix, process_path_prefix[:-1] + chr(ord(process_path_prefix[-1]) + 1)])
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
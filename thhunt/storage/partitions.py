@@ -0,0 +1,257 @@
+import calendar
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from .connection import ConnectionManager
+from .event_schema import (EVENT_BASE_COLUMNS, EVENT_BASE_PLACEHOLDERS, EVENT_INSERT_COLUMNS, EVENT_INSERT_PLACEHOLDERS,
+                           EVENT_COLUMN_ASSIGNMENTS, EVENT_INDEXES, UNINDEXED_EVENTS, event_base_row,
+                           event_column_values, create_events_table, create_event_indexes, has_event_indexes)
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PARTITION_STAMP = '%Y%m%dT%H%M%SZ'
+
+class PartitionedEventStore:
+    """
+    Stores events in one SQLite file per time period, next to the main
+    database (thhunt.db -> thhunt.events.20240101T000000Z.db).
+
+    Partitions are attached to the shared writer connection on demand, so
+    inserts keep using the single writer lock. Retention drops whole
+    partition files instead of deleting rows, and range queries only open
+    the partitions that overlap the range.
+
+    While a partition is current, inserts only write the base columns, as
+    cheap as the original raw-JSON table, and hunts on it scan raw_data
+    (one period at most). Once its period is over,
+    index_sealed fills its typed columns and builds the hunt indexes in
+    bulk, and late events for it are written with their typed columns.
+    """
+    BACKFILL_CHUNK_SIZE = 50000
+
+    # SQLite allows 10 attached databases by default; keep some headroom
+    MAX_ATTACHED = 8
+
+    def __init__(self, connections: ConnectionManager, period_seconds: int, retention_seconds: float = 0):
+        self.connections = connections
+        self.period = int(period_seconds)
+        self.retention = retention_seconds
+        base = os.path.abspath(connections.db_path)
+        self.directory = os.path.dirname(base)
+        self.prefix = os.path.splitext(os.path.basename(base))[0] + ".events."
+        self._attached: "OrderedDict[int, str]" = OrderedDict()  # partition start -> alias, LRU order
+        self._attached_conn = None
+        self._indexed: Dict[int, bool] = {}  # partition start -> inserts must fill the typed columns
+        self.expired_events = 0
+
+    def partition_start(self, timestamp: float) -> int:
+        return int(timestamp // self.period) * self.period
+
+    def partition_path(self, start: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}{time.strftime(PARTITION_STAMP, time.gmtime(start))}.db")
+
+    def list_partitions(self) -> List[Tuple[int, str]]:
+        """
+        Returns (start, path) for every partition file on disk, oldest first.
+        """
+        partitions = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith(self.prefix) and name.endswith(".db")):
+                continue
+            try:
+                start = calendar.timegm(time.strptime(name[len(self.prefix):-3], PARTITION_STAMP))
+            except ValueError:
+                continue
+            partitions.append((start, os.path.join(self.directory, name)))
+        return sorted(partitions)
+
+    def partitions_for_range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Tuple[int, str]]:
+        return [(p_start, path) for p_start, path in self.list_partitions()
+                if (end is None or p_start < end) and (start is None or p_start + self.period > start)]
+
+    def _attach(self, conn, start: int) -> str:
+        """
+        Attaches a partition to the writer connection, detaching the least
+        recently used one when at the limit. Must run outside a transaction.
+        """
+        if conn is not self._attached_conn:
+            # The writer connection was reopened; nothing is attached to it
+            self._attached.clear()
+            self._attached_conn = conn
+
+        alias = self._attached.get(start)
+        if alias is not None:
+            self._attached.move_to_end(start)
+            return alias
+
+        while len(self._attached) >= self.MAX_ATTACHED:
+            _, old_alias = self._attached.popitem(last=False)
+            conn.execute(f'DETACH DATABASE {old_alias}')
+
+        alias = f"p_{start}"
+        conn.execute(f'ATTACH DATABASE ? AS {alias}', (self.partition_path(start),))
+        conn.execute(f'PRAGMA {alias}.journal_mode=WAL')
+        create_events_table(conn, alias, indexes=False)
+        if start not in self._indexed:
+            self._indexed[start] = has_event_indexes(conn, alias)
+        self._attached[start] = alias
+        return alias
+
+    def _expired(self, start: int, now: float) -> bool:
+        return bool(self.retention) and start + self.period <= now - self.retention
+
+    def insert_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Inserts events into their partitions. Events older than the
+        retention horizon are dropped rather than recreating a partition
+        retention already removed. Returns how many were dropped.
+        """
+        now = time.time()
+        groups: Dict[int, list] = {}
+        expired = 0
+        for event in events:
+            timestamp = event.get('timestamp')
+            start = self.partition_start(now if timestamp is None else timestamp)
+            if self._expired(start, now):
+                expired += 1
+                continue
+            groups.setdefault(start, []).append(event)
+        if expired:
+            self.expired_events += expired
+            logger.warning(f"Dropped {expired} events older than the {self.retention / 86400:g} day retention")
+        rows = {start: [event_base_row(event) for event in group] for start, group in groups.items()}
+
+        starts = sorted(groups)
+        # ATTACH is not allowed inside a transaction, so attach every partition
+        # a transaction needs first. Replays spanning many periods are split.
+        for i in range(0, len(starts), self.MAX_ATTACHED):
+            chunk = starts[i:i + self.MAX_ATTACHED]
+            with self.connections.write() as conn:
+                aliases = {start: self._attach(conn, start) for start in chunk}
+                for start in chunk:
+                    if self._indexed[start]:
+                        conn.executemany(
+                            f'INSERT INTO {aliases[start]}.events ({EVENT_INSERT_COLUMNS}) VALUES ({EVENT_INSERT_PLACEHOLDERS})',
+                            [row + event_column_values(event) for row, event in zip(rows[start], groups[start])]
+                        )
+                    else:
+                        conn.executemany(
+                            f'INSERT INTO {aliases[start]}.events ({EVENT_BASE_COLUMNS}) VALUES ({EVENT_BASE_PLACEHOLDERS})',
+                            rows[start]
+                        )
+        return expired
+
+    def query(self, where: str, params: list, limit: int, start: Optional[float] = None, end: Optional[float] = None) -> List[tuple]:
+        """
+        Runs a filtered events query over the partitions overlapping
+        [start, end), newest first, stopping once limit rows are found.
+        Returns (timestamp, raw_data) rows.
+        """
+        rows = []
+        for _, path in reversed(self.partitions_for_range(start, end)):
+            if len(rows) >= limit:
+                break
+            conn = self.connections.connect(read_only=True, path=path)
+            try:
+                source = "events" if has_event_indexes(conn) else UNINDEXED_EVENTS
+                rows.extend(conn.execute(
+                    f'SELECT timestamp, raw_data FROM {source} {where} ORDER BY timestamp DESC LIMIT ?',
+                    params + [limit - len(rows)]
+                ).fetchall())
+            finally:
+                conn.close()
+        return rows
+
+    def index_sealed(self, now: Optional[float] = None) -> int:
+        """
+        Fills the typed columns and builds the hunt indexes of every
+        partition whose period ended before now. The work runs on its own
+        connection to the partition file, in chunks, so other writers
+        only wait for one chunk at a time. Returns the number of
+        partitions indexed.
+        """
+        now = time.time() if now is None else now
+        indexed = 0
+        for start, path in self.list_partitions():
+            if start + self.period > now:
+                break
+            conn = self.connections.connect(path=path)
+            try:
+                if has_event_indexes(conn):
+                    self._indexed[start] = True
+                    continue
+                began = time.monotonic()
+                with self.connections.write():
+                    # From here on inserts fill the typed columns themselves,
+                    # so only the rows already there need backfilling
+                    self._indexed[start] = True
+                last_id = 0
+                max_id = conn.execute('SELECT MAX(id) FROM events').fetchone()[0] or 0
+                while last_id < max_id:
+                    upper = last_id + self.BACKFILL_CHUNK_SIZE
+                    conn.execute(f'UPDATE events SET {EVENT_COLUMN_ASSIGNMENTS} WHERE id > ? AND id <= ?', (last_id, upper))
+                    conn.commit()
+                    last_id = upper
+                for name in EVENT_INDEXES:
+                    create_event_indexes(conn, "main", [name])
+                    conn.commit()
+            finally:
+                conn.close()
+            indexed += 1
+            logger.info(f"Indexed sealed event partition {os.path.basename(path)} in {time.monotonic() - began:.1f}s")
+        return indexed
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """
+        Unlinks every partition that ended before the retention cutoff.
+        Returns the number of partitions dropped.
+        """
+        if not self.retention:
+            return 0
+        now = now or time.time()
+        dropped = 0
+        for start, path in self.list_partitions():
+            if not self._expired(start, now):
+                break
+            with self.connections.write() as conn:
+                alias = self._attached.pop(start, None)
+                self._indexed.pop(start, None)
+                if alias is not None and conn is self._attached_conn:
+                    conn.execute(f'DETACH DATABASE {alias}')
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error(f"Failed to remove partition file {path + suffix}: {e}")
+            logger.info(f"Dropped event partition {os.path.basename(path)}")
+            dropped += 1
+        return dropped
+
+
+_stores: "weakref.WeakKeyDictionary[ConnectionManager, PartitionedEventStore]" = weakref.WeakKeyDictionary()
+_stores_lock = threading.Lock()
+
+def get_partition_store(connections: ConnectionManager) -> Optional[PartitionedEventStore]:
+    """
+    Returns the partition store shared by every user of this connection
+    manager, or None when partitioning is disabled in its config.
+    """
+    config = connections.config
+    if not config.partition_period_hours:
+        return None
+    with _stores_lock:
+        store = _stores.get(connections)
+        if store is None:
+            store = PartitionedEventStore(
+                connections,
+                period_seconds=int(config.partition_period_hours * 3600),
+                retention_seconds=config.retention_days * 86400
+            )
+            _stores[connections] = store
+        return store
@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import Dict, Any, List
+from .db import DatabaseManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class EventWriter(threading.Thread):
+    """
+    Dedicated writer stage for the events table.
+
+    Events are buffered in memory and group-committed through
+    DatabaseManager.insert_events once the buffer reaches batch_size rows
+    or its oldest row is older than flush_interval seconds. A batch that
+    fails to commit (database busy, disk full) goes back to the front of
+    the buffer and is retried after retry_backoff seconds, doubling up to
+    max_backoff; it is only dropped, and counted in rows_failed, once
+    max_retries retries in a row have failed. Since it owns the event
+    write path, it also enforces partition retention and builds the hunt
+    indexes of sealed partitions every retention_interval seconds.
+    """
+    def __init__(self, db: DatabaseManager, batch_size: int = 500, flush_interval: float = 1.0, retention_interval: float = 3600,
+                 max_retries: int = 5, retry_backoff: float = 0.5, max_backoff: float = 30.0):
+        super().__init__()
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retention_interval = retention_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.running = True
+        self.daemon = True
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._oldest = None  # monotonic time the oldest buffered event arrived
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Serializes flushes from the writer thread and stop()
+        self._wakeup = threading.Event()
+        self._failures = 0  # failed flushes in a row
+        self._retry_at = None  # monotonic time before which a failed batch is not retried
+
+        # Statistics
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.rows_expired = 0  # older than the partition retention, never stored
+        self.retries = 0
+        self.flush_count = 0
+        self.total_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def write(self, event: Dict[str, Any]):
+        """
+        Buffers a single event for the next group commit.
+        """
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def write_batch(self, events: List[Dict[str, Any]]):
+        """
+        Buffers a batch of events for the next group commit.
+        """
+        if not events:
+            return
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.extend(events)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def run(self):
+        logger.info("Event writer started")
+        next_retention = time.monotonic()
+        while self.running:
+            self._wakeup.wait(self._time_until_due())
+            self._wakeup.clear()
+            if self._is_due():
+                self.flush()
+            if time.monotonic() >= next_retention:
+                next_retention = time.monotonic() + self.retention_interval
+                try:
+                    self.db.enforce_retention()
+                except Exception as e:
+                    logger.error(f"Failed to enforce event retention: {e}")
+                try:
+                    self.db.index_sealed_partitions()
+                except Exception as e:
+                    logger.error(f"Failed to index sealed event partitions: {e}")
+        logger.info("Event writer stopped")
+
+    def _time_until_due(self) -> float:
+        with self._buffer_lock:
+            if self._retry_at is not None:
+                return max(0.0, self._retry_at - time.monotonic())
+            if self._oldest is None:
+                return self.flush_interval
+            return max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+
+    def _is_due(self) -> bool:
+        with self._buffer_lock:
+            if not self._buffer:
+                return False
+            if self._retry_at is not None:
+                return time.monotonic() >= self._retry_at
+            return len(self._buffer) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_interval
+
+    def flush(self) -> int:
+        """
+        Writes everything currently buffered in one transaction.
+        Returns the number of rows written.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+                oldest, self._oldest = self._oldest, None
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                expired = self.db.insert_events(batch) or 0
+            except Exception as e:
+                self._failed(batch, oldest, e)
+                return 0
+            elapsed = time.perf_counter() - start
+            self._failures = 0
+            self._retry_at = None
+
+            self.rows_written += len(batch) - expired
+            self.rows_expired += expired
+            self.flush_count += 1
+            self.total_flush_seconds += elapsed
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            return len(batch)
+
+    def _failed(self, batch: List[Dict[str, Any]], oldest: float, error: Exception):
+        self._failures += 1
+        if self._failures > self.max_retries:
+            self.rows_failed += len(batch)
+            self._failures = 0
+            self._retry_at = None
+            logger.error(f"Dropping batch of {len(batch)} events after {self.max_retries} retries: {error}")
+            return
+        delay = min(self.max_backoff, self.retry_backoff * 2 ** (self._failures - 1))
+        self.retries += 1
+        with self._buffer_lock:
+            self._buffer[:0] = batch
+            self._oldest = oldest
+            self._retry_at = time.monotonic() + delay
+        logger.warning(f"Failed to write batch of {len(batch)} events, retrying in {delay:.1f}s: {error}")
+
+    def stop(self):
+        """
+        Stops the writer thread and flushes whatever is still buffered,
+        retrying a failing batch until it is written or dropped.
+        """
+        self.running = False
+        self._wakeup.set()
+        if self.is_alive():
+            self.join(timeout=self.flush_interval + 5)
+        while True:
+            self.flush()
+            with self._buffer_lock:
+                if not self._buffer:
+                    break
+                wait = max(0.0, self._retry_at - time.monotonic()) if self._retry_at is not None else 0.0
+            time.sleep(wait)
+        logger.info(f"Event writer stats: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._buffer_lock:
+            buffered = len(self._buffer)
+        return {
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "rows_expired": self.rows_expired,
+            "retries": self.retries,
+            "buffered": buffered,
+            "flushes": self.flush_count,
+            "rows_per_sec": self.rows_written / self.total_flush_seconds if self.total_flush_seconds else 0.0,
+            "avg_flush_ms": 1000 * self.total_flush_seconds / self.flush_count if self.flush_count else 0.0,
+            "last_flush_ms": 1000 * self.last_flush_seconds,
+            "max_flush_ms": 1000 * self.max_flush_seconds,
+        }
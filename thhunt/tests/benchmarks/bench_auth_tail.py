@@ -0,0 +1,73 @@
+"""
+Throughput of LinuxAuthCollector on a synthetic auth log: a backlog of
+mixed sshd/sudo/login/other lines is read once from a cold checkpoint.
+Peak RSS is reported to show memory stays bounded by the chunk size, not
+the log size. Events are counted, not queued.
+
+Usage: python -m thhunt.tests.benchmarks.bench_auth_tail [size_mb] [directory]
+"""
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from thhunt.collectors.linux.auth import LinuxAuthCollector
+
+TEMPLATES = [
+    "Jan  2 03:04:05 bastion sshd[{pid}]: Failed password for invalid user {user} from 203.0.113.{n} port {port} ssh2\n",
+    "Jan  2 03:04:05 bastion sshd[{pid}]: Accepted publickey for {user} from 10.0.{n}.5 port {port} ssh2: RSA SHA256:Zm9vYmFy\n",
+    "Jan  2 03:04:05 bastion sshd[{pid}]: Connection closed by 203.0.113.{n} port {port} [preauth]\n",
+    "Jan  2 03:04:05 bastion sshd[{pid}]: pam_unix(sshd:session): session closed for user {user}\n",
+    "Jan  2 03:04:05 bastion sudo:    {user} : TTY=pts/0 ; PWD=/home/{user} ; USER=root ; COMMAND=/usr/bin/systemctl restart nginx\n",
+    "Jan  2 03:04:05 bastion CRON[{pid}]: pam_unix(cron:session): session opened for user root(uid=0) by (uid=0)\n",
+    "Jan  2 03:04:05 bastion systemd-logind[{pid}]: New session {port} of user {user}.\n",
+    "Jan  2 03:04:05 bastion login[{pid}]: FAILED LOGIN (1) on '/dev/tty1' FOR '{user}', Authentication failure\n",
+]
+
+class CountingQueue:
+    def __init__(self):
+        self.count = 0
+
+    def put(self, event):
+        self.count += 1
+
+def write_log(path, size):
+    rng = random.Random(0)
+    block = "".join(
+        rng.choice(TEMPLATES).format(pid=rng.randint(100, 99999), user=f"user{rng.randint(0, 500)}",
+                                     n=rng.randint(1, 254), port=rng.randint(1024, 65535))
+        for _ in range(20000)
+    ).encode()
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(block)
+            written += len(block)
+    return written, block.count(b"\n") * (written // len(block))
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    directory = tempfile.mkdtemp(dir=sys.argv[2] if len(sys.argv) > 2 else None)
+    try:
+        log = os.path.join(directory, "auth.log")
+        size, lines = write_log(log, size_mb << 20)
+        events = CountingQueue()
+        collector = LinuxAuthCollector(events, paths=[log], checkpoint_path=os.path.join(directory, "checkpoint.json"))
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        collector.collect()
+        elapsed = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        collector.stop()
+
+        print(f"log: {size / 2**20:,.0f} MB, {lines:,} lines, {events.count:,} auth events")
+        print(f"throughput: {size / 2**20 / elapsed:,.1f} MB/s, {lines / elapsed:,.0f} lines/s ({elapsed:.1f}s)")
+        print(f"peak RSS: {rss_after / 1024:,.0f} MB (+{(rss_after - rss_before) / 1024:,.1f} MB while tailing)")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-event storage cost on the detection path: one connection per call
+(the original behaviour) versus the shared ConnectionManager.
+
+Usage: python -m thhunt.tests.benchmarks.bench_connections [events]
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from thhunt.storage.db import DatabaseManager
+from thhunt.baselines.process_baseline import ProcessBaseline
+
+def _event(i):
+    return {
+        "category": "process",
+        "type": "process_snapshot",
+        "timestamp": time.time(),
+        "host_id": "bench",
+        "process": {"pid": i, "path": f"/usr/bin/proc{i % 50}", "name": f"proc{i % 50}"}
+    }
+
+def per_call_connections(db_path, events):
+    """
+    Replays insert, baseline is_new/update and alert insert, opening and
+    closing a fresh connection for every statement as the code used to.
+    """
+    def connect():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL;')
+        return conn
+
+    start = time.perf_counter()
+    for event in events:
+        path = event["process"]["path"]
+
+        conn = connect()
+        conn.execute('INSERT INTO events (timestamp, host_id, category, event_type, raw_data) VALUES (?, ?, ?, ?, ?)',
+                     (event["timestamp"], event["host_id"], event["category"], event["type"], json.dumps(event)))
+        conn.commit()
+        conn.close()
+
+        conn = connect()
+        conn.execute('SELECT 1 FROM baseline_process WHERE path = ?', (path,)).fetchone()
+        conn.close()
+
+        conn = connect()
+        row = conn.execute('SELECT count FROM baseline_process WHERE path = ?', (path,)).fetchone()
+        if row:
+            conn.execute('UPDATE baseline_process SET last_seen = ?, count = count + 1 WHERE path = ?', (time.time(), path))
+        else:
+            conn.execute('INSERT INTO baseline_process (path, first_seen, last_seen, count) VALUES (?, ?, ?, 1)', (path, time.time(), time.time()))
+        conn.commit()
+        conn.close()
+
+        conn = connect()
+        conn.execute('INSERT INTO alerts (timestamp, severity, rule_name, description, related_events, is_enriched) VALUES (?, ?, ?, ?, ?, ?)',
+                     (time.time(), "3", "Anomaly", "bench", "[]", False))
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+def managed_connections(db, baseline, events):
+    start = time.perf_counter()
+    for event in events:
+        path = event["process"]["path"]
+        db.insert_event(event)
+        baseline.is_new(path)
+        baseline.update(path)
+        db.insert_alert({"timestamp": time.time(), "severity": "3", "rule_name": "Anomaly", "description": "bench", "related_events": "[]", "is_enriched": False})
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    events = [_event(i) for i in range(count)]
+    results = {}
+    for name in ("per_call", "managed"):
+        test_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(test_dir, "bench.db")
+            db = DatabaseManager(db_path)
+            baseline = ProcessBaseline(db_path)
+            if name == "per_call":
+                results[name] = per_call_connections(db_path, events)
+            else:
+                results[name] = managed_connections(db, baseline, events)
+            db.connections.close()
+        finally:
+            shutil.rmtree(test_dir)
+
+    for name, elapsed in results.items():
+        print(f"{name:>9}: {count} events in {elapsed:.3f}s ({1e6 * elapsed / count:.1f} us/event)")
+    print(f"  speedup: {results['per_call'] / results['managed']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Detection throughput of ShardedDetectionPool by worker count, in thread
+and process mode. Each run gets a fresh database and a rule set of R
+substring rules over process paths (CPU-bound evaluation); the events are
+process starts of a few hundred distinct binaries across several hosts,
+sharded by entity. Time is measured from the first submit until every
+shard has drained, so worker start-up is excluded.
+
+Usage: python -m thhunt.tests.benchmarks.bench_detection_workers [events] [rules] [max_workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from thhunt.detection.pipeline import DetectionPipeline
+from thhunt.detection.workers import ShardedDetectionPool
+
+BATCH = 500
+
+def write_rules(rules_path, count):
+    os.makedirs(rules_path)
+    for n in range(count):
+        with open(os.path.join(rules_path, f"rule{n}.yml"), "w") as f:
+            f.write(f"name: Rule {n}\nseverity: 5\nconditions:\n  category: process\n"
+                    f"  process_path_contains: \"/suspicious{n}/\"\n")
+
+def make_events(count):
+    return [{
+        "category": "process", "host_id": f"host{n % 8}", "event_type": "process_snapshot",
+        "process": {"pid": n, "name": f"tool{n % 300}", "path": f"/usr/bin/tool{n % 300}"},
+    } for n in range(count)]
+
+def run(events, rules_path, workers, mode):
+    test_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(test_dir, "bench.db")
+        DetectionPipeline(db_path, rules_path)  # schema
+        pool = ShardedDetectionPool(partial(DetectionPipeline, db_path, rules_path),
+                                    workers=workers, mode=mode, key="entity", queue_size=1024)
+        pool.start()
+        # Warm-up batch so that spawned workers have finished importing
+        pool.submit(events[:workers * 8])
+        while any(shard.pending() for shard in pool.shards):
+            time.sleep(0.01)
+
+        start = time.perf_counter()
+        for i in range(0, len(events), BATCH):
+            pool.submit(events[i:i + BATCH])
+        while any(shard.pending() for shard in pool.shards):
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        pool.stop()
+        return len(events) / elapsed
+    finally:
+        shutil.rmtree(test_dir)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rules = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    rules_dir = tempfile.mkdtemp()
+    try:
+        rules_path = os.path.join(rules_dir, "rules")
+        write_rules(rules_path, rules)
+        events = make_events(count)
+        print(f"{count} events, {rules} rules, {os.cpu_count()} CPUs")
+        for mode in ("thread", "process"):
+            baseline = None
+            workers = 1
+            while workers <= max_workers:
+                rate = run(events, rules_path, workers, mode)
+                baseline = baseline or rate
+                print(f"  {mode:<7} workers={workers}: {rate:10.0f} events/s  ({rate / baseline:.2f}x)")
+                workers *= 2
+    finally:
+        shutil.rmtree(rules_dir)
+
+if __name__ == "__main__":
+    main()
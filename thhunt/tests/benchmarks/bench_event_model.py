@@ -0,0 +1,74 @@
+"""
+Memory per retained event and normalize throughput of the slotted event
+records versus the previous nested-dict normalizer (reproduced below as
+dict_normalize_process), on process snapshots of a few hundred distinct
+binaries whose strings arrive as fresh objects, as they do from /proc.
+
+Usage: python -m thhunt.tests.benchmarks.bench_event_model [events]
+"""
+import gc
+import platform
+import sys
+import time
+import tracemalloc
+from thhunt.normalization.normalize_process import normalize_process_event
+
+def dict_normalize_process(raw_event):
+    normalized = {
+        "category": "process",
+        "timestamp": raw_event.get("timestamp"),
+        "host_id": raw_event.get("host_id", "unknown"),
+        "os": platform.system().lower(),
+        "event_type": raw_event.get("type"),
+    }
+    payload = raw_event.get("payload", {})
+    normalized["process"] = {
+        "pid": payload.get("pid"),
+        "ppid": payload.get("ppid"),
+        "name": payload.get("name"),
+        "path": payload.get("path"),
+        "cmdline": payload.get("cmdline"),
+        "user": payload.get("user"),
+        "hash": payload.get("hash"),
+        "start_time": payload.get("start_time"),
+    }
+    return normalized
+
+def make_raw(count):
+    # str() concatenation so that equal strings are distinct objects
+    return [{
+        "timestamp": 1000.0 + i, "collector": "LinuxProcessCollector", "type": "process_snapshot", "host_id": "bench",
+        "payload": {"pid": i, "ppid": 1, "name": "tool" + str(i % 300), "path": "/usr/bin/tool" + str(i % 300),
+                    "cmdline": "tool --flag", "user": "1" + str(i % 3), "start_time": 1000.0},
+    } for i in range(count)]
+
+def measure_memory(normalize, raw):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [normalize(event) for event in raw]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(raw)
+
+def measure_rate(normalize, raw, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for event in raw:
+            normalize(event)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(raw) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, normalize in (("dict", dict_normalize_process), ("records", normalize_process_event)):
+        # Fresh raw events per run so interning starts cold
+        memory = measure_memory(normalize, make_raw(count))
+        rate = measure_rate(normalize, make_raw(count))
+        print(f"{name:<8} {memory:7.0f} bytes/event retained  {rate:10.0f} events/s normalized")
+
+if __name__ == "__main__":
+    main()
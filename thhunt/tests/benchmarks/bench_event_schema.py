@@ -0,0 +1,101 @@
+"""
+Insert throughput and hunt latency for the typed event schema versus the
+original raw-JSON-only events table, for the main events table (typed
+columns and every hunt index maintained on insert) and for daily
+partitions (base columns only while current; typed columns and hunt
+indexes filled in bulk once the period is sealed).
+
+Usage: python -m thhunt.tests.benchmarks.bench_event_schema [events]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from thhunt.config.schema import DatabaseConfig
+from thhunt.storage.db import DatabaseManager
+
+BATCH = 2000
+
+def _events(count):
+    events = []
+    for i in range(count):
+        if i % 3:
+            events.append({"category": "process", "type": "process_snapshot", "timestamp": 1000.0 + i, "host_id": "bench",
+                           "process": {"pid": i, "ppid": 1, "name": f"p{i % 300}", "path": f"/usr/bin/p{i % 300}", "cmdline": "p --flag", "user": "0"}})
+        else:
+            events.append({"category": "network", "type": "network_connection", "timestamp": 1000.0 + i, "host_id": "bench",
+                           "network": {"remote_ip": f"10.{i % 7}.{i % 251}.{i % 13}", "remote_port": 443, "pid": i, "state": "01"}})
+    return events
+
+def legacy_insert(conn, events):
+    conn.execute('CREATE TABLE legacy_events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, host_id TEXT, category TEXT, event_type TEXT, raw_data JSON)')
+    start = time.perf_counter()
+    for i in range(0, len(events), BATCH):
+        conn.executemany('INSERT INTO legacy_events (timestamp, host_id, category, event_type, raw_data) VALUES (?, ?, ?, ?, ?)',
+                         [(e['timestamp'], e['host_id'], e['category'], e['type'], json.dumps(e)) for e in events[i:i + BATCH]])
+        conn.commit()
+    return time.perf_counter() - start
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def insert_all(db, events):
+    start = time.perf_counter()
+    for i in range(0, len(events), BATCH):
+        db.insert_events(events[i:i + BATCH])
+    return time.perf_counter() - start
+
+def hunts(db):
+    return (timed(lambda: db.query_events(remote_ip="10.3.7.2", start=1000.0)),
+            timed(lambda: db.query_events(process_path_prefix="/usr/bin/p29")))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    events = _events(count)
+    test_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(test_dir, "bench.db"))
+
+        typed_seconds = insert_all(db, events)
+
+        with db.connections.write() as conn:
+            legacy_seconds = legacy_insert(conn, events)
+
+        print(f"insert  legacy: {count / legacy_seconds:,.0f} rows/s")
+        print(f"insert   typed: {count / typed_seconds:,.0f} rows/s")
+
+        path = os.path.join(test_dir, "partitioned.db")
+        partitioned = DatabaseManager(path, DatabaseConfig(path=path, partition_period_hours=24))
+        partitioned_seconds = insert_all(partitioned, events)
+        hot, prefix_hot = hunts(partitioned)
+        start = time.perf_counter()
+        partitioned.index_sealed_partitions(now=events[-1]["timestamp"] + 86400)
+        seal_seconds = time.perf_counter() - start
+        print(f"insert partitioned: {count / partitioned_seconds:,.0f} rows/s, "
+              f"sealing {len(partitioned.partitions.list_partitions())} partitions: {seal_seconds:.2f}s")
+
+        with db.connections.read() as conn:
+            scan = timed(lambda: conn.execute(
+                "SELECT COUNT(*) FROM legacy_events WHERE json_extract(raw_data, '$.network.remote_ip') = ? AND timestamp >= ?",
+                ("10.3.7.2", 1000.0)).fetchone(), repeat=3)
+            prefix_scan = timed(lambda: conn.execute(
+                "SELECT COUNT(*) FROM legacy_events WHERE json_extract(raw_data, '$.process.path') LIKE '/usr/bin/p29%'").fetchone(), repeat=3)
+        indexed, prefix_indexed = hunts(db)
+        sealed, prefix_sealed = hunts(partitioned)
+
+        print(f"remote_ip hunt   json scan: {1000 * scan:8.2f} ms   indexed: {1000 * indexed:6.2f} ms   "
+              f"partitions hot: {1000 * hot:8.2f} ms   sealed: {1000 * sealed:6.2f} ms")
+        print(f"path prefix hunt json scan: {1000 * prefix_scan:8.2f} ms   indexed: {1000 * prefix_indexed:6.2f} ms   "
+              f"partitions hot: {1000 * prefix_hot:8.2f} ms   sealed: {1000 * prefix_sealed:6.2f} ms")
+        db.connections.close()
+        partitioned.connections.close()
+    finally:
+        shutil.rmtree(test_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Socket table read cost of the /proc/net parser versus the netlink
+sock_diag backend, with N established loopback connections plus the
+listener open. Only the table read is timed, not pid attribution.
+
+Usage: python -m thhunt.tests.benchmarks.bench_network_backends [connections] [reads]
+"""
+import queue
+import resource
+import socket
+import sys
+import time
+from thhunt.collectors.linux.network import LinuxNetworkCollector
+
+def open_connections(count):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1024)
+    sockets = [listener]
+    for _ in range(count):
+        client = socket.create_connection(listener.getsockname())
+        server, _ = listener.accept()
+        sockets.extend((client, server))
+    return sockets
+
+def time_reads(collector, reads):
+    start = time.perf_counter()
+    for _ in range(reads):
+        rows = collector._read_sockets()
+    return (time.perf_counter() - start) / reads, len(rows)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, 2 * count + 256)), hard))
+
+    sockets = open_connections(count)
+    try:
+        for states in ([], ["LISTEN"]):
+            proc = LinuxNetworkCollector(queue.Queue(), states=states)
+            netlink = LinuxNetworkCollector(queue.Queue(), backend="netlink", states=states)
+            if netlink.sock_diag is None:
+                print("NETLINK_SOCK_DIAG not available")
+                return
+            proc_time, proc_rows = time_reads(proc, reads)
+            netlink_time, netlink_rows = time_reads(netlink, reads)
+            label = ",".join(states) or "all states"
+            print(f"{label}:")
+            print(f"  /proc/net: {1000 * proc_time:8.2f} ms per read ({proc_rows} sockets)")
+            print(f"  sock_diag: {1000 * netlink_time:8.2f} ms per read ({netlink_rows} sockets, {proc_time / netlink_time:.1f}x faster)")
+    finally:
+        for s in sockets:
+            s.close()
+
+if __name__ == "__main__":
+    main()
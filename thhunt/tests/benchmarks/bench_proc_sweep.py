@@ -0,0 +1,62 @@
+"""
+Sweep cost of LinuxProcessCollector per 1,000 processes against a
+synthetic /proc tree: cold (every attribute read) versus warm (static
+attributes served from the (pid, starttime) cache).
+
+Usage: python -m thhunt.tests.benchmarks.bench_proc_sweep [processes] [sweeps]
+"""
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+from thhunt.collectors.linux.process import LinuxProcessCollector
+
+def build_fake_proc(root, count):
+    with open(os.path.join(root, "stat"), "w") as f:
+        f.write("cpu 0 0 0 0\nbtime 1700000000\n")
+    status_padding = "".join(f"Field{i}:\t{i}\n" for i in range(50))  # real status files are ~55 lines
+    for pid in range(1, count + 1):
+        pid_path = os.path.join(root, str(pid))
+        os.makedirs(pid_path)
+        fields = ["S", "1"] + ["0"] * 17 + [str(1000 + pid), "0", "0"] + ["0"] * 30
+        with open(os.path.join(pid_path, "stat"), "w") as f:
+            f.write(f"{pid} (proc{pid}) {' '.join(fields)}\n")
+        with open(os.path.join(pid_path, "status"), "w") as f:
+            f.write(f"Name:\tproc{pid}\nUmask:\t0022\nState:\tS\nPPid:\t1\nUid:\t0\t0\t0\t0\n{status_padding}")
+        with open(os.path.join(pid_path, "cmdline"), "w") as f:
+            f.write(f"/usr/bin/proc{pid}\0--serve\0--port\0{pid}\0")
+        os.symlink(f"/usr/bin/proc{pid}", os.path.join(pid_path, "exe"))
+    # Non-pid entries the sweep has to skip
+    for name in ("self", "net", "sys", "meminfo", "cpuinfo"):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sweeps = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    root = tempfile.mkdtemp()
+    try:
+        build_fake_proc(root, count)
+        collector = LinuxProcessCollector(queue.Queue(), mode="delta", proc_root=root)
+
+        start = time.perf_counter()
+        for _ in range(sweeps):
+            collector._table = {}
+            collector._scan()
+        cold = (time.perf_counter() - start) / sweeps
+
+        collector._table = collector._scan()
+        start = time.perf_counter()
+        for _ in range(sweeps):
+            collector._table = collector._scan()
+        warm = (time.perf_counter() - start) / sweeps
+
+        scale = 1000 / count
+        print(f"cold sweep: {1000 * cold * scale:7.2f} ms per 1,000 processes")
+        print(f"warm sweep: {1000 * warm * scale:7.2f} ms per 1,000 processes ({cold / warm:.1f}x faster)")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+RuleEngine.evaluate throughput with the compiled rule index versus the
+previous loop over every rule (reproduced below as legacy_evaluate), for
+growing numbers of synthetic rules: a mix of process_name, path substring
+and combined rules, plus some network rules. Index time should stay
+roughly flat as rules are added; the legacy loop grows linearly.
+
+Usage: python -m thhunt.tests.benchmarks.bench_rule_engine [max_rules] [events]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from thhunt.rules.engine import RuleEngine
+
+def legacy_match(rule, event):
+    conditions = rule.get("conditions", {})
+    if "category" in conditions and event.get("category") != conditions["category"]:
+        return False
+
+    def get_value(obj, path):
+        for part in path.split('.'):
+            if isinstance(obj, dict):
+                obj = obj.get(part)
+            else:
+                return None
+        return obj
+
+    if conditions.get("category") == "process":
+        proc = event.get("process", {})
+        if "process_name" in conditions and proc.get("name") != conditions["process_name"]:
+            return False
+        if "process_path_contains" in conditions:
+            path = proc.get("path", "")
+            if not path or conditions["process_path_contains"].lower() not in path.lower():
+                return False
+    return True
+
+def legacy_evaluate(rules, event):
+    return [rule for rule in rules if legacy_match(rule, event)]
+
+def write_rules(rules_path, count, rng):
+    os.makedirs(rules_path)
+    for n in range(count):
+        kind = n % 10
+        if kind < 4:
+            conditions = f"  category: process\n  process_name: \"tool{rng.randrange(count)}\"\n"
+        elif kind < 8:
+            conditions = f"  category: process\n  process_path_contains: \"/stage{rng.randrange(count)}/\"\n"
+        elif kind < 9:
+            conditions = (f"  category: process\n  process_name: \"tool{rng.randrange(count)}\"\n"
+                          f"  process_path_contains: \"drop{rng.randrange(count)}\"\n")
+        else:
+            conditions = "  category: network\n"
+        with open(os.path.join(rules_path, f"rule{n}.yml"), "w") as f:
+            f.write(f"name: Rule {n}\nseverity: 5\nconditions:\n{conditions}")
+
+def make_events(count, rng):
+    return [{"category": "process", "process": {
+        "name": f"tool{rng.randrange(5000)}",
+        "path": f"/opt/stage{rng.randrange(10000)}/drop{rng.randrange(5000)}/usr/lib/x86_64/tool",
+    }} for _ in range(count)]
+
+def rate(fn, events):
+    start = time.perf_counter()
+    for event in events:
+        fn(event)
+    return len(events) / (time.perf_counter() - start)
+
+def main():
+    max_rules = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(1)
+    events = make_events(count, rng)
+
+    rule_counts = [n for n in (100, 500, 1000, 2000, 5000, 10000) if n < max_rules] + [max_rules]
+    for rules in rule_counts:
+        test_dir = tempfile.mkdtemp()
+        try:
+            rules_path = os.path.join(test_dir, "rules")
+            write_rules(rules_path, rules, rng)
+            start = time.perf_counter()
+            engine = RuleEngine(rules_path)
+            load = time.perf_counter() - start
+
+            matches = sum(len(engine.evaluate(e)) for e in events)
+            assert matches == sum(len(legacy_evaluate(engine.rules, e)) for e in events)
+            indexed = rate(engine.evaluate, events)
+            legacy = rate(lambda e: legacy_evaluate(engine.rules, e), events[:max(50, count * 100 // rules)])
+            print(f"{rules:6d} rules: indexed {indexed:9.0f} events/s, legacy {legacy:9.0f} events/s "
+                  f"({indexed / legacy:6.1f}x), load+compile {load:.2f}s, {matches} matches")
+        finally:
+            shutil.rmtree(test_dir)
+
+if __name__ == "__main__":
+    main()
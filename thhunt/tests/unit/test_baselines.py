@@ -1,37 +1,126 @@
-import unittest
-import os
-import tempfile
-import shutil
-from thhunt.baselines.process_baseline import ProcessBaseline
-
-class TestProcessBaseline(unittest.TestCase):
-    def setUp(self):
-        self.test_dir = tempfile.mkdtemp()
-        self.db_path = os.path.join(self.test_dir, "test.db")
-        self.baseline = ProcessBaseline(self.db_path)
-
-    def tearDown(self):
-        shutil.rmtree(self.test_dir)
-
-    def test_new_process(self):
-        path = "/bin/new_proc"
-        self.assertTrue(self.baseline.is_new(path))
-        
-        self.baseline.update(path)
-        self.assertFalse(self.baseline.is_new(path))
-
-    def test_update_count(self):
-        path = "/bin/proc"
-        self.baseline.update(path)
-        self.baseline.update(path)
-        
-        conn = self.baseline._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT count FROM baseline_process WHERE path = ?", (path,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        self.assertEqual(row[0], 2)
-
-if __name__ == '__main__':
-    unittest.main()
+import unittest
+import os
+import tempfile
+import shutil
+import time
+from thhunt.baselines.network_baseline import NetworkBaseline
+from thhunt.baselines.process_baseline import ProcessBaseline
+
+class TestProcessBaseline(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        self.baseline = ProcessBaseline(self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_new_process(self):
+        path = "/bin/new_proc"
+        self.assertTrue(self.baseline.is_new(path))
+        
+        self.baseline.update(path)
+        self.assertFalse(self.baseline.is_new(path))
+
+    def test_update_count(self):
+        path = "/bin/proc"
+        self.baseline.update(path)
+        self.baseline.update(path)
+        self.baseline.flush()
+        
+        with self.baseline.connections.read() as conn:
+            row = conn.execute("SELECT count FROM baseline_process WHERE path = ?", (path,)).fetchone()
+        
+        self.assertEqual(row[0], 2)
+
+    def _row(self, path):
+        with self.baseline.connections.read() as conn:
+            return conn.execute("SELECT first_seen, last_seen, count FROM baseline_process WHERE path = ?",
+                                (path,)).fetchone()
+
+    def test_write_behind(self):
+        self.baseline.update("/bin/a")
+        self.assertIsNone(self._row("/bin/a"))  # not written until flushed
+        self.baseline.flush()
+        first_seen, last_seen, count = self._row("/bin/a")
+        self.assertEqual(count, 1)
+
+        # A second baseline over the same table (another shard) loads it and its counts add up
+        other = ProcessBaseline(self.db_path)
+        self.assertFalse(other.is_new("/bin/a"))
+        other.update("/bin/a")
+        self.baseline.update("/bin/a")
+        other.flush()
+        self.baseline.flush()
+        self.assertEqual(self._row("/bin/a")[0], first_seen)
+        self.assertEqual(self._row("/bin/a")[2], 3)
+
+    def test_eviction(self):
+        baseline = ProcessBaseline(self.db_path, max_entries=2, flush_interval=3600)
+        for n in range(5):
+            baseline.update(f"/bin/p{n}")
+        self.assertEqual(baseline.cache.stats()["entries"], 2)
+        # Evicted before being written: still known, and counted once flushed
+        self.assertFalse(baseline.is_new("/bin/p0"))
+        baseline.update("/bin/p1")
+        baseline.flush()
+        self.assertEqual(self._row("/bin/p1")[2], 2)
+        self.assertEqual(baseline.cache.stats()["dirty"], 0)
+        # Evicted after being written: found in the table
+        for n in range(5, 8):
+            baseline.update(f"/bin/p{n}")
+        self.assertFalse(baseline.is_new("/bin/p0"))
+        self.assertTrue(baseline.is_new("/bin/never"))
+
+    def test_periodic_flush(self):
+        baseline = ProcessBaseline(self.db_path, flush_interval=0.05)
+        self.addCleanup(baseline.close)
+        baseline.update("/bin/now")
+        deadline = time.time() + 5
+        while self._row("/bin/now") is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._row("/bin/now")[2], 1)
+        self.assertGreaterEqual(baseline.cache.stats()["flushes"], 1)
+
+    def test_close_writes_pending_sightings(self):
+        baseline = ProcessBaseline(self.db_path, flush_interval=3600)
+        baseline.update("/bin/late")
+        baseline.close()
+        self.assertEqual(self._row("/bin/late")[2], 1)
+
+    def test_absent_keys_are_looked_up_once(self):
+        baseline = ProcessBaseline(self.db_path, flush_interval=3600)
+        for _ in range(3):
+            self.assertTrue(baseline.is_new("/bin/fresh"))
+        baseline.update("/bin/fresh")
+        self.assertFalse(baseline.is_new("/bin/fresh"))
+        self.assertEqual(baseline.cache.stats()["misses"], 1)
+        self.assertEqual(baseline.cache.stats()["absent"], 0)
+        # Flushing forgets absent keys, which other shards may have written since
+        self.assertTrue(baseline.is_new("/bin/other"))
+        baseline.flush()
+        self.assertTrue(baseline.is_new("/bin/other"))
+        self.assertEqual(baseline.cache.stats()["misses"], 3)
+
+class TestNetworkBaseline(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.baseline = NetworkBaseline(os.path.join(self.test_dir, "test.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_new_ip(self):
+        self.assertTrue(self.baseline.is_new("10.0.0.1"))
+        self.baseline.update("10.0.0.1")
+        self.baseline.update("127.0.0.1")  # loopback is never baselined, nor new
+        self.assertFalse(self.baseline.is_new("10.0.0.1"))
+        self.assertFalse(self.baseline.is_new("127.0.0.1"))
+        self.assertEqual(self.baseline.cache.stats()["misses"], 1)
+        self.baseline.flush()
+        with self.baseline.connections.read() as conn:
+            self.assertEqual(conn.execute("SELECT remote_ip, count FROM baseline_network").fetchall(),
+                             [("10.0.0.1", 1)])
+
+if __name__ == '__main__':
+    unittest.main()
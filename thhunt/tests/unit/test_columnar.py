@@ -0,0 +1,83 @@
+import unittest
+import os
+import random
+import shutil
+import tempfile
+import yaml
+from thhunt.rules.columnar import bitset, iter_rows
+from thhunt.rules.engine import RuleEngine
+from thhunt.rules.index import RuleIndex
+
+NAMES = ["nc", "NC", "bash", "curl", "sshd", 1, 1.0, True, None, ["nc"], {"x": 1}, ""]
+PATHS = ["/tmp/nc", "/TMP/x", "/usr/bin/curl", "/bin/bash", "/var/tmp/.a", 4444, None, ["/tmp/nc"]]
+PORTS = [22, 80, 443, 4444, "8080", "x", None, 1.5, True]
+IPS = ["10.1.2.3", "192.168.1.1", "8.8.8.8", "::ffff:10.0.0.1", "nope", None]
+
+RULES = [
+    {"category": "process", "process.name": "nc"},
+    {"category": "process", "process.name": ["nc", "ncat", "nc"]},
+    {"category": "process", "process.name": {"equals": "NC", "ignore_case": True}},
+    {"category": "process", "process.name": [1, True]},
+    {"category": "process", "process.path": {"contains": "tmp"}},
+    {"category": "process", "process.path": {"contains": "TMP", "ignore_case": True}, "process.name": "nc"},
+    {"category": "process", "process.path": {"startswith": "/tmp/"}},
+    {"category": "process", "process.path": {"regex": "^/(var/)?tmp"}, "not": {"process.name": "bash"}},
+    {"process.name": {"not_in": ["sshd", "bash"]}},
+    {"process.name": {"contains": "1"}},
+    {"category": "network", "network.remote_port": {"gte": 443, "lt": 5000}},
+    {"category": "network", "network.remote_ip": {"cidr": "10.0.0.0/8"}},
+    {"category": "network", "any": [{"network.remote_port": 22}, {"network.remote_ip": "8.8.8.8"}]},
+    {"category": "network", "network.remote_port": "8080"},
+    {"category": "process"},
+    {},
+    {"category": "process", "process.name": {"bogus": 1}},
+]
+
+def random_event(rng):
+    if rng.random() < 0.5:
+        return {"category": "process", "process": {"name": rng.choice(NAMES), "path": rng.choice(PATHS)}}
+    if rng.random() < 0.9:
+        return {"category": "network", "network": {"remote_port": rng.choice(PORTS), "remote_ip": rng.choice(IPS)}}
+    return {"category": rng.choice(["auth", None]), "process": {"name": rng.choice(NAMES)}}
+
+class TestColumnar(unittest.TestCase):
+    def test_bitsets(self):
+        for rows in ([], [0], [3, 9], list(range(0, 300, 7)), [5000]):
+            self.assertEqual(list(iter_rows(bitset(rows))), rows)
+
+    def test_batch_matches_per_event(self):
+        rng = random.Random(7)
+        rules = [{"name": f"r{n}", "conditions": conditions} for n, conditions in enumerate(RULES)]
+        index = RuleIndex(rules)
+        events = [random_event(rng) for _ in range(5000)]
+        expected = [index.match_ids(event) for event in events]
+        self.assertEqual(index.match_batch(events), expected)
+        self.assertTrue(all(any(rule_id in ids for ids in expected) for rule_id in range(len(RULES) - 1)))
+        self.assertEqual(index.evaluations(0), 2 * sum(1 for e in events if e["category"] == "process"))
+
+    def test_engine_batch_with_correlation(self):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        rules = [{"name": f"r{n}", "conditions": conditions} for n, conditions in enumerate(RULES)]
+        rules.insert(3, {"name": "burst", "type": "threshold", "window": 60, "threshold": 3,
+                         "conditions": {"category": "process", "process.path": {"startswith": "/tmp/"}}})
+        with open(os.path.join(test_dir, "rules.yml"), "w") as f:
+            yaml.safe_dump_all(rules, f)
+        rng = random.Random(11)
+        events = [dict(random_event(rng), timestamp=n) for n in range(1000)]
+
+        def run(columnar):
+            engine = RuleEngine(test_dir)
+            results = engine.evaluate_batch(events, columnar=columnar)
+            return [[match["rule_name"] for match in matches] for matches in results], engine.stats()
+
+        per_event, event_stats = run(False)
+        batched, batch_stats = run(True)
+        self.assertEqual(batched, per_event)
+        self.assertIn("burst", {name for names in batched for name in names})
+        strip = lambda stats: [(r["evaluations"], r["matches"]) for r in stats["rules"]]
+        self.assertEqual(strip(batch_stats), strip(event_stats))
+        self.assertEqual(batch_stats["events"], 1000)
+
+if __name__ == '__main__':
+    unittest.main()
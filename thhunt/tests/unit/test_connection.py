@@ -0,0 +1,78 @@
+import unittest
+import os
+import tempfile
+import shutil
+from thhunt.config.loader import load_config, validate_database_config
+from thhunt.config.schema import DatabaseConfig
+from thhunt.storage.connection import get_connection_manager
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        self.manager = get_connection_manager(self.db_path, DatabaseConfig(path=self.db_path, busy_timeout_ms=1234))
+        with self.manager.write() as conn:
+            conn.execute("CREATE TABLE items (name TEXT)")
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_shared_per_path(self):
+        self.assertIs(get_connection_manager(self.db_path), self.manager)
+
+    def test_pragmas_applied_once_at_open(self):
+        with self.manager.write() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_reader_sees_committed_writes(self):
+        with self.manager.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+        with self.manager.write() as conn:
+            conn.execute("INSERT INTO items VALUES ('a')")
+        with self.manager.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 1)
+
+    def test_reader_is_read_only(self):
+        with self.manager.read() as conn:
+            with self.assertRaises(Exception):
+                conn.execute("INSERT INTO items VALUES ('a')")
+
+    def test_write_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.manager.write() as conn:
+                conn.execute("INSERT INTO items VALUES ('a')")
+                raise RuntimeError("boom")
+        with self.manager.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+
+    def test_replaced_file_gets_new_manager(self):
+        os.remove(self.db_path)
+        open(self.db_path, "w").close()
+        self.assertIsNot(get_connection_manager(self.db_path), self.manager)
+
+class TestDatabaseConfigValidation(unittest.TestCase):
+    def test_pragma_values(self):
+        config = validate_database_config(DatabaseConfig(synchronous="full", temp_store=2))
+        self.assertEqual((config.synchronous, config.temp_store), ("FULL", "MEMORY"))
+        self.assertEqual(validate_database_config(DatabaseConfig(synchronous="0")).synchronous, "OFF")
+        for bad in ({"synchronous": "NORMAL; DROP TABLE events"}, {"synchronous": 7}, {"temp_store": "RAM"}):
+            with self.assertRaises(ValueError):
+                validate_database_config(DatabaseConfig(**bad))
+
+    def test_load_config_validates(self):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        path = os.path.join(test_dir, "config.yaml")
+        with open(path, "w") as f:
+            f.write("database:\n  temp_store: file\n")
+        self.assertEqual(load_config(path).database.temp_store, "FILE")
+        with open(path, "w") as f:
+            f.write("database:\n  synchronous: sometimes\n")
+        with self.assertRaises(ValueError):
+            load_config(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import os
+import shutil
+import tempfile
+import weakref
+from thhunt.normalization.registry import normalize_event
+from thhunt.rules.correlation import CorrelationEngine
+from thhunt.rules.engine import RuleEngine
+from thhunt.rules.state import TimerWheel, WindowedStateStore
+
+def auth(ts, src_ip, result="failure", host="h1"):
+    return normalize_event({"type": "auth_event", "timestamp": ts, "host_id": host,
+                            "payload": {"user": "root", "src_ip": src_ip, "result": result}})
+
+def process(ts, pid, path):
+    return normalize_event({"type": "process_start", "timestamp": ts, "host_id": "h1",
+                            "payload": {"pid": pid, "path": path, "name": os.path.basename(path)}})
+
+def connection(ts, pid, remote_ip):
+    return normalize_event({"type": "network_connection", "timestamp": ts, "host_id": "h1",
+                            "payload": {"pid": pid, "remote_ip": remote_ip, "state": "ESTABLISHED"}})
+
+BRUTE_FORCE = {"name": "SSH brute force", "severity": 7, "type": "threshold", "window": 60, "threshold": 5,
+               "group_by": ["auth.src_ip"], "conditions": {"category": "auth", "auth.result": "failure"}}
+FAN_OUT = {"name": "Fan out", "type": "distinct_count", "window": 300, "threshold": 3,
+           "group_by": ["network.pid"], "field": "network.remote_ip", "conditions": {"category": "network"}}
+TEMP_BEACON = {"name": "Temp binary phoning home", "type": "sequence", "window": 30, "steps": [
+    {"conditions": {"category": "process", "process.path": {"startswith": "/tmp/"}}, "group_by": ["process.pid"]},
+    {"conditions": {"category": "network"}, "group_by": ["network.pid"]},
+]}
+
+def fired(engine, events):
+    return [(e["timestamp"], m["rule_name"]) for e in events for m in engine.process(e)]
+
+class TestStateStore(unittest.TestCase):
+    def test_timer_wheel(self):
+        wheel = TimerWheel(resolution=1.0, slots=8)
+        wheel.advance(100)
+        wheel.schedule("a", 1, 103.5)
+        wheel.schedule("b", 2, 120)  # beyond one turn: comes back early
+        self.assertEqual(wheel.advance(102), [])
+        self.assertEqual(wheel.advance(103), [("a", 1)])
+        self.assertEqual(wheel.advance(112), [("b", 2)])
+
+    def test_expiry_and_cap(self):
+        store = WindowedStateStore(max_entries=3, slots=16)
+        for n in range(3):
+            store.put(n, "state", 10 + n)
+        store.advance(0)
+        self.assertEqual(store.get(0, 5), "state")  # 0 is now most recently used
+        store.put(3, "state", 100)
+        self.assertIsNone(store.get(1, 5))  # evicted
+        self.assertEqual(store.evicted, 1)
+        store.put(0, "renewed", 50)  # extended past its first deadline
+        store.advance(20)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.expired, 1)
+        self.assertEqual(store.get(0, 20), "renewed")
+        self.assertIsNone(store.get(3, 100))
+
+    def test_dropped_state_is_freed(self):
+        class State:
+            pass
+        store = WindowedStateStore(max_entries=10, slots=16)
+        refs = []
+        for n in range(100):
+            state = State()
+            refs.append(weakref.ref(state))
+            store.put(n, state, 1e9)
+        del state
+        store.pop(99)
+        self.assertEqual(store.evicted, 90)
+        self.assertEqual(sum(ref() is not None for ref in refs), 9)
+        self.assertTrue(all(ref() is not None for ref in refs[90:99]))
+
+class TestCorrelationRules(unittest.TestCase):
+    def test_threshold(self):
+        engine = CorrelationEngine([BRUTE_FORCE])
+        events = [auth(t, "10.0.0.1") for t in (0, 10, 20, 30)]
+        events += [auth(35, "10.0.0.2"), auth(36, "10.0.0.1", result="success"), auth(40, "10.0.0.1")]
+        events += [auth(t, "10.0.0.1") for t in (100, 110, 120, 130, 200)]  # spread over more than 60s
+        self.assertEqual(fired(engine, events), [(40, "SSH brute force")])
+
+    def test_threshold_match_details(self):
+        engine = CorrelationEngine([BRUTE_FORCE])
+        matches = [m for t in range(5) for m in engine.process(auth(1000 + t, "10.0.0.9"))]
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["severity"], 7)
+        self.assertEqual(matches[0]["correlation"]["key"], ["h1", "10.0.0.9"])
+        self.assertEqual(matches[0]["correlation"]["count"], 5)
+        self.assertEqual(matches[0]["correlation"]["first_seen"], 1000)
+        # Counting starts over after firing
+        self.assertEqual(fired(engine, [auth(1010, "10.0.0.9")]), [])
+
+    def test_distinct_count(self):
+        engine = CorrelationEngine([FAN_OUT])
+        events = [connection(0, 7, "1.1.1.1"), connection(1, 7, "1.1.1.1"), connection(2, 8, "2.2.2.2"),
+                  connection(3, 7, "2.2.2.2"), connection(400, 7, "3.3.3.3"), connection(401, 7, "4.4.4.4"),
+                  connection(402, 7, "5.5.5.5"), connection(403, None, "6.6.6.6")]
+        self.assertEqual(fired(engine, events), [(402, "Fan out")])
+
+    def test_sequence(self):
+        engine = CorrelationEngine([TEMP_BEACON])
+        events = [
+            connection(0, 42, "1.1.1.1"),           # before the first step
+            process(1, 42, "/tmp/x"),
+            connection(5, 43, "1.1.1.1"),           # other pid
+            connection(10, 42, "1.1.1.1"),          # fires
+            process(20, 50, "/tmp/y"),
+            connection(60, 50, "1.1.1.1"),          # outside the window
+        ]
+        self.assertEqual(fired(engine, events), [(10, "Temp binary phoning home")])
+        match = engine.process(process(100, 9, "/tmp/z")) + engine.process(connection(101, 9, "8.8.8.8"))
+        self.assertEqual([e["process"]["path"] for e in match[0]["related_events"]], ["/tmp/z"])
+
+    def test_invalid_rules_are_skipped(self):
+        rules = [dict(BRUTE_FORCE, window=0), dict(BRUTE_FORCE, type="burst"),
+                 dict(FAN_OUT, field=None), dict(TEMP_BEACON, steps=TEMP_BEACON["steps"][:1]),
+                 dict(BRUTE_FORCE, conditions={"auth.user": {"regex": "("}}), BRUTE_FORCE]
+        self.assertEqual(len(CorrelationEngine(rules)), 1)
+
+    def test_state_is_capped(self):
+        engine = CorrelationEngine([BRUTE_FORCE], max_entries=100)
+        for n in range(1000):
+            engine.process(auth(n / 100, f"10.0.{n // 256}.{n % 256}"))
+        self.assertEqual(len(engine.store), 100)
+        self.assertEqual(engine.store.evicted, 900)
+        engine.process(auth(500, "10.9.9.9"))
+        self.assertEqual(len(engine.store), 1)
+
+class TestEngineIntegration(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_mixed_rules(self):
+        with open(os.path.join(self.test_dir, "rules.yml"), "w") as f:
+            f.write("name: Root login failure\nconditions: {category: auth, auth.result: failure}\n---\n"
+                    "name: Brute force\ntype: threshold\nwindow: 60\nthreshold: 2\ngroup_by: [auth.src_ip]\n"
+                    "conditions: {category: auth, auth.result: failure}\n")
+        engine = RuleEngine(self.test_dir)
+        self.assertEqual([m["rule_name"] for m in engine.evaluate(auth(0, "10.0.0.1"))], ["Root login failure"])
+        self.assertEqual([m["rule_name"] for m in engine.evaluate(auth(1, "10.0.0.1"))],
+                         ["Root login failure", "Brute force"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from functools import partial
+from thhunt.detection.pipeline import DetectionPipeline
+from thhunt.detection.workers import ShardedDetectionPool, correlation_shard_key, shard_key
+
+def process_event(path, pid, host_id="h1"):
+    return {"category": "process", "host_id": host_id, "event_type": "process_start",
+            "process": {"pid": pid, "path": path}}
+
+class RecordingPipeline:
+    def __init__(self, log):
+        self.log = log
+
+    def process_batch(self, events):
+        for event in events:
+            self.log.append((threading.current_thread().name, event))
+
+class TestShardKey(unittest.TestCase):
+    def test_category_and_entity_keys(self):
+        event = process_event("/usr/bin/curl", 10)
+        self.assertEqual(shard_key(event), "h1|process")
+        self.assertEqual(shard_key(event, "entity"), "h1|process|/usr/bin/curl")
+        network = {"category": "network", "host_id": "h1", "network": {"remote_ip": "10.0.0.1"}}
+        self.assertEqual(shard_key(network, "entity"), "h1|network|10.0.0.1")
+        self.assertEqual(shard_key(network, "host"), shard_key(event, "host"))
+
+    def test_correlation_rules_coarsen_the_key(self):
+        match = {"name": "m", "conditions": {"category": "process"}}
+        threshold = {"name": "t", "type": "threshold", "window": 60, "threshold": 5,
+                     "conditions": {"category": "auth", "auth.result": "failure"}}
+        sequence = {"name": "s", "type": "sequence", "window": 60, "steps": [
+            {"conditions": {"category": "process"}, "group_by": ["process.pid"]},
+            {"conditions": {"category": "network"}, "group_by": ["network.pid"]}]}
+        self.assertEqual(correlation_shard_key("entity", [match]), "entity")
+        self.assertEqual(correlation_shard_key("entity", [match, threshold]), "category")
+        self.assertEqual(correlation_shard_key("category", [match, threshold]), "category")
+        self.assertEqual(correlation_shard_key("category", [threshold, sequence]), "host")
+        self.assertEqual(correlation_shard_key("entity", [dict(threshold, conditions={})]), "host")
+
+        with self.assertLogs("thhunt.detection.workers", "WARNING"):
+            pool = ShardedDetectionPool(RecordingPipeline, key="category", rules=[sequence])
+        self.assertEqual(pool.key, "host")
+
+class TestShardedDetectionPool(unittest.TestCase):
+    def test_entities_stay_on_one_worker_in_order(self):
+        log = []
+        pool = ShardedDetectionPool(lambda: RecordingPipeline(log), workers=4, key="entity")
+        pool.start()
+        paths = [f"/usr/bin/tool{n}" for n in range(20)]
+        for batch in range(10):
+            pool.submit([process_event(path, batch) for path in paths])
+        pool.stop()
+
+        self.assertEqual(len(log), 200)
+        workers, order = {}, {}
+        for worker, event in log:
+            path = event["process"]["path"]
+            workers.setdefault(path, set()).add(worker)
+            order.setdefault(path, []).append(event["process"]["pid"])
+        self.assertTrue(all(len(w) == 1 for w in workers.values()))
+        self.assertTrue(all(pids == list(range(10)) for pids in order.values()))
+        self.assertGreater(len(set().union(*workers.values())), 1)
+
+        stats = pool.stats()["shards"]
+        self.assertEqual(sum(s["processed"] for s in stats), 200)
+        self.assertEqual(sum(s["pending"] for s in stats), 0)
+        self.assertTrue(all(s["high_water"] <= s["submitted"] for s in stats))
+
+    def test_worker_errors_are_counted(self):
+        class FailingPipeline:
+            def process_batch(self, events):
+                raise RuntimeError("boom")
+
+        pool = ShardedDetectionPool(FailingPipeline, workers=1)
+        pool.start()
+        pool.submit([process_event("/bin/sh", 1)])
+        pool.stop()
+        self.assertEqual(pool.stats()["shards"][0]["errors"], 1)
+        self.assertEqual(pool.stats()["shards"][0]["processed"], 1)
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ShardedDetectionPool(RecordingPipeline, mode="fiber")
+
+class TestProcessMode(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        # Creates the tables up front
+        DetectionPipeline(self.db_path, os.path.join(self.test_dir, "rules"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_process_workers_run_the_pipeline(self):
+        pool = ShardedDetectionPool(partial(DetectionPipeline, self.db_path, os.path.join(self.test_dir, "rules")),
+                                    workers=2, mode="process", key="entity")
+        pool.start()
+        pool.submit([process_event(f"/opt/new{n}", n) for n in range(4)] * 2)
+        pool.stop(timeout=30)
+
+        self.assertEqual(sum(s["processed"] for s in pool.stats()["shards"]), 8)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Each path is new exactly once, however the events were spread
+            alerts = conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(alerts, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import json
+import pickle
+from thhunt.normalization.model import OS_NAME, ProcessEvent, NetworkEvent, to_plain
+from thhunt.normalization.registry import NORMALIZERS, normalize_event
+from thhunt.storage.event_schema import event_row
+
+def raw_process(path="/usr/bin/curl", **payload):
+    return {"type": "process_start", "timestamp": 1.5, "host_id": "h1",
+            "payload": dict({"pid": 10, "ppid": 1, "name": "curl", "path": path, "user": "root"}, **payload)}
+
+class TestEventModel(unittest.TestCase):
+    def test_dict_access(self):
+        event = normalize_event(raw_process())
+        self.assertIsInstance(event, ProcessEvent)
+        self.assertEqual(event["category"], "process")
+        self.assertEqual(event.get("os"), OS_NAME)
+        self.assertEqual(event.get("network", {}), {})
+        self.assertEqual(event.get("process", {}).get("name"), "curl")
+        self.assertIsNone(event["process"]["hash"])
+        self.assertIn("event_type", event)
+        with self.assertRaises(KeyError):
+            event["payload"]
+
+        event["process"]["hash"] = "abc"
+        self.assertEqual(event.process.hash, "abc")
+        with self.assertRaises(KeyError):
+            event["process"]["bogus"] = 1
+
+    def test_collector_specific_fields_are_kept(self):
+        event = normalize_event(dict(raw_process(exit_code=256), type="process_exit"))
+        self.assertEqual(event["process"]["exit_code"], 256)
+        event = normalize_event({"type": "network_connection", "payload": {"inode": "4242", "uid": 1000}})
+        self.assertEqual((event["network"]["inode"], event["network"]["uid"]), ("4242", 1000))
+        event = normalize_event({"type": "auth_event", "payload": {"user": "root", "log_path": "/var/log/auth.log"}})
+        self.assertEqual(event["auth"]["log_path"], "/var/log/auth.log")
+
+    def test_to_dict_matches_dict_schema(self):
+        event = normalize_event({"type": "network_connection", "timestamp": 2.0, "payload": {"remote_ip": "8.8.8.8"}})
+        self.assertIsInstance(event, NetworkEvent)
+        plain = event.to_dict()
+        self.assertEqual(plain, {
+            "category": "network", "timestamp": 2.0, "host_id": "unknown", "os": OS_NAME,
+            "event_type": "network_connection",
+            "network": {"local_ip": None, "local_port": None, "remote_ip": "8.8.8.8", "remote_port": None,
+                        "protocol": "tcp", "state": None, "pid": None, "process_name": None,
+                        "inode": None, "uid": None},
+        })
+        self.assertEqual(event, plain)
+        self.assertEqual(json.loads(json.dumps(event, default=to_plain)), plain)
+
+    def test_repeated_strings_are_shared(self):
+        path = "".join(["/usr/bin/", "curl"])
+        a = normalize_event(raw_process(path))
+        b = normalize_event(raw_process("".join(["/usr/bin/", "curl"])))
+        self.assertIs(a["process"]["path"], b["process"]["path"])
+
+    def test_storage_and_pickling(self):
+        event = normalize_event(raw_process())
+        row = event_row(event)
+        self.assertEqual(json.loads(row[4]), event.to_dict())
+        self.assertIn("/usr/bin/curl", row)
+        self.assertEqual(pickle.loads(pickle.dumps(event)), event)
+
+    def test_unknown_types_pass_through(self):
+        raw = {"type": "custom", "payload": {}}
+        self.assertIs(normalize_event(raw), raw)
+        self.assertEqual(set(NORMALIZERS), {"process_snapshot", "process_start", "process_exit", "network_connection",
+                                            "file_change", "persistence_change", "auth_event"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import queue
+import threading
+import time
+from thhunt.collectors.base import CollectorBase, EventBatch
+from thhunt.core.event_queue import BoundedEventQueue, event_category
+
+def make_event(event_type, collector="LinuxProcessCollector", n=0):
+    return {"timestamp": 0.0, "collector": collector, "type": event_type, "payload": {"n": n}}
+
+def make_batch(event_type, size, collector="LinuxNetworkCollector"):
+    return EventBatch(0.0, collector, event_type, "h1", tuple({"n": n} for n in range(size)))
+
+class SweepCollector(CollectorBase):
+    def collect(self):
+        self.publish_batch("network_connection", [{"n": 1}, {"n": 2}])
+        self.publish_batch("network_connection", [])
+
+def drain(q):
+    events = []
+    while True:
+        try:
+            events.append(q.get_nowait())
+        except queue.Empty:
+            return events
+
+class TestBoundedEventQueue(unittest.TestCase):
+    def test_fifo_across_priorities(self):
+        q = BoundedEventQueue(max_size=10)
+        q.put(make_event("process_start", n=1))
+        q.put(make_event("auth_event", "LinuxAuthCollector", n=2))
+        q.put(make_event("network_connection", "LinuxNetworkCollector", n=3))
+        self.assertEqual([e["payload"]["n"] for e in drain(q)], [1, 2, 3])
+        with self.assertRaises(queue.Empty):
+            q.get(timeout=0.01)
+
+    def test_drop_oldest_evicts_low_priority_only(self):
+        q = BoundedEventQueue(max_size=3, policy="drop_oldest")
+        q.put(make_event("auth_event", "LinuxAuthCollector", n=0))
+        for n in range(1, 5):
+            q.put(make_event("process_snapshot", n=n))
+        # Critical events still get in, pushing out process events
+        q.put(make_event("persistence_change", "LinuxPersistenceCollector", n=5))
+
+        self.assertEqual([e["payload"]["n"] for e in drain(q)], [0, 4, 5])
+        stats = q.stats()
+        self.assertEqual(stats["dropped"], 3)
+        self.assertEqual(stats["high_water"], 3)
+        self.assertEqual(stats["by_category"]["process"], {"enqueued": 4, "dropped": 3})
+        self.assertEqual(stats["by_category"]["auth"], {"enqueued": 1, "dropped": 0})
+        self.assertEqual(stats["by_collector"]["LinuxPersistenceCollector"], {"enqueued": 1, "dropped": 0})
+
+    def test_critical_events_wait_instead_of_dropping(self):
+        q = BoundedEventQueue(max_size=2, policy="drop_oldest")
+        q.put(make_event("auth_event", n=0))
+        q.put(make_event("auth_event", n=1))
+        # Nothing droppable: a low-priority event is discarded...
+        q.put(make_event("process_start", n=2))
+        self.assertEqual(q.stats()["dropped"], 1)
+        # ...and a critical one waits for space
+        with self.assertRaises(queue.Full):
+            q.put(make_event("auth_event", n=3), timeout=0.05)
+
+        threading.Timer(0.05, q.get).start()
+        q.put(make_event("auth_event", n=3), timeout=2)
+        self.assertEqual([e["payload"]["n"] for e in drain(q)], [1, 3])
+
+    def test_block_policy_waits_for_consumer(self):
+        q = BoundedEventQueue(max_size=1, policy="block")
+        q.put(make_event("process_start", n=0))
+        with self.assertRaises(queue.Full):
+            q.put(make_event("process_start", n=1), block=False)
+
+        threading.Timer(0.05, q.get).start()
+        start = time.monotonic()
+        q.put(make_event("process_start", n=1))
+        self.assertGreater(time.monotonic() - start, 0.02)
+        self.assertEqual(q.stats()["dropped"], 0)
+        self.assertEqual(q.get_nowait()["payload"]["n"], 1)
+
+    def test_sample_policy_thins_snapshots_under_pressure(self):
+        q = BoundedEventQueue(max_size=100, policy="sample", sample_every=10, sample_threshold=0.5)
+        for n in range(50):
+            q.put(make_event("process_snapshot", n=n))
+        # Past the threshold 1 in 10 snapshots is kept, other types are not sampled
+        for n in range(50, 150):
+            q.put(make_event("process_snapshot", n=n))
+        q.put(make_event("network_connection", "LinuxNetworkCollector"))
+        q.put(make_event("auth_event", "LinuxAuthCollector"))
+        q.put(make_event("process_start", "LinuxProcEventCollector"))
+        q.put(make_event("process_exit", "LinuxProcEventCollector"))
+
+        stats = q.stats()
+        self.assertEqual(stats["depth"], 64)
+        self.assertEqual(stats["by_category"]["process"], {"enqueued": 62, "dropped": 90})
+        self.assertEqual(stats["by_category"]["network"]["dropped"], 0)
+
+    def test_sample_policy_full_queue_drops_new_low_priority(self):
+        q = BoundedEventQueue(max_size=2, policy="sample", sample_threshold=1.0)
+        q.put(make_event("network_connection", n=0))
+        q.put(make_event("file_change", n=1))
+        q.put(make_event("network_connection", n=2))
+        self.assertEqual([e["payload"]["n"] for e in drain(q)], [0, 1])
+        self.assertEqual(q.stats()["by_category"]["network"]["dropped"], 1)
+
+    def test_join_accounts_for_evicted_events(self):
+        q = BoundedEventQueue(max_size=1, policy="drop_oldest")
+        q.put(make_event("process_start"))
+        q.put(make_event("process_start"))
+        q.get_nowait()
+        q.task_done()
+        done = threading.Event()
+        threading.Thread(target=lambda: (q.join(), done.set()), daemon=True).start()
+        self.assertTrue(done.wait(1))
+
+    def test_batches_are_counted_in_events(self):
+        q = BoundedEventQueue(max_size=10, policy="drop_oldest")
+        q.put(make_batch("network_connection", 6))
+        q.put(make_batch("auth_event", 3, "LinuxAuthCollector"))
+        self.assertEqual(q.qsize(), 9)
+        # No room for 4 more: the whole oldest low-priority batch goes
+        q.put(make_batch("process_snapshot", 4, "LinuxProcessCollector"))
+        stats = q.stats()
+        self.assertEqual((stats["depth"], stats["high_water"], stats["dropped"]), (7, 9, 6))
+        self.assertEqual(stats["by_category"]["network"], {"enqueued": 6, "dropped": 6})
+        self.assertEqual([item.type for item in drain(q)], ["auth_event", "process_snapshot"])
+
+        # A batch bigger than the queue still gets into an empty one
+        q.put(make_batch("network_connection", 25))
+        self.assertEqual(q.qsize(), 25)
+
+    def test_publish_batch(self):
+        q = BoundedEventQueue()
+        collector = SweepCollector(q)
+        collector.host_id = "h1"
+        collector.collect()
+        self.assertEqual(q.qsize(), 2)
+        (batch,) = drain(q)
+        events = list(batch.events())
+        self.assertEqual([e["payload"]["n"] for e in events], [1, 2])
+        self.assertEqual({(e["timestamp"], e["host_id"], e["collector"], e["type"]) for e in events},
+                         {(batch.timestamp, "h1", "SweepCollector", "network_connection")})
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            BoundedEventQueue(policy="random")
+
+    def test_event_category(self):
+        self.assertEqual(event_category("process_exit"), "process")
+        self.assertEqual(event_category("network_connection"), "network")
+        self.assertEqual(event_category("persistence_change"), "persistence")
+        self.assertEqual(event_category(None), "unknown")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import json
+import sqlite3
+import tempfile
+import shutil
+from thhunt.storage.db import DatabaseManager, SCHEMA_VERSION
+
+def _process_event(pid, path, timestamp=1000.0):
+    return {"category": "process", "type": "process_snapshot", "timestamp": timestamp, "host_id": "h1",
+            "process": {"pid": pid, "ppid": 1, "name": os.path.basename(path), "path": path, "user": "0"}}
+
+def _network_event(remote_ip, timestamp=1000.0):
+    return {"category": "network", "type": "network_connection", "timestamp": timestamp, "host_id": "h1",
+            "network": {"remote_ip": remote_ip, "remote_port": 443, "pid": 42}}
+
+class TestEventSchema(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_fresh_database_is_current(self):
+        db = DatabaseManager(self.db_path)
+        with db.connections.read() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+    def test_insert_populates_typed_columns(self):
+        db = DatabaseManager(self.db_path)
+        db.insert_events([_process_event(10, "/tmp/x"), _network_event("8.8.8.8")])
+        with db.connections.read() as conn:
+            rows = conn.execute("SELECT category, pid, ppid, process_path, process_name, remote_ip, remote_port, user FROM events ORDER BY id").fetchall()
+        self.assertEqual(rows[0], ("process", 10, 1, "/tmp/x", "x", None, None, "0"))
+        self.assertEqual(rows[1], ("network", 42, None, None, None, "8.8.8.8", 443, None))
+
+    def test_query_events(self):
+        db = DatabaseManager(self.db_path)
+        db.insert_events([
+            _process_event(1, "/tmp/a", timestamp=100.0),
+            _process_event(2, "/tmpfoo/b", timestamp=200.0),
+            _process_event(3, "/usr/bin/c", timestamp=300.0),
+            _network_event("1.2.3.4", timestamp=150.0),
+            _network_event("1.2.3.4", timestamp=5000.0),
+        ])
+        self.assertEqual([e["process"]["pid"] for e in db.query_events(process_path_prefix="/tmp/")], [1])
+        self.assertEqual(len(db.query_events(remote_ip="1.2.3.4", start=0, end=1000)), 1)
+        self.assertEqual(len(db.query_events(category="process")), 3)
+
+    def test_lookups_use_indexes(self):
+        db = DatabaseManager(self.db_path)
+        with db.connections.read() as conn:
+            plan = " ".join(str(row) for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM events WHERE remote_ip = ? AND timestamp >= ?", ("1.2.3.4", 0)))
+        self.assertIn("idx_events_remote_ip", plan)
+
+    def test_migrates_legacy_database_in_place(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, host_id TEXT, category TEXT, event_type TEXT, raw_data JSON)")
+        for i in range(25):
+            event = _process_event(i, f"/bin/p{i}") if i % 2 else _network_event(f"10.0.0.{i}")
+            conn.execute("INSERT INTO events (timestamp, host_id, category, event_type, raw_data) VALUES (?, ?, ?, ?, ?)",
+                         (event["timestamp"], "h1", event["category"], event["type"], json.dumps(event)))
+        conn.commit()
+        conn.close()
+
+        original_chunk = DatabaseManager.MIGRATION_CHUNK_SIZE
+        DatabaseManager.MIGRATION_CHUNK_SIZE = 4
+        try:
+            db = DatabaseManager(self.db_path)
+        finally:
+            DatabaseManager.MIGRATION_CHUNK_SIZE = original_chunk
+
+        with db.connections.read() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM events WHERE process_path IS NOT NULL").fetchone()[0], 12)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM events WHERE remote_ip IS NOT NULL").fetchone()[0], 13)
+        self.assertEqual(db.query_events(pid=7)[0]["process"]["path"], "/bin/p7")
+
+if __name__ == '__main__':
+    unittest.main()
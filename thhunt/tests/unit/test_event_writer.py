@@ -0,0 +1,101 @@
+import unittest
+import os
+import time
+import tempfile
+import shutil
+import sqlite3
+from unittest import mock
+from thhunt.storage.db import DatabaseManager
+from thhunt.storage.writer import EventWriter
+
+class TestEventWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.test_dir, "test.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _count_events(self):
+        conn = self.db._get_connection()
+        count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        conn.close()
+        return count
+
+    def _event(self, i):
+        return {"category": "process", "type": "process_snapshot", "timestamp": 1000.0 + i, "process": {"pid": i}}
+
+    def test_flush_on_batch_size(self):
+        writer = EventWriter(self.db, batch_size=10, flush_interval=60)
+        writer.start()
+        for i in range(25):
+            writer.write(self._event(i))
+
+        deadline = time.time() + 5
+        while writer.rows_written < 20 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertGreaterEqual(writer.rows_written, 20)
+        writer.stop()
+        self.assertEqual(self._count_events(), 25)
+
+    def test_flush_on_age(self):
+        writer = EventWriter(self.db, batch_size=1000, flush_interval=0.05)
+        writer.start()
+        writer.write(self._event(1))
+
+        deadline = time.time() + 5
+        while writer.rows_written < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self._count_events(), 1)
+        writer.stop()
+
+    def test_stop_flushes_buffer(self):
+        writer = EventWriter(self.db, batch_size=1000, flush_interval=60)
+        for i in range(5):
+            writer.write(self._event(i))
+        writer.stop()
+
+        self.assertEqual(self._count_events(), 5)
+        stats = writer.stats()
+        self.assertEqual(stats["rows_written"], 5)
+        self.assertEqual(stats["buffered"], 0)
+        self.assertEqual(stats["flushes"], 1)
+
+    def test_failed_batch_is_retried(self):
+        writer = EventWriter(self.db, batch_size=1000, flush_interval=60, retry_backoff=0.01)
+        insert_events = self.db.insert_events
+        failures = []
+
+        def flaky(events):
+            if len(failures) < 2:
+                failures.append(len(events))
+                raise sqlite3.OperationalError("database is locked")
+            insert_events(events)
+
+        with mock.patch.object(self.db, "insert_events", flaky):
+            for i in range(3):
+                writer.write(self._event(i))
+            self.assertEqual(writer.flush(), 0)
+            writer.write(self._event(3))
+            self.assertEqual(writer.stats()["buffered"], 4)  # the failed batch is back, in front
+            writer.stop()
+        self.assertEqual(failures, [3, 4])
+        self.assertEqual(self._count_events(), 4)
+        self.assertEqual((writer.rows_written, writer.rows_failed, writer.retries), (4, 0, 2))
+        conn = self.db._get_connection()
+        self.assertEqual([row[0] for row in conn.execute("SELECT timestamp FROM events ORDER BY id")],
+                         [1000.0, 1001.0, 1002.0, 1003.0])
+        conn.close()
+
+    def test_batch_dropped_after_retries(self):
+        writer = EventWriter(self.db, batch_size=1000, flush_interval=60, max_retries=2, retry_backoff=0.01)
+        with mock.patch.object(self.db, "insert_events", side_effect=sqlite3.OperationalError("disk full")):
+            writer.write(self._event(1))
+            writer.stop()
+        self.assertEqual((writer.rows_failed, writer.retries), (1, 2))
+        self.assertEqual(writer.stats()["buffered"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
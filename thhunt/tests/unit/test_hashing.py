@@ -0,0 +1,118 @@
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from thhunt.enrichment import hashing
+from thhunt.enrichment.hashing import HashService, file_key, hash_file
+
+def process_event(path, event_type="process_start"):
+    return {"category": "process", "event_type": event_type, "process": {"path": path, "hash": None}}
+
+class TestHashFile(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_read_and_mmap_paths(self):
+        for size in (10, hashing.MMAP_THRESHOLD + 1):
+            path = os.path.join(self.test_dir, f"f{size}")
+            data = os.urandom(size)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(hash_file(path, file_key(os.stat(path))), hashlib.sha256(data).hexdigest())
+
+    def test_changed_file_is_not_hashed(self):
+        path = os.path.join(self.test_dir, "bin")
+        with open(path, "wb") as f:
+            f.write(b"v1")
+        key = file_key(os.stat(path))
+        with open(path, "ab") as f:
+            f.write(b"v2")
+        self.assertIsNone(hash_file(path, key))
+
+class TestHashService(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        self.binary = os.path.join(self.test_dir, "bash")
+        with open(self.binary, "wb") as f:
+            f.write(b"\x7fELF" + b"\0" * 1000)
+        self.digest = hashlib.sha256(b"\x7fELF" + b"\0" * 1000).hexdigest()
+        self.service = HashService(self.db_path, workers=1)
+        self.delivered = []
+
+    def tearDown(self):
+        self.service.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_repeated_launches_are_hashed_once(self):
+        for _ in range(5):
+            self.service.bind(process_event(self.binary), self.delivered.append)
+            self.service._pool.submit(lambda: None).result()  # wait for the pool
+        self.assertEqual([e["process"]["hash"] for e in self.delivered], [self.digest] * 5)
+        self.assertEqual(self.service.files_hashed, 1)
+        self.assertEqual(self.service.cache_hits, 4)
+
+        # A new service (restart) finds the hash in the persistent cache
+        restarted = HashService(self.db_path)
+        self.addCleanup(restarted.stop)
+        with mock.patch.object(hashing, "hash_file", side_effect=AssertionError("re-hashed")):
+            restarted.bind(process_event(self.binary), self.delivered.append)
+        self.assertEqual(self.delivered[-1]["process"]["hash"], self.digest)
+
+    def test_concurrent_requests_share_one_job(self):
+        release = threading.Event()
+        original = hashing.hash_file
+        calls = []
+
+        def slow_hash(path, key):
+            calls.append(path)
+            release.wait(5)
+            return original(path, key)
+
+        with mock.patch.object(hashing, "hash_file", side_effect=slow_hash):
+            self.service.bind(process_event(self.binary), self.delivered.append)
+            self.service.bind(process_event(self.binary), self.delivered.append)
+            self.assertEqual(self.delivered, [])
+            release.set()
+            self.service.stop()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([e["process"]["hash"] for e in self.delivered], [self.digest] * 2)
+
+    def test_events_without_target_pass_through(self):
+        events = [
+            process_event(self.binary, "process_exit"),
+            {"category": "file", "file": {"path": self.binary, "action": "modified", "permissions": "0o644"}},
+            {"category": "network", "network": {}},
+            process_event(os.path.join(self.test_dir, "missing")),
+        ]
+        for event in events:
+            self.service.bind(event, self.delivered.append)
+        self.assertEqual(self.delivered, events)
+        self.assertEqual(self.service.files_hashed, 0)
+
+    def test_bind_batch_returns_ready_events(self):
+        other = process_event(os.path.join(self.test_dir, "missing"))
+        first = self.service.bind_batch([process_event(self.binary), other], self.delivered.append)
+        # The unhashed binary is delivered on its own once hashed
+        self.assertEqual(first, [other])
+        self.service._pool.submit(lambda: None).result()
+        self.assertEqual(self.delivered[0]["process"]["hash"], self.digest)
+
+        second = self.service.bind_batch([process_event(self.binary)], self.delivered.append)
+        self.assertEqual(second[0]["process"]["hash"], self.digest)
+        self.assertEqual(len(self.delivered), 1)
+
+    def test_full_queue_delivers_without_hash(self):
+        self.service.max_pending = 0
+        self.service.bind(process_event(self.binary), self.delivered.append)
+        self.assertIsNone(self.delivered[0]["process"]["hash"])
+        self.assertEqual(self.service.skipped, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import os
+import queue
+import shutil
+import tempfile
+from thhunt.collectors.base import iter_events
+from thhunt.collectors.linux.auth import LinuxAuthCollector, parse_auth_lines
+
+def ssh_line(user, ip="203.0.113.9", result="Failed"):
+    return f"Jan  2 03:04:05 bastion sshd[124]: {result} password for {user} from {ip} port 4242 ssh2\n"
+
+class TestAuthParsing(unittest.TestCase):
+    def test_parses_sshd_sudo_login(self):
+        text = (
+            "Jan  2 03:04:05 bastion sshd[123]: Accepted publickey for alice from 10.0.0.5 port 52144 ssh2: RSA SHA256:abc\n"
+            "Jan  2 03:04:06 bastion sshd[124]: Failed password for invalid user admin from 203.0.113.9 port 4242 ssh2\n"
+            "Jan  2 03:04:06 bastion sshd[124]: Connection closed by 203.0.113.9 port 4242 [preauth]\n"
+            "Jan  2 03:04:07 bastion sudo:    alice : TTY=pts/0 ; PWD=/home/alice ; USER=root ; COMMAND=/usr/bin/id\n"
+            "Jan  2 03:04:08 bastion sudo:      bob : 3 incorrect password attempts ; TTY=pts/1 ; PWD=/home/bob ; USER=root ; COMMAND=/bin/sh\n"
+            "Jan  2 03:04:09 bastion login[99]: FAILED LOGIN (1) on '/dev/tty1' FOR 'root', Authentication failure\n"
+            "2024-01-02T03:04:10.123456+00:00 bastion sshd[5]: Accepted password for dave from 2001:db8::1 port 22 ssh2\n"
+            "Jan  2 03:04:11 bastion CRON[1]: pam_unix(cron:session): session opened for user root\n"
+        )
+        events = [(e["service"], e["user"], e["result"], e["src_ip"], e["method"]) for e in parse_auth_lines(text)]
+        self.assertEqual(events, [
+            ("ssh", "alice", "success", "10.0.0.5", "publickey"),
+            ("ssh", "admin", "failure", "203.0.113.9", "password"),
+            ("sudo", "alice", "success", None, None),
+            ("sudo", "bob", "failure", None, None),
+            ("login", "root", "failure", None, None),
+            ("ssh", "dave", "success", "2001:db8::1", "password"),
+        ])
+
+class TestLinuxAuthCollector(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, "auth.log")
+        self.checkpoint = os.path.join(self.dir, "checkpoint.json")
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _append(self, text, path=None):
+        with open(path or self.log, "a") as f:
+            f.write(text)
+
+    def _collector(self, **kwargs):
+        collector = LinuxAuthCollector(self.queue, paths=[self.log], checkpoint_path=self.checkpoint, **kwargs)
+        self.addCleanup(collector.stop)
+        return collector
+
+    def _users(self):
+        users = []
+        while not self.queue.empty():
+            users.extend(e["payload"]["user"] for e in iter_events(self.queue.get_nowait()))
+        return users
+
+    def test_resumes_from_checkpoint(self):
+        self._append(ssh_line("a") + ssh_line("b"))
+        first = self._collector()
+        first.collect()
+        first.stop()
+        self.assertEqual(self._users(), ["a", "b"])
+
+        self._append(ssh_line("c"))
+        self._collector().collect()
+        self.assertEqual(self._users(), ["c"])
+
+    def test_partial_line_waits(self):
+        collector = self._collector()
+        line = ssh_line("a")
+        self._append(line[:20])
+        collector.collect()
+        self.assertEqual(self._users(), [])
+        self._append(line[20:])
+        collector.collect()
+        self.assertEqual(self._users(), ["a"])
+
+    def test_rotation_while_running(self):
+        collector = self._collector()
+        self._append(ssh_line("a"))
+        collector.collect()
+        os.rename(self.log, self.log + ".1")
+        self._append(ssh_line("late"), self.log + ".1")
+        self._append(ssh_line("new"))
+        collector.collect()
+        self.assertEqual(self._users(), ["a", "late", "new"])
+
+    def test_rotation_while_stopped(self):
+        self._append(ssh_line("a"))
+        first = self._collector()
+        first.collect()
+        first.stop()
+        os.rename(self.log, self.log + ".1")
+        self._append(ssh_line("late"), self.log + ".1")
+        self._append(ssh_line("new"))
+        self._collector().collect()
+        self.assertEqual(self._users(), ["a", "late", "new"])
+
+    def test_truncation(self):
+        collector = self._collector()
+        self._append(ssh_line("a") + ssh_line("b"))
+        collector.collect()
+        with open(self.log, "w") as f:
+            f.write(ssh_line("c"))
+        collector.collect()
+        self.assertEqual(self._users(), ["a", "b", "c"])
+
+    def test_small_chunks(self):
+        users = [f"user{i}" for i in range(200)]
+        self._append("".join(ssh_line(u) for u in users))
+        self._collector(chunk_size=256).collect()
+        self.assertEqual(self._users(), users)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import queue
+import shutil
+import tempfile
+from thhunt.collectors.base import iter_events
+from thhunt.collectors.linux.files import LinuxFileCollector
+
+class TestLinuxFileCollector(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "etc", "cron.d"))
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _collector(self, **kwargs):
+        collector = LinuxFileCollector(self.queue, [self.root], **kwargs)
+        self.addCleanup(collector._inotify.close)
+        return collector
+
+    def _collect(self, collector):
+        collector.collect(timeout=0.1)
+        collector.flush()
+        events = []
+        while not self.queue.empty():
+            events.extend(e["payload"] for e in iter_events(self.queue.get_nowait()))
+        return {e["path"]: e for e in events}
+
+    def test_burst_is_coalesced(self):
+        collector = self._collector(coalesce_window=60)
+        path = os.path.join(self.root, "etc", "cron.d", "job")
+        with open(path, "w") as f:
+            for _ in range(100):
+                f.write("* * * * * root /tmp/x\n")
+                f.flush()
+
+        events = self._collect(collector)
+        self.assertEqual(list(events), [path])
+        self.assertEqual(events[path]["action"], "created")
+        self.assertEqual(events[path]["size"], 2200)
+        self.assertIsNone(events[path]["hash"])  # not executable
+
+        os.remove(path)
+        self.assertEqual(self._collect(collector)[path]["action"], "deleted")
+
+    def test_window_delays_publishing(self):
+        collector = self._collector(coalesce_window=60)
+        open(os.path.join(self.root, "a"), "w").close()
+        collector.collect(timeout=0.1)
+        self.assertTrue(self.queue.empty())
+
+    def test_new_directories_are_watched(self):
+        collector = self._collector(coalesce_window=0)
+        new_dir = os.path.join(self.root, "new", "nested")
+        os.makedirs(new_dir)
+        self._collect(collector)
+
+        path = os.path.join(new_dir, "payload.sh")
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(path, 0o755)
+        event = self._collect(collector)[path]
+        self.assertEqual(event["permissions"], "0o755")
+        # Hashes are attached later on the event path
+        self.assertIsNone(event["hash"])
+
+    def test_watch_limit(self):
+        for i in range(5):
+            os.makedirs(os.path.join(self.root, f"d{i}"))
+        collector = self._collector(max_watches=3)
+        self.assertEqual(len(collector._watches), 3)
+
+if __name__ == '__main__':
+    unittest.main()
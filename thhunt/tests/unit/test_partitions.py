@@ -0,0 +1,93 @@
+import unittest
+import os
+import tempfile
+import time
+import shutil
+from thhunt.config.schema import DatabaseConfig
+from thhunt.storage.db import DatabaseManager
+from thhunt.storage.event_schema import has_event_indexes
+
+DAY = 86400
+
+def _event(timestamp, remote_ip="8.8.8.8"):
+    return {"category": "network", "type": "network_connection", "timestamp": timestamp, "host_id": "h1",
+            "network": {"remote_ip": remote_ip, "remote_port": 53}}
+
+class TestPartitionedEvents(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        self.db = DatabaseManager(self.db_path, DatabaseConfig(path=self.db_path, partition_period_hours=24))
+
+    def tearDown(self):
+        self.db.connections.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_events_go_to_daily_partitions(self):
+        self.db.insert_events([_event(10 * DAY + 5), _event(11 * DAY + 5), _event(11 * DAY + 6), _event(12 * DAY + 5)])
+
+        partitions = self.db.partitions.list_partitions()
+        self.assertEqual([start for start, _ in partitions], [10 * DAY, 11 * DAY, 12 * DAY])
+        self.assertTrue(os.path.basename(partitions[0][1]).startswith("test.events.19700111T000000Z"))
+        with self.db.connections.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM events").fetchone()[0], 0)
+
+    def test_range_query_touches_only_overlapping_partitions(self):
+        self.db.insert_events([_event(10 * DAY + 5), _event(11 * DAY + 5, "1.1.1.1"), _event(12 * DAY + 5)])
+
+        self.assertEqual(len(self.db.partitions.partitions_for_range(11 * DAY, 11 * DAY + 3600)), 1)
+        events = self.db.query_events(start=11 * DAY, end=12 * DAY)
+        self.assertEqual([e["network"]["remote_ip"] for e in events], ["1.1.1.1"])
+        self.assertEqual([e["timestamp"] for e in self.db.query_events(remote_ip="8.8.8.8")], [12 * DAY + 5, 10 * DAY + 5])
+
+    def test_batch_spanning_many_partitions(self):
+        count = self.db.partitions.MAX_ATTACHED + 3
+        self.db.insert_events([_event(day * DAY) for day in range(count)])
+        self.db.insert_events([_event(day * DAY + 1) for day in range(count)])
+
+        self.assertEqual(len(self.db.partitions.list_partitions()), count)
+        self.assertEqual(len(self.db.query_events(limit=100)), 2 * count)
+
+    def test_sealed_partitions_get_typed_columns_and_indexes(self):
+        self.db.insert_events([_event(10 * DAY + 5, "1.1.1.1"), _event(11 * DAY + 5, "1.1.1.1")])
+        self.assertEqual(len(self.db.query_events(remote_ip="1.1.1.1")), 2)
+
+        self.assertEqual(self.db.index_sealed_partitions(now=11 * DAY + 10), 1)
+        self.assertEqual(self.db.index_sealed_partitions(now=11 * DAY + 10), 0)
+        # A late event for the sealed partition is stored with its typed columns
+        self.db.insert_events([_event(10 * DAY + 6, "1.1.1.1")])
+
+        (_, sealed), (_, current) = self.db.partitions.list_partitions()
+        for path, indexed, remote_ips in ((sealed, True, ["1.1.1.1", "1.1.1.1"]), (current, False, [None])):
+            conn = self.db.connections.connect(read_only=True, path=path)
+            try:
+                self.assertEqual(has_event_indexes(conn), indexed)
+                self.assertEqual([row[0] for row in conn.execute("SELECT remote_ip FROM events ORDER BY id")], remote_ips)
+            finally:
+                conn.close()
+        self.assertEqual([e["timestamp"] for e in self.db.query_events(remote_ip="1.1.1.1")],
+                         [11 * DAY + 5, 10 * DAY + 6, 10 * DAY + 5])
+
+    def test_retention_drops_old_partitions(self):
+        self.db.partitions.retention = 2 * DAY
+        today = self.db.partitions.partition_start(time.time())
+        self.db.insert_events([_event(today - DAY + 5), _event(today + 5), _event(today + DAY + 5)])
+
+        dropped = self.db.enforce_retention(now=today + 2 * DAY + 1)
+
+        self.assertEqual(dropped, 1)
+        self.assertEqual([start for start, _ in self.db.partitions.list_partitions()], [today, today + DAY])
+        self.assertEqual(len(self.db.query_events()), 2)
+
+    def test_events_past_retention_are_dropped_on_insert(self):
+        self.db.partitions.retention = 2 * DAY
+        now = time.time()
+        expired = self.db.insert_events([_event(now - 3 * DAY), _event(now - DAY), _event(now)])
+
+        self.assertEqual(expired, 1)
+        self.assertEqual(self.db.partitions.expired_events, 1)
+        self.assertEqual(len(self.db.partitions.list_partitions()), 2)
+        self.assertEqual(len(self.db.query_events()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
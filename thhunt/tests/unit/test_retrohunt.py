@@ -0,0 +1,123 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from thhunt.config.schema import DatabaseConfig
+from thhunt.detection.retrohunt import RetroHuntJob, RetroHuntManager
+from thhunt.storage.db import DatabaseManager
+
+DAY = 86400
+
+RULES = """name: Temp exec
+severity: 6
+conditions: {category: process, process.path: {startswith: /tmp/}}
+"""
+
+BURST = """name: Temp burst
+severity: 8
+type: threshold
+window: 60
+threshold: 3
+conditions: {category: process, process.path: {startswith: /tmp/}}
+"""
+
+def _event(timestamp, path):
+    return {"category": "process", "type": "process_start", "event_type": "process_start", "timestamp": timestamp,
+            "host_id": "h1", "process": {"pid": 1, "name": os.path.basename(path), "path": path}}
+
+class TestRetroHunt(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "test.db")
+        self.db = DatabaseManager(self.db_path)
+        self.rules_path = self._write_rules("rules.yml", RULES)
+        # One in five events runs from /tmp
+        self.db.insert_events([_event(1000 + n, f"/tmp/x{n}" if n % 5 == 0 else f"/usr/bin/y{n}") for n in range(100)])
+
+    def tearDown(self):
+        self.db.connections.close()
+        shutil.rmtree(self.test_dir)
+
+    def _write_rules(self, name, content):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _alerts(self, source):
+        with self.db.connections.read() as conn:
+            return conn.execute("SELECT rule_name, severity, related_events FROM alerts WHERE source = ?",
+                                (source,)).fetchall()
+
+    def test_event_chunks_stream_in_order(self):
+        chunks = list(self.db.iter_event_chunks(1010, 1050, chunk_size=15))
+        self.assertEqual([len(chunk) for chunk in chunks], [15, 15, 10])
+        timestamps = [json.loads(raw)["timestamp"] for chunk in chunks for raw in chunk]
+        self.assertEqual(timestamps, list(range(1010, 1050)))
+        self.assertEqual(self.db.count_events(1010, 1050), 40)
+
+    def test_event_chunks_span_partitions(self):
+        path = os.path.join(self.test_dir, "partitioned.db")
+        db = DatabaseManager(path, DatabaseConfig(path=path, partition_period_hours=24))
+        partitions, db.partitions = db.partitions, None
+        db.insert_events([_event(5, "/bin/old")])  # stored before partitioning was enabled
+        db.partitions = partitions
+        db.insert_events([_event(2 * DAY + 1, "/bin/c"), _event(DAY + 1, "/bin/b"), _event(DAY + 2, "/bin/b2")])
+        chunks = list(db.iter_event_chunks(chunk_size=2))
+        self.assertEqual([[json.loads(raw)["process"]["path"] for raw in chunk] for chunk in chunks],
+                         [["/bin/old"], ["/bin/b", "/bin/b2"], ["/bin/c"]])
+        self.assertEqual(db.count_events(DAY, 3 * DAY), 3)
+        db.connections.close()
+
+    def test_inline_job_writes_tagged_alerts(self):
+        job = RetroHuntJob("job1", self.db_path, self.rules_path, 1000, 1050, workers=0, chunk_size=7)
+        job.run()
+        status = job.status()
+        self.assertEqual((status["state"], status["total"], status["scanned"], status["matched"]),
+                         ("completed", 50, 50, 10))
+        self.assertEqual(status["progress"], 1.0)
+        alerts = self._alerts("retrohunt:job1")
+        self.assertEqual(len(alerts), 10)
+        self.assertEqual({(name, severity) for name, severity, _ in alerts}, {("Temp exec", "6")})
+        self.assertTrue(json.loads(alerts[0][2])[0]["process"]["path"].startswith("/tmp/"))
+        self.assertEqual(self._alerts("live"), [])
+
+    def test_process_pool_job(self):
+        job = RetroHuntJob("job2", self.db_path, self.rules_path, workers=2, chunk_size=10)
+        job.run()
+        self.assertEqual(job.state, "completed", job.error)
+        self.assertEqual((job.scanned, job.matched), (100, 20))
+        self.assertEqual(len(self._alerts("retrohunt:job2")), 20)
+
+    def test_correlation_state_spans_chunks(self):
+        burst = self._write_rules("burst.yml", BURST)
+        job = RetroHuntJob("job3", self.db_path, burst, workers=2, chunk_size=4)
+        job.run()
+        # 20 /tmp events 5s apart: fires on every third
+        self.assertEqual(job.state, "completed", job.error)
+        self.assertEqual(job.matched, 6)
+
+    def test_cancel(self):
+        job = RetroHuntJob("job4", self.db_path, self.rules_path, workers=0, chunk_size=10)
+        job.cancel()
+        job.run()
+        self.assertEqual((job.state, job.scanned), ("cancelled", 0))
+
+    def test_manager(self):
+        manager = RetroHuntManager(self.db_path, workers=0)
+        with self.assertRaises(ValueError):
+            manager.start(os.path.join(self.test_dir, "missing.yml"))
+        with self.assertRaises(ValueError):
+            manager.start(self.rules_path, 2000, 1000)
+        job = manager.start(self.rules_path, 1000, 1100)
+        job.join(10)
+        self.assertEqual([status["state"] for status in manager.list()], ["completed"])
+        self.assertFalse(manager.cancel("nope"))
+
+        failing = manager.start(self._write_rules("empty.yml", ""))
+        failing.join(10)
+        self.assertEqual(manager.get(failing.job_id).state, "failed")
+
+if __name__ == '__main__':
+    unittest.main()
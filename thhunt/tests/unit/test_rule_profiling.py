@@ -0,0 +1,105 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+from thhunt.detection import workers
+from thhunt.detection.workers import ShardedDetectionPool
+from thhunt.normalization.registry import normalize_event
+from thhunt.rules.engine import RuleEngine
+from thhunt.rules.profiling import RuleProfiler, merge_rule_stats, top_rules
+
+RULES = """name: Temp exec
+conditions: {category: process, process.path: {startswith: /tmp/}}
+---
+name: Curl
+conditions: {category: process, process.name: curl}
+---
+name: Broken
+conditions: {category: process, process.name: {bogus: 1}}
+---
+name: Burst
+type: threshold
+window: 60
+threshold: 2
+conditions: {category: process}
+"""
+
+def process(ts, path):
+    return normalize_event({"type": "process_start", "timestamp": ts, "host_id": "h1",
+                            "payload": {"path": path, "name": os.path.basename(path)}})
+
+class RuleEnginePipeline:
+    def __init__(self, rules_path):
+        self.rule_engine = RuleEngine(rules_path)
+
+    def process_batch(self, events):
+        self.rule_engine.evaluate_batch(events)
+
+class TestRuleProfiling(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.test_dir, "rules.yml"), "w") as f:
+            f.write(RULES)
+        self.engine = RuleEngine(self.test_dir)
+        self.engine.profiler = RuleProfiler(len(self.engine.rules), sample_every=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_counts_and_timings(self):
+        before = time.time()
+        for ts, path in ((0, "/tmp/a"), (1, "/usr/bin/curl"), (2, "/bin/ls")):
+            self.engine.evaluate(process(ts, path))
+        self.engine.evaluate(normalize_event({"type": "auth_event", "timestamp": 3, "payload": {}}))
+        stats = self.engine.stats()
+        self.assertEqual(stats["events"], 4)
+        rules = {rule["name"]: rule for rule in stats["rules"]}
+        self.assertEqual([rules[n]["evaluations"] for n in ("Temp exec", "Curl", "Broken", "Burst")], [3, 3, None, 3])
+        self.assertEqual([rules[n]["matches"] for n in ("Temp exec", "Curl", "Broken", "Burst")], [1, 1, 0, 1])
+        self.assertGreaterEqual(rules["Curl"]["last_match"], before)
+        self.assertIsNone(rules["Broken"]["last_match"])
+        # The startswith predicate and correlation updates are timed; the indexed equality is not
+        self.assertEqual(rules["Temp exec"]["timed"], 3)
+        self.assertEqual(rules["Burst"]["timed"], 3)
+        self.assertEqual(rules["Curl"]["timed"], 0)
+        self.assertGreater(rules["Temp exec"]["p99_us"], 0)
+        self.assertEqual(stats["correlation"]["entries"], 1)
+
+    def test_sampling(self):
+        self.engine.profiler = RuleProfiler(len(self.engine.rules), sample_every=10)
+        for ts in range(95):
+            self.engine.evaluate(process(ts, "/tmp/a"))
+        rules = {rule["name"]: rule for rule in self.engine.stats()["rules"]}
+        self.assertEqual(rules["Temp exec"]["matches"], 95)
+        self.assertEqual(rules["Temp exec"]["timed"], 9)
+
+    def test_merge_and_sort(self):
+        self.engine.evaluate(process(0, "/tmp/a"))
+        other = RuleEngine(self.test_dir)
+        for ts in range(3):
+            other.evaluate(process(ts, "/usr/bin/curl"))
+        merged = merge_rule_stats([self.engine.stats(), other.stats()])
+        self.assertEqual(merged["events"], 4)
+        by_matches = top_rules(merged, "matches", limit=3)["rules"]
+        self.assertEqual([(r["name"], r["matches"]) for r in by_matches], [("Curl", 3), ("Temp exec", 1), ("Burst", 1)])
+        self.assertEqual(merged["correlation"]["entries"], 2)
+        with self.assertRaises(ValueError):
+            top_rules(merged, "noise")
+
+    def test_pool_collects_shard_stats(self):
+        with mock.patch.object(workers, "RULE_STATS_INTERVAL", 0.05):
+            pool = ShardedDetectionPool(lambda: RuleEnginePipeline(self.test_dir), workers=2, key="entity")
+            pool.start()
+            pool.submit([process(ts, f"/tmp/{ts}") for ts in range(20)])
+            deadline = time.time() + 5
+            while pool.rule_stats()["events"] < 20 and time.time() < deadline:
+                time.sleep(0.02)
+            pool.stop()
+        rules = {rule["name"]: rule for rule in pool.rule_stats()["rules"]}
+        self.assertEqual(rules["Temp exec"]["matches"], 20)
+        self.assertEqual(rules["Temp exec"]["evaluations"], 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,57 +1,120 @@
-import unittest
-import os
-import tempfile
-import shutil
-from thhunt.rules.engine import RuleEngine
-
-class TestRuleEngine(unittest.TestCase):
-    def setUp(self):
-        self.test_dir = tempfile.mkdtemp()
-        self.rules_path = os.path.join(self.test_dir, "rules")
-        os.makedirs(self.rules_path)
-        
-        # Create a dummy rule
-        with open(os.path.join(self.rules_path, "test_rule.yml"), "w") as f:
-            f.write("""
-name: Test Rule
-description: Detects test process
-severity: 5
-conditions:
-  category: process
-  process_name: "malware.exe"
-""")
-
-    def tearDown(self):
-        shutil.rmtree(self.test_dir)
-
-    def test_rule_match(self):
-        engine = RuleEngine(self.rules_path)
-        
-        event_match = {
-            "category": "process",
-            "process": {
-                "name": "malware.exe",
-                "path": "/tmp/malware.exe"
-            }
-        }
-        
-        matches = engine.evaluate(event_match)
-        self.assertEqual(len(matches), 1)
-        self.assertEqual(matches[0]["rule_name"], "Test Rule")
-
-    def test_rule_no_match(self):
-        engine = RuleEngine(self.rules_path)
-        
-        event_no_match = {
-            "category": "process",
-            "process": {
-                "name": "benign.exe",
-                "path": "/bin/benign.exe"
-            }
-        }
-        
-        matches = engine.evaluate(event_no_match)
-        self.assertEqual(len(matches), 0)
-
-if __name__ == '__main__':
-    unittest.main()
+import unittest
+import os
+import tempfile
+import shutil
+import random
+from thhunt.rules.aho_corasick import AhoCorasick
+from thhunt.rules.engine import RuleEngine
+from thhunt.rules.index import RuleIndex
+
+def legacy_match(rule, event):
+    # The per-rule matcher the index replaced
+    conditions = rule.get("conditions", {})
+    if "category" in conditions and event.get("category") != conditions["category"]:
+        return False
+    if conditions.get("category") == "process":
+        proc = event.get("process", {})
+        if "process_name" in conditions and proc.get("name") != conditions["process_name"]:
+            return False
+        if "process_path_contains" in conditions:
+            path = proc.get("path", "")
+            if not path or conditions["process_path_contains"].lower() not in path.lower():
+                return False
+    return True
+
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.rules_path = os.path.join(self.test_dir, "rules")
+        os.makedirs(self.rules_path)
+        
+        # Create a dummy rule
+        with open(os.path.join(self.rules_path, "test_rule.yml"), "w") as f:
+            f.write("""
+name: Test Rule
+description: Detects test process
+severity: 5
+conditions:
+  category: process
+  process_name: "malware.exe"
+""")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_rule_match(self):
+        engine = RuleEngine(self.rules_path)
+        
+        event_match = {
+            "category": "process",
+            "process": {
+                "name": "malware.exe",
+                "path": "/tmp/malware.exe"
+            }
+        }
+        
+        matches = engine.evaluate(event_match)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["rule_name"], "Test Rule")
+
+    def test_rule_no_match(self):
+        engine = RuleEngine(self.rules_path)
+        
+        event_no_match = {
+            "category": "process",
+            "process": {
+                "name": "benign.exe",
+                "path": "/bin/benign.exe"
+            }
+        }
+        
+        matches = engine.evaluate(event_no_match)
+        self.assertEqual(len(matches), 0)
+
+    def test_evaluate_batch(self):
+        engine = RuleEngine(self.rules_path)
+        events = [
+            {"category": "process", "process": {"name": "malware.exe"}},
+            {"category": "network", "network": {}},
+            {"category": "process", "process": {"name": "benign.exe"}},
+        ]
+        results = engine.evaluate_batch(events)
+        self.assertEqual(results, [engine.evaluate(event) for event in events])
+        self.assertEqual([len(r) for r in results], [1, 0, 0])
+
+class TestRuleIndex(unittest.TestCase):
+    def test_aho_corasick(self):
+        automaton = AhoCorasick()
+        for value, pattern in enumerate(["he", "she", "his", "hers", "/tmp/"]):
+            automaton.add(pattern, value)
+        self.assertEqual(automaton.find("ushers"), {0, 1, 3})
+        self.assertEqual(automaton.find("/var/tmp/x"), {4})
+        self.assertEqual(automaton.find(""), set())
+
+    def test_matches_legacy_semantics(self):
+        rng = random.Random(7)
+        names = ["sh", "nc", "curl", "python"]
+        fragments = ["tmp", "/TMP/", "bin", "usr/b", "Temp", "x"]
+        rules = []
+        for n in range(300):
+            conditions = {}
+            if rng.random() < 0.9:
+                conditions["category"] = rng.choice(["process", "process", "network"])
+            # Shorthands were only ever honoured on process rules
+            if conditions.get("category") == "process":
+                if rng.random() < 0.5:
+                    conditions["process_name"] = rng.choice(names)
+                if rng.random() < 0.6:
+                    conditions["process_path_contains"] = rng.choice(fragments)
+            rules.append({"name": f"r{n}", "conditions": conditions})
+        index = RuleIndex(rules)
+
+        paths = ["/tmp/x", "/usr/bin/curl", "C:/Temp/nc", "", None, "/opt/Tmp/bin/python"]
+        for _ in range(200):
+            event = {"category": rng.choice(["process", "network"]),
+                     "process": {"name": rng.choice(names), "path": rng.choice(paths)}}
+            expected = [rule["name"] for rule in rules if legacy_match(rule, event)]
+            self.assertEqual([rule["name"] for rule in index.match(event)], expected)
+
+if __name__ == '__main__':
+    unittest.main()
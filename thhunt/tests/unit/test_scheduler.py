@@ -0,0 +1,75 @@
+import unittest
+import queue
+import time
+from thhunt.collectors.base import CollectorBase
+from thhunt.core.scheduler import CollectorScheduler, ScheduledCollector
+
+class SleepyCollector(CollectorBase):
+    def __init__(self, interval, work):
+        super().__init__(queue.Queue(), interval)
+        self.work = work
+        self.calls = []
+
+    def collect(self):
+        self.calls.append(time.monotonic())
+        time.sleep(self.work)
+
+class TestScheduledCollector(unittest.TestCase):
+    def test_fixed_rate_ticks_and_coalescing(self):
+        task = ScheduledCollector(SleepyCollector(5, 0), start=100.0, jitter=0)
+        self.assertEqual(task.deadline, 100.0)
+        self.assertEqual(task.advance(100.2), 0)
+        self.assertEqual(task.deadline, 105.0)
+        # Dispatched late at 117: ticks 110 and 115 are coalesced
+        self.assertEqual(task.advance(117.0), 2)
+        self.assertEqual(task.deadline, 120.0)
+
+    def test_jitter_only_delays_single_runs(self):
+        task = ScheduledCollector(SleepyCollector(10, 0), start=0.0, jitter=0.5)
+        for tick in range(1, 50):
+            task.advance(task.deadline)
+            self.assertGreaterEqual(task.deadline, tick * 10.0)
+            self.assertLessEqual(task.deadline, tick * 10.0 + 5.0)
+
+class TestCollectorScheduler(unittest.TestCase):
+    def _run(self, collectors, seconds, workers=2):
+        scheduler = CollectorScheduler(workers=workers, jitter=0)
+        for collector in collectors:
+            scheduler.add(collector)
+        scheduler.start()
+        time.sleep(seconds)
+        scheduler.stop()
+        return scheduler.stats()
+
+    def test_period_does_not_drift(self):
+        collector = SleepyCollector(0.05, 0.02)
+        stats = self._run([collector], 0.52)
+        # A sleep-after-collect loop would only manage 0.52 / 0.07 = 7 runs
+        self.assertGreaterEqual(stats["SleepyCollector"]["runs"], 9)
+        self.assertEqual(stats["SleepyCollector"]["skipped"], 0)
+
+    def test_overrunning_ticks_are_skipped(self):
+        collector = SleepyCollector(0.05, 0.12)
+        stats = self._run([collector], 0.5)["SleepyCollector"]
+        self.assertGreater(stats["skipped"], 0)
+        self.assertLessEqual(stats["runs"], 5)
+        self.assertGreaterEqual(stats["max_run_ms"], 120)
+        # Runs never overlap
+        gaps = [b - a for a, b in zip(collector.calls, collector.calls[1:])]
+        self.assertTrue(all(gap >= 0.12 for gap in gaps))
+
+    def test_stopped_collector_leaves_schedule(self):
+        collector = SleepyCollector(0.02, 0)
+        scheduler = CollectorScheduler(jitter=0)
+        scheduler.add(collector)
+        scheduler.start()
+        time.sleep(0.1)
+        collector.stop()
+        time.sleep(0.05)
+        calls = len(collector.calls)
+        time.sleep(0.1)
+        scheduler.stop()
+        self.assertEqual(len(collector.calls), calls)
+
+if __name__ == '__main__':
+    unittest.main()
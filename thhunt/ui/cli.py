@@ -1,52 +1,148 @@
-import argparse
-import requests
-import sys
-from datetime import datetime, timedelta
-
-API_URL = "http://127.0.0.1:9999"
-
-def get_alerts(since: str):
-    try:
-        response = requests.get(f"{API_URL}/alerts")
-        if response.status_code == 200:
-            alerts = response.json()
-            print(f"Found {len(alerts)} alerts.")
-            for alert in alerts:
-                print(alert)
-        else:
-            print(f"Error: {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to service. Is it running?")
-
-def get_status():
-    try:
-        response = requests.get(f"{API_URL}/status")
-        if response.status_code == 200:
-            print(response.json())
-        else:
-            print(f"Error: {response.status_code}")
-    except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to service. Is it running?")
-
-def main():
-    parser = argparse.ArgumentParser(description="Threat Hunting Assistant CLI")
-    subparsers = parser.add_subparsers(dest="command")
-
-    # Alerts command
-    alerts_parser = subparsers.add_parser("alerts", help="List alerts")
-    alerts_parser.add_argument("--since", help="Time range (e.g., 24h)", default="24h")
-
-    # Status command
-    subparsers.add_parser("status", help="Show system status")
-
-    args = parser.parse_args()
-
-    if args.command == "alerts":
-        get_alerts(args.since)
-    elif args.command == "status":
-        get_status()
-    else:
-        parser.print_help()
-
-if __name__ == "__main__":
-    main()
+import argparse
+import os
+import requests
+import sys
+from datetime import datetime, timedelta
+
+API_URL = "http://127.0.0.1:9999"
+
+def get_alerts(since: str, source: str = None):
+    try:
+        response = requests.get(f"{API_URL}/alerts", params={"source": source} if source else None)
+        if response.status_code == 200:
+            alerts = response.json()
+            print(f"Found {len(alerts)} alerts.")
+            for alert in alerts:
+                print(alert)
+        else:
+            print(f"Error: {response.status_code}")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to service. Is it running?")
+
+def get_status():
+    try:
+        response = requests.get(f"{API_URL}/status")
+        if response.status_code == 200:
+            print(response.json())
+        else:
+            print(f"Error: {response.status_code}")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to service. Is it running?")
+
+def get_stats():
+    try:
+        response = requests.get(f"{API_URL}/stats")
+        if response.status_code == 200:
+            for name, stats in response.json().items():
+                print(f"{name}: {stats}")
+        else:
+            print(f"Error: {response.status_code}")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to service. Is it running?")
+
+def get_rule_stats(sort: str, limit: int):
+    try:
+        response = requests.get(f"{API_URL}/rules/stats", params={"sort": sort, "limit": limit})
+        if response.status_code == 200:
+            stats = response.json()
+            print(f"{stats['events']} events, {stats.get('avg_us', 0):.1f} us avg, "
+                  f"{stats.get('p99_us', 0):.1f} us p99 per event")
+            print(f"{'rule':40} {'evals':>10} {'matches':>8} {'time ms':>9} {'avg us':>8} {'p99 us':>8}  last match")
+            for rule in stats["rules"]:
+                last = datetime.fromtimestamp(rule["last_match"]).isoformat(sep=' ', timespec='seconds') if rule["last_match"] else "-"
+                evaluations = rule["evaluations"] if rule["evaluations"] is not None else "invalid"
+                print(f"{str(rule['name'])[:40]:40} {evaluations:>10} {rule['matches']:>8} {rule['time_ms']:>9.1f} "
+                      f"{rule['avg_us']:>8.1f} {rule['p99_us']:>8.1f}  {last}")
+        else:
+            print(f"Error: {response.status_code} {response.text}")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to service. Is it running?")
+
+def parse_age(value: str) -> float:
+    """
+    "90s", "30m", "24h" or "7d" -> seconds.
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+def print_retrohunt(job: dict):
+    total = job["total"] if job["total"] is not None else "?"
+    print(f"{job['id']}  {job['state']:9}  {job['progress'] * 100:5.1f}%  {job['scanned']}/{total} events  "
+          f"{job['matched']} matched  {job['rules']}" + (f"  error: {job['error']}" if job.get("error") else ""))
+
+def retrohunt(args):
+    try:
+        if args.action == "start":
+            now = datetime.now().timestamp()
+            body = {"rules": os.path.abspath(args.rules), "start": now - parse_age(args.since)}
+            if args.until:
+                body["end"] = now - parse_age(args.until)
+            response = requests.post(f"{API_URL}/retrohunt", json=body)
+        elif args.action == "cancel":
+            response = requests.post(f"{API_URL}/retrohunt/{args.id}/cancel")
+        elif args.id:
+            response = requests.get(f"{API_URL}/retrohunt/{args.id}")
+        else:
+            response = requests.get(f"{API_URL}/retrohunt")
+        if response.status_code not in (200, 202):
+            print(f"Error: {response.status_code} {response.json().get('error', '')}")
+            return
+        jobs = response.json()
+        for job in (jobs if isinstance(jobs, list) else [jobs]):
+            print_retrohunt(job)
+        if args.action == "start":
+            print(f"Results are stored as alerts: python -m thhunt.ui.cli alerts --source {jobs['source']}")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to service. Is it running?")
+
+def main():
+    parser = argparse.ArgumentParser(description="Threat Hunting Assistant CLI")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Alerts command
+    alerts_parser = subparsers.add_parser("alerts", help="List alerts")
+    alerts_parser.add_argument("--since", help="Time range (e.g., 24h)", default="24h")
+    alerts_parser.add_argument("--source", help="Only alerts of this source (live or retrohunt:<id>)")
+
+    # Status command
+    subparsers.add_parser("status", help="Show system status")
+
+    # Stats command
+    subparsers.add_parser("stats", help="Show queue, scheduler and hashing statistics")
+
+    # Rules command
+    rules_parser = subparsers.add_parser("rules", help="Show per-rule cost and hit statistics")
+    rules_parser.add_argument("--sort", choices=["time", "matches", "evaluations", "p99"], default="time")
+    rules_parser.add_argument("--limit", type=int, default=20)
+
+    # Retro-hunt command
+    retrohunt_parser = subparsers.add_parser("retrohunt", help="Run rules over stored events")
+    retrohunt_actions = retrohunt_parser.add_subparsers(dest="action", required=True)
+    start_parser = retrohunt_actions.add_parser("start", help="Start a retro-hunt")
+    start_parser.add_argument("rules", help="Rule file or directory")
+    start_parser.add_argument("--since", help="Start of the range, as an age (e.g., 7d)", default="7d")
+    start_parser.add_argument("--until", help="End of the range, as an age (default: now)")
+    status_parser = retrohunt_actions.add_parser("status", help="Show progress of one or all retro-hunts")
+    status_parser.add_argument("id", nargs="?")
+    cancel_parser = retrohunt_actions.add_parser("cancel", help="Cancel a retro-hunt")
+    cancel_parser.add_argument("id")
+
+    args = parser.parse_args()
+
+    if args.command == "alerts":
+        get_alerts(args.since, args.source)
+    elif args.command == "status":
+        get_status()
+    elif args.command == "stats":
+        get_stats()
+    elif args.command == "rules":
+        get_rule_stats(args.sort, args.limit)
+    elif args.command == "retrohunt":
+        retrohunt(args)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
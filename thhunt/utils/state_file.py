@@ -0,0 +1,26 @@
+import json
+import os
+from typing import Any
+
+def load_json_state(path: str, default: Any = None) -> Any:
+    """
+    Loads collector state saved with save_json_state. Returns default if
+    the file does not exist; raises ValueError if it is unreadable.
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def save_json_state(path: str, data: Any):
+    """
+    Writes data as JSON via fsync + atomic rename, so a crash leaves either
+    the old or the new state on disk, never a torn file.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)